@@ -0,0 +1,83 @@
+# benchmarks/bench_dom_snapshot.py
+"""
+Compare the old per-element structure extraction with the single-evaluate DOM snapshot.
+
+Run:
+    python -m benchmarks.bench_dom_snapshot --rows 50
+"""
+import argparse
+import time
+from playwright.sync_api import sync_playwright
+from config import HEADLESS
+from utils.dom_snapshot import snapshot_elements
+from utils.ipc_counter import count_round_trips
+
+
+def build_overview_html(rows: int) -> str:
+    """Checkout-overview-like page with `rows` cart items."""
+    items = "".join(
+        f"<div class='cart_item'><div class='cart_quantity'>1</div>"
+        f"<div data-test='inventory-item-name'>Item {i}</div>"
+        f"<div data-test='inventory-item-desc'>Description for item {i}</div>"
+        f"<div data-test='inventory-item-price'>${i}.99</div></div>"
+        for i in range(rows)
+    )
+    return (
+        "<html><body><div id='checkout_summary_container'>"
+        f"<div class='cart_list'>{items}</div>"
+        "<div class='summary_subtotal_label'>Item total: $0</div>"
+        "<button data-test='finish' id='finish'>Finish</button>"
+        "</div></body></html>"
+    )
+
+
+def legacy_extract(page):
+    """The pre-snapshot implementation: up to five round-trips per visible element."""
+    structure = []
+    for el in page.locator("body *:visible").all():
+        try:
+            structure.append({
+                "tag": el.evaluate("el => el.tagName"),
+                "text": el.inner_text().strip(),
+                "x": el.bounding_box()["x"] if el.bounding_box() else None,
+                "y": el.bounding_box()["y"] if el.bounding_box() else None,
+            })
+        except Exception:
+            continue
+    return structure
+
+
+def snapshot_extract(page):
+    return snapshot_elements(page, fields=("tag", "text", "x", "y"))
+
+
+def measure(fn, page):
+    with count_round_trips() as ipc:
+        start = time.perf_counter()
+        result = fn(page)
+        elapsed = time.perf_counter() - start
+    return {"elements": len(result), "round_trips": ipc["calls"], "seconds": elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50, help="cart items on the synthetic page")
+    args = parser.parse_args(argv)
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=HEADLESS)
+        page = browser.new_page()
+        page.set_content(build_overview_html(args.rows))
+
+        results = {name: measure(fn, page) for name, fn in (("legacy", legacy_extract),
+                                                              ("snapshot", snapshot_extract))}
+        browser.close()
+
+    print(f"{'strategy':<10}{'elements':>10}{'round-trips':>14}{'seconds':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['elements']:>10}{r['round_trips']:>14}{r['seconds']:>10.3f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
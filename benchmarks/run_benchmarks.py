@@ -0,0 +1,190 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmark page-object hot paths against the local stand-in pages in benchmarks/fixtures.
+
+    python -m benchmarks.run_benchmarks -n 20 --out benchmarks/results/current.json
+    python -m benchmarks.run_benchmarks compare benchmarks/baseline.json benchmarks/results/current.json
+
+There is no shared baseline: timings depend on the machine. Record one on the machine that runs the
+gate with `-n 20 --out benchmarks/baseline.json` and re-record it when a slowdown is intended.
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+from urllib.parse import urljoin
+from playwright.sync_api import sync_playwright
+from config import BASE_URL, HEADLESS
+from pages.checkout_page import CheckoutPage
+from pages.inventory_page import InventoryPage
+from pages.login_page import LoginPage
+from utils import offline_site
+from utils.ipc_counter import count_round_trips
+from utils.smart_scroll import smart_scroll
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# Metrics checked by `compare`; a regression is current > baseline * (1 + threshold)
+GATED_METRICS = ("median_s", "round_trips")
+
+
+def _goto(path):
+    return lambda page: page.goto(urljoin(BASE_URL, path))
+
+
+# name -> (setup(page), run(page)); setup is not measured and runs before every iteration
+HOT_PATHS = {
+    "smart_scroll": (_goto("inventory.html"), lambda page: smart_scroll(page, back_to_top=True)),
+    "get_all_products": (_goto("inventory.html"), lambda page: InventoryPage(page).get_all_products()),
+    "add_all_items": (_goto("inventory.html"), lambda page: InventoryPage(page).add_all_items()),
+    "extract_login_page_structure": (_goto(""), lambda page: LoginPage(page).extract_login_page_structure()),
+    "extract_step_two_structure": (_goto("checkout-step-two.html"),
+                                   lambda page: CheckoutPage(page).extract_step_two_structure()),
+}
+
+
+# ------------------ Memory ------------------
+def _children(pid: int) -> list:
+    """Descendant pids (Linux /proc); empty elsewhere."""
+    if not os.path.isdir("/proc"):
+        return []
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                    # ppid is the second field after the parenthesised command name
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    found, frontier = [], [pid]
+    while frontier:
+        current = frontier.pop()
+        kids = [p for p, pp in parents.items() if pp == current]
+        found.extend(kids)
+        frontier.extend(kids)
+    return found
+
+
+def _vm_hwm_kb(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def peak_rss_kb() -> dict:
+    """
+    Peak resident set of this process and of the browser/driver processes it started, over their whole
+    lifetime, so it describes a run rather than one hot path. None where the platform has no counter.
+    """
+    own = None
+    if resource is not None:
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            own //= 1024  # bytes on macOS
+    return {"python_kb": own, "browser_kb": sum(_vm_hwm_kb(p) for p in _children(os.getpid())) or None}
+
+
+# ------------------ Run ------------------
+def run_benchmarks(iterations: int, only=None) -> dict:
+    results = {}
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=HEADLESS)
+        context = browser.new_context()
+        offline_site.install(context, fixture_dir=FIXTURE_DIR)
+        page = context.new_page()
+        for name, (setup, run) in HOT_PATHS.items():
+            if only and name not in only:
+                continue
+            setup(page)
+            run(page)  # warm-up
+            times, trips = [], []
+            for _ in range(iterations):
+                setup(page)
+                with count_round_trips() as ipc:
+                    start = time.perf_counter()
+                    run(page)
+                    times.append(time.perf_counter() - start)
+                trips.append(ipc["calls"])
+            results[name] = {
+                "iterations": iterations,
+                "median_s": statistics.median(times),
+                "mean_s": statistics.fmean(times),
+                "min_s": min(times),
+                "max_s": max(times),
+                "round_trips": statistics.median(trips),
+            }
+            print(f"{name:<32}{results[name]['median_s'] * 1000:>10.2f} ms{results[name]['round_trips']:>8.0f} round-trips")
+        memory = peak_rss_kb()
+        browser.close()
+    print(f"Peak RSS: python {memory['python_kb'] or '-'} kB, browser {memory['browser_kb'] or '-'} kB")
+    return {"created": datetime.datetime.now().isoformat(timespec="seconds"), "benchmarks": results,
+            "peak_rss_kb": memory}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Return human-readable regressions of GATED_METRICS beyond threshold (0.2 = 20%)."""
+    regressions = []
+    for name, base in baseline["benchmarks"].items():
+        now = current["benchmarks"].get(name)
+        if not now:
+            continue
+        for metric in GATED_METRICS:
+            if base.get(metric) and now.get(metric) is not None and now[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name}.{metric}: {base[metric]:.4g} -> {now[metric]:.4g} "
+                                   f"(+{(now[metric] / base[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "compare":
+        parser = argparse.ArgumentParser(prog="run_benchmarks compare")
+        parser.add_argument("baseline")
+        parser.add_argument("current")
+        parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative increase")
+        args = parser.parse_args(argv[1:])
+        if not os.path.isfile(args.baseline):
+            print(f"No baseline at {args.baseline}; record one with "
+                  f"python -m benchmarks.run_benchmarks -n 20 --out {args.baseline}")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print("No regressions" if not regressions else f"{len(regressions)} regression(s)")
+        return 1 if regressions else 0
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--only", nargs="*", choices=sorted(HOT_PATHS))
+    parser.add_argument("--out", help="JSON output path (default benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    data = run_benchmarks(args.iterations, args.only)
+    out = args.out or os.path.join(RESULTS_DIR, f"{datetime.datetime.now():%Y-%m-%d-%H-%M-%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"Results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
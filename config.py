@@ -11,4 +11,69 @@ USERS = {
     "problem_user": {"username": "problem_user", "password": "secret_sauce"},
     "performance_glitch_user": {"username": "performance_glitch_user", "password": "secret_sauce"},
 }
-SCREENSHOT_DIR = "screenshots"
\ No newline at end of file
+SCREENSHOT_DIR = "screenshots"
+# BaseTest screenshots: "failure", "sampled" (failures plus SCREENSHOT_SAMPLE_RATE of passes), "always" or "off"
+SCREENSHOT_MODE = "failure"
+SCREENSHOT_SAMPLE_RATE = 0.1
+SCREENSHOT_FORMAT = "jpeg"  # or "png"
+SCREENSHOT_QUALITY = 70     # jpeg only
+SCREENSHOT_FULL_PAGE = False
+SCREENSHOT_STORE_MAX_MB = 500  # least recently used screenshots are evicted beyond this
+SCREENSHOT_KEEP_REPORTS = 10   # ...except those linked from the newest reports in reports/
+
+# Authenticated session cache (storage_state per user and BASE_URL)
+AUTH_CACHE_DIR = ".auth"
+AUTH_CACHE_TTL = 9 * 60  # seconds; SauceDemo's session cookie lives ten minutes
+
+# Full pipeline: users run concurrently, one browser per worker thread
+PIPELINE_CONCURRENCY = 4
+
+# run_tests.py: worker processes (one browser each)
+TEST_WORKERS = 2
+
+# BaseTest: one browser per process and a pool of warm contexts (size 0 disables the pool)
+SHARE_BROWSER = True
+CONTEXT_POOL_SIZE = 2
+CONTEXT_MAX_USES = 20
+
+# Persistent browser server (python -m utils.browser_server start); tests fall back to launching
+REUSE_BROWSER_SERVER = True
+BROWSER_SERVER_PORT = 9222
+BROWSER_SERVER_FILE = ".browser_server.json"
+
+# Offline stand-in: serve recorded assets from disk (python -m utils.offline_site record)
+OFFLINE_MODE = False
+OFFLINE_FIXTURE_DIR = "fixtures/saucedemo"
+
+# HAR record/replay per test class: None, "record" or "replay"
+HAR_MODE = None
+HAR_DIR = "hars"
+HAR_MAX_AGE_DAYS = 7
+
+# Fast mode: stub images, drop fonts/media and third-party telemetry. Off by default because it
+# changes layout; non-visual test classes opt in with fast_mode = True (single tests opt out
+# with utils.resource_blocker.full_resources). True turns it on for every class.
+FAST_MODE = False
+FAST_MODE_BLOCK_TYPES = ("image", "font", "media")
+FAST_MODE_BLOCK_PATTERNS = ("*google-analytics.com*", "*googletagmanager.com*", "*backtrace.io*")
+FAST_MODE_LEDGER = "cache/resource_ledger.json"
+
+# Browser-side navigation timing and Web Vitals observers in every context
+COLLECT_WEB_VITALS = True
+
+# Page-structure cache: one file per user and page plus an index of content hashes and fingerprints
+STRUCTURE_CACHE_DIR = "cache/structures"
+
+# run_tests.py: run only tests whose pages changed since the last passing run (--full runs everything)
+SELECTION_STATE_FILE = "cache/test_selection.json"
+
+# Step journal: every recorded step is appended to <JOURNAL_DIR>/<run>/<pid>.jsonl (reports are built from it)
+JOURNAL_DIR = "journals"
+JOURNAL_BUFFER_BYTES = 64 * 1024
+
+# Run history (utils.run_history): every report adds its per-step latency; a step is flagged when its mean
+# is more than HISTORY_Z_THRESHOLD deviations above its last HISTORY_BASELINE_RUNS runs
+HISTORY_DB = "reports/history.sqlite"
+HISTORY_BASELINE_RUNS = 10
+HISTORY_MIN_RUNS = 3
+HISTORY_Z_THRESHOLD = 3.0
@@ -1,13 +1,18 @@
 # pages/cart_page.py
 from playwright.sync_api import Page
 from utils.smart_scroll import smart_scroll
+from utils.state_seeding import open_with_cart
+from utils.web_vitals import WebVitalsMixin
+from utils.logging_helper import record_step
+from utils.batch_reader import query, read_batch
 from typing import List, Dict
 import time
 
 
-class CartPage:
-    def __init__(self, page: Page):
+class CartPage(WebVitalsMixin):
+    def __init__(self, page: Page, record_fn=None):
         self.page = page
+        self.record_fn = record_fn
         self.cart_items = page.locator(".cart_item")
         self.item_names = page.locator('[data-test="inventory-item-name"]')
         self.item_descriptions = page.locator('[data-test="inventory-item-desc"]')
@@ -84,19 +89,38 @@ class CartPage:
             return True
         return False
 
+    def open_seeded(self, items=None) -> bool:
+        """Open cart.html with the cart pre-filled through storage instead of UI clicks."""
+        open_with_cart(self.page, "cart.html", items)
+        self.page.wait_for_selector(".cart_list", timeout=3000)
+        return True
+
     # --- Page structure for caching ---
+    STRUCTURE_QUERIES = {
+        "items": query(".cart_item", count=True),
+        "names": query('[data-test="inventory-item-name"]', texts=True),
+        "descriptions": query('[data-test="inventory-item-desc"]', texts=True),
+        "prices": query('[data-test="inventory-item-price"]', texts=True),
+        "quantity_label": query('[data-test="cart-quantity-label"]', text=True),
+        "desc_label": query('[data-test="cart-desc-label"]', text=True),
+        "removed": query(".removed_cart_item", count=True),
+        "cart_link": query('[data-test="shopping-cart-link"]', count=True),
+    }
+
+    @record_step("extract cart page structure")
     def extract_cart_page_structure(self) -> Dict:
+        data = read_batch(self.page, self.STRUCTURE_QUERIES)
         return {
-            "items_count": self.cart_items.count(),
-            "item_names": self.get_item_names(),
-            "item_descriptions": self.get_item_descriptions(),
-            "item_prices": self.get_item_prices(),
-            "cart_quantity_label": self.get_cart_quantity_label(),
-            "cart_desc_label": self.get_cart_desc_label(),
-            "removed_items_count": self.get_removed_items_count(),
+            "items_count": data["items"]["count"],
+            "item_names": data["names"]["texts"],
+            "item_descriptions": data["descriptions"]["texts"],
+            "item_prices": data["prices"]["texts"],
+            "cart_quantity_label": data["quantity_label"]["text"],
+            "cart_desc_label": data["desc_label"]["text"],
+            "removed_items_count": data["removed"]["count"],
             "buttons": [
                 {"name": "continue_shopping", "locator": "[data-test='continue-shopping']"},
                 {"name": "checkout", "locator": "[data-test='checkout']"}
             ],
-            "shopping_cart_link_present": self.shopping_cart_link.count() > 0
+            "shopping_cart_link_present": data["cart_link"]["count"] > 0
         }
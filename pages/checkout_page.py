@@ -1,7 +1,13 @@
 # pages/checkout_page.py
 from playwright.sync_api import Page
+from utils.dom_snapshot import snapshot_elements
+from utils.state_seeding import open_with_cart
+from utils.web_vitals import WebVitalsMixin
 
-class CheckoutPage:
+# Fields stored per element by the full-page structure extractors.
+SNAPSHOT_STRUCTURE_FIELDS = ("tag", "text", "x", "y")
+
+class CheckoutPage(WebVitalsMixin):
     def __init__(self, page: Page):
         self.page = page
         # --- Step One Locators ---
@@ -18,6 +24,12 @@ class CheckoutPage:
         self.sel_item_total = ".summary_subtotal_label"
 
     # --- Step One ---
+    def open_step_one_seeded(self, items=None) -> bool:
+        """Start directly at checkout-step-one.html with a seeded cart."""
+        open_with_cart(self.page, "checkout-step-one.html", items)
+        self.page.wait_for_selector(self.sel_first, timeout=5000)
+        return True
+
     def at_step_one(self) -> bool:
         return self.page.locator(self.sel_first).is_visible()
 
@@ -98,19 +110,7 @@ class CheckoutPage:
        # ---------- Checkout Step Two ----------
     def extract_step_two_structure(self):
         """Extract all visible elements on Checkout Step Two page."""
-        elements = self.page.locator("body *:visible").all()
-        structure = []
-        for el in elements:
-            try:
-                structure.append({
-                    "tag": el.evaluate("el => el.tagName"),
-                    "text": el.inner_text().strip(),
-                    "x": el.bounding_box()["x"] if el.bounding_box() else None,
-                    "y": el.bounding_box()["y"] if el.bounding_box() else None,
-                })
-            except Exception:
-                continue
-        return structure
+        return snapshot_elements(self.page, fields=SNAPSHOT_STRUCTURE_FIELDS)
 
     def finish_checkout(self):
         """Click the finish button to complete checkout."""
@@ -119,19 +119,7 @@ class CheckoutPage:
         # ---------- Checkout Complete ----------
     def extract_complete_structure(self):
         """Extract all visible elements on Checkout Complete page."""
-        elements = self.page.locator("body *:visible").all()
-        structure = []
-        for el in elements:
-            try:
-                structure.append({
-                    "tag": el.evaluate("el => el.tagName"),
-                    "text": el.inner_text().strip(),
-                    "x": el.bounding_box()["x"] if el.bounding_box() else None,
-                    "y": el.bounding_box()["y"] if el.bounding_box() else None,
-                })
-            except Exception:
-                continue
-        return structure
+        return snapshot_elements(self.page, fields=SNAPSHOT_STRUCTURE_FIELDS)
 
     def back_to_home(self):
         """Click the Back Home button after checkout complete."""
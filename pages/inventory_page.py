@@ -2,52 +2,92 @@
 from playwright.sync_api import Page
 from utils.smart_scroll import smart_scroll
 from pages.cart_page import CartPage
+from utils.state_seeding import CART_STORAGE_KEY, cart_ids
+from utils.web_vitals import WebVitalsMixin
+from utils.logging_helper import record_step
+from utils.batch_reader import query, read_batch
+from utils.dom_snapshot import IS_VISIBLE_JS
+import json
 import time
 
+# Reads every inventory item in one evaluate: texts, add/remove button data-test and geometry.
+# Positions follow bounding_box(): null only for elements without a layout box (display: none).
+_CATALOG_JS = """
+(itemSelector) => Array.from(document.querySelectorAll(itemSelector), item => {
+    const isVisible = """ + IS_VISIBLE_JS + """;
+    const part = sel => item.querySelector(sel);
+    const text = el => el ? el.innerText.trim() : "";
+    const pos = el => {
+        if (!el || !el.getClientRects().length) return null;
+        const r = el.getBoundingClientRect();
+        return { x: r.x, y: r.y };
+    };
+    const name = part('[data-test="inventory-item-name"]');
+    const desc = part('[data-test="inventory-item-desc"]');
+    const price = part('[data-test="inventory-item-price"]');
+    const button = part('button[data-test^="add-to-cart"], button[data-test^="remove"]');
+    return [
+        text(name), text(desc), text(price),
+        button ? button.getAttribute("data-test") : null,
+        isVisible(button),
+        { name: pos(name), description: pos(desc), price: pos(price) },
+    ];
+})
+"""
+
+INVENTORY_ITEM_SELECTOR = '[data-test="inventory-item"]'
+
+
 class ProductItem:
-    def __init__(self, name_locator, desc_locator, price_locator=None, add_to_cart_locator=None):
-        self.name_locator = name_locator
-        self.desc_locator = desc_locator
-        self.price_locator = price_locator
-        self.add_to_cart_locator = add_to_cart_locator
+    """
+    Snapshot of one inventory item read by InventoryPage.get_all_products.
+    Values reflect the page at read time; the add-to-cart locator is only built when used.
+    """
+    __slots__ = ("page", "index", "name", "description", "price", "button_data_test",
+                 "button_visible", "positions", "_button")
+
+    def __init__(self, page, index, name, description="", price="", button_data_test=None,
+                 button_visible=False, positions=None):
+        self.page = page
+        self.index = index
+        self.name = name
+        self.description = description
+        self.price = price
+        self.button_data_test = button_data_test
+        self.button_visible = button_visible
+        self.positions = positions or {"name": None, "description": None, "price": None}
+        self._button = None
+
+    @property
+    def add_to_cart_locator(self):
+        """Lazy handle on this item's add/remove button, for actions like click()."""
+        if self._button is None and self.button_data_test:
+            self._button = self.page.locator(f'[data-test="{self.button_data_test}"]')
+        return self._button
 
     def get_name(self) -> str:
-        return self.name_locator.inner_text().strip()
+        return self.name
 
     def get_description(self) -> str:
-        return self.desc_locator.inner_text().strip() if self.desc_locator else ""
+        return self.description
 
     def get_price(self) -> str:
-        return self.price_locator.inner_text().strip() if self.price_locator else ""
+        return self.price
 
     def is_available(self) -> bool:
-        return self.add_to_cart_locator.is_visible() if self.add_to_cart_locator else True
+        return self.button_visible if self.button_data_test else True
 
     def get_positions(self) -> dict:
-        positions = {}
-        for key, locator in (("name", self.name_locator),
-                             ("description", self.desc_locator),
-                             ("price", self.price_locator)):
-            if locator:
-                box = locator.bounding_box()
-                positions[key] = {"x": box["x"], "y": box["y"]} if box else None
-            else:
-                positions[key] = None
-        return positions
+        return self.positions
 
     def is_add_to_cart(self) -> bool:
-        """
-        Check if the current button is still 'Add to cart'.
-        Uses the add_to_cart_locator directly — no root locator needed.
-        """
-        if not self.add_to_cart_locator:
-            return False
-        data_test = self.add_to_cart_locator.get_attribute("data-test")
-        return bool(data_test and data_test.startswith("add-to-cart"))
+        """Check if the button was still 'Add to cart' when the catalog was read."""
+        return bool(self.button_data_test and self.button_data_test.startswith("add-to-cart"))
 
-class InventoryPage:
-    def __init__(self, page: Page):
+class InventoryPage(WebVitalsMixin):
+    def __init__(self, page: Page, record_fn=None):
         self.page = page
+        self.record_fn = record_fn
         self.sort_dropdown = page.locator("[data-test='product-sort-container']")
         self.inventory_container = page.locator('[data-test="inventory-container"]')
         self.inventory_items = page.locator('[data-test="inventory-item-name"]')
@@ -76,21 +116,9 @@ class InventoryPage:
 
     # --- Products ---
     def get_all_products(self) -> list:
-        products = []
-        names = self.inventory_items.all()
-        descs = self.inventory_desc.all()
-        prices = self.inventory_prices.all() if self.inventory_prices.count() > 0 else [None]*len(names)
-        add_buttons = self.add_to_cart_buttons.all() if self.add_to_cart_buttons.count() > 0 else [None]*len(names)
-
-        for i, name_el in enumerate(names):
-            desc_el = descs[i] if i < len(descs) else None
-            #print(desc_el.inner_text())
-            price_el = prices[i] if i < len(prices) else None
-            #print(price_el.inner_text())
-            add_btn_el = add_buttons[i] if i < len(add_buttons) else None
-            #print(add_btn_el.inner_text())
-            products.append(ProductItem(name_el, desc_el, price_el, add_btn_el))
-        return products
+        """Read the whole catalog in a single round-trip."""
+        rows = self.page.evaluate(_CATALOG_JS, INVENTORY_ITEM_SELECTOR)
+        return [ProductItem(self.page, i, *row) for i, row in enumerate(rows)]
 
     # --- Positions ---
     def get_item_positions(self) -> dict:
@@ -104,7 +132,7 @@ class InventoryPage:
         self.get_open_cart.click()
         # Wait until at least 1 cart item is visible
         self.page.wait_for_selector(".cart_item, .cart_list", timeout=3000)
-        return CartPage(self.page)
+        return CartPage(self.page, self.record_fn)
 
     def click_menu(self) -> bool:
         try:
@@ -125,7 +153,7 @@ class InventoryPage:
         """Click 'Add to cart' for a product by name."""
         for product in self.get_all_products():
             if product.get_name() == product_name:
-                if product.is_available():
+                if product.is_available() and product.is_add_to_cart():
                     product.add_to_cart_locator.click()
                     return True
         return False
@@ -173,11 +201,29 @@ class InventoryPage:
 
 
 
+    # --- State seeding (no UI clicks) ---
+    def seed_cart(self, items=None) -> int:
+        """
+        Write the cart straight into localStorage; items are product names or ids, None means all.
+        The app picks it up on the next navigation. Use add_all_items when testing add-to-cart itself.
+        """
+        ids = cart_ids(items)
+        self.page.evaluate("([key, value]) => localStorage.setItem(key, value)",
+                           [CART_STORAGE_KEY, json.dumps(ids)])
+        return len(ids)
+
     # --- Full page structure for caching ---
+    STRUCTURE_QUERIES = {
+        "sort_dropdown": query("[data-test='product-sort-container']", visible=True),
+        "inventory_container": query('[data-test="inventory-container"]', visible=True),
+    }
+
+    @record_step("extract inventory page structure")
     def extract_inventory_page_structure(self) -> dict:
+        data = read_batch(self.page, self.STRUCTURE_QUERIES)
         structure = {
-            "sort_dropdown_visible": self.is_sort_dropdown_visible(),
-            "inventory_container_visible": self.is_inventory_container_visible(),
+            "sort_dropdown_visible": data["sort_dropdown"]["visible"],
+            "inventory_container_visible": data["inventory_container"]["visible"],
             "products": []
         }
         for product in self.get_all_products():
@@ -1,40 +1,11 @@
 from playwright.sync_api import Page
 from utils.smart_scroll import smart_scroll
-from functools import wraps
-
-
-def record_step(description):
-    """Decorator to wrap LoginPage methods for automatic step recording."""
-    def decorator(fn):
-        @wraps(fn)
-        def wrapper(self, *args, **kwargs):
-            step_desc = description or fn.__name__
-            try:
-                result = fn(self, *args, **kwargs)
-                if self.record_fn:
-                    self.record_fn({
-                        "name": step_desc,
-                        "ok": True,
-                        "details": {"args": args, "kwargs": kwargs, "result": result}
-                    })
-                return result
-            except Exception as e:
-                if self.record_fn:
-                    self.record_fn({
-                        "name": step_desc,
-                        "ok": False,
-                        "details": {
-                            "error": f"{e.__class__.__name__}: {e}",
-                            "args": args,
-                            "kwargs": kwargs
-                        }
-                    })
-                raise
-        return wrapper
-    return decorator
-
-
-class LoginPage:
+from utils.logging_helper import record_step
+from utils.batch_reader import query, read_batch
+from utils.web_vitals import WebVitalsMixin
+
+
+class LoginPage(WebVitalsMixin):
     """Page Object for the Login page with automatic step recording via decorator."""
 
     def __init__(self, page: Page, record_fn=None):
@@ -116,42 +87,52 @@ class LoginPage:
 
     @record_step("get error text")
     def get_error_text(self) -> str:
-        return self.error_message.inner_text() if self.error_visible() else ""
+        return self.error_message.inner_text() if self.error_message.is_visible() else ""
 
     # ------------------ Extract full page structure for caching ------------------
+    # Everything the structure needs, read in one round-trip (see utils.batch_reader)
+    STRUCTURE_QUERIES = {
+        "username": query("#user-name", attributes=("type", "placeholder", "class"), visible=True),
+        "password": query("#password", attributes=("type", "placeholder", "class"), visible=True),
+        "login": query("#login-button", attributes=("value",), text=True, visible=True),
+        "error": query("h3[data-test='error']", text=True, visible=True),
+    }
+
     @record_step("extract login page structure")
     def extract_login_page_structure(self):
+        data = read_batch(self.page, self.STRUCTURE_QUERIES)
+        username, password, login, error = data["username"], data["password"], data["login"], data["error"]
         return {
             "fields": [
                 {
                     "name": "username",
                     "locator": "#user-name",
-                    "type": self.get_username_type(),
-                    "placeholder": self.get_username_placeholder(),
-                    "classes": self.get_username_classes(),
-                    "visible": self.is_username_visible()
+                    "type": username["type"],
+                    "placeholder": username["placeholder"],
+                    "classes": username["class"],
+                    "visible": username["visible"]
                 },
                 {
                     "name": "password",
                     "locator": "#password",
-                    "type": self.get_password_type(),
-                    "placeholder": self.get_password_placeholder(),
-                    "classes": self.get_password_classes(),
-                    "visible": self.is_password_visible()
+                    "type": password["type"],
+                    "placeholder": password["placeholder"],
+                    "classes": password["class"],
+                    "visible": password["visible"]
                 },
             ],
             "buttons": [
                 {
                     "name": "login",
                     "locator": "#login-button",
-                    "value": self.get_login_button_value(),
-                    "text": self.get_login_button_text(),
-                    "visible": self.is_login_button_visible()
+                    "value": login["value"],
+                    "text": login["text"],
+                    "visible": login["visible"]
                 }
             ],
             "error_message": {
                 "locator": "h3[data-test='error']",
-                "text": self.get_error_text(),
-                "visible": self.error_visible()
+                "text": error["text"] if error["visible"] else "",
+                "visible": error["visible"]
             }
         }
@@ -0,0 +1,430 @@
+# run_tests.py
+"""
+Run the unittest suite across worker processes, each with its own browser.
+
+    python run_tests.py                      # all tests, config.TEST_WORKERS processes
+    python run_tests.py -w 4 -k checkout     # only test ids containing "checkout"
+    python run_tests.py --shard 2/3          # the second of three deterministic shards
+    python run_tests.py --full               # ignore page fingerprints and run every selected test
+    python run_tests.py --no-history         # plain round-robin instead of the duration-aware schedule
+    python run_tests.py merge reports/a/results.json reports/b/results.json
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import statistics
+import sys
+import time
+import unittest
+import zlib
+import config
+from utils import change_selection, har_replay, step_journal
+from utils.context_pool import format_stats
+from utils.report_generator import generate_full_pipeline_report
+
+RESULTS_FILE = "results.json"
+JOURNAL_SUBDIR = "journal"
+HISTORY_RUNS = 5  # previous results.json files read for per-test durations and class overhead
+
+
+# ------------------- Discovery, sharding, assignment -------------------
+def discover(start_dir: str = "tests", pattern: str = "test_*.py") -> list:
+    """Sorted ids of every test method under start_dir (a namespace package, so no unittest discover)."""
+    modules = sorted(
+        f"{start_dir.replace(os.sep, '.')}.{os.path.splitext(os.path.basename(path))[0]}"
+        for path in glob.glob(os.path.join(start_dir, pattern))
+    )
+    suite = unittest.defaultTestLoader.loadTestsFromNames(modules)
+    ids = []
+
+    def walk(s):
+        for t in s:
+            if isinstance(t, unittest.TestSuite):
+                walk(t)
+            else:
+                ids.append(t.id())
+    walk(suite)
+    return sorted(ids)
+
+
+def parse_shard(text: str) -> tuple:
+    index, total = (int(p) for p in text.split("/"))
+    if not 1 <= index <= total:
+        raise argparse.ArgumentTypeError(f"shard must be i/n with 1 <= i <= n, got {text}")
+    return index, total
+
+
+def in_shard(test_id: str, index: int, total: int) -> bool:
+    """Stable across machines and runs: a test stays in its shard when others are added."""
+    return zlib.crc32(test_id.encode("utf-8")) % total == index - 1
+
+
+def assign(test_ids: list, workers: int) -> list:
+    """Round-robin over sorted ids; each worker's list stays sorted so class setup runs once per class."""
+    buckets = [[] for _ in range(workers)]
+    for i, test_id in enumerate(test_ids):
+        buckets[i % workers].append(test_id)
+    return [b for b in buckets if b]
+
+
+def by_class(test_ids: list) -> dict:
+    """class id (test id without the method) -> its test ids, in the given order."""
+    classes = {}
+    for test_id in test_ids:
+        classes.setdefault(test_id.rsplit(".", 1)[0], []).append(test_id)
+    return classes
+
+
+def _past_results(report_root: str, runs: int):
+    """The newest `runs` results.json files under report_root, parsed; unreadable ones are skipped."""
+    paths = sorted(glob.glob(os.path.join(report_root, "*", RESULTS_FILE)), reverse=True)[:runs]
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def past_durations(report_root: str = "reports", runs: int = HISTORY_RUNS) -> dict:
+    """test id -> median duration (s) over the newest `runs` results.json files under report_root."""
+    seen = {}
+    for data in _past_results(report_root, runs):
+        for o in data.get("outcomes", []):
+            if o.get("status") in ("ok", "FAIL", "ERROR") and o.get("duration") is not None:
+                seen.setdefault(o["test_id"], []).append(o["duration"])
+    return {test_id: statistics.median(values) for test_id, values in seen.items()}
+
+
+def past_class_overhead(report_root: str = "reports", runs: int = HISTORY_RUNS) -> dict:
+    """class id -> median setUpClass + tearDownClass time (s) over the newest `runs` results.json files."""
+    seen = {}
+    for data in _past_results(report_root, runs):
+        for c in data.get("classes", []):
+            seen.setdefault(c["class_id"], []).append(c["setup"] + c["teardown"])
+    return {class_id: statistics.median(values) for class_id, values in seen.items()}
+
+
+def schedule(test_ids: list, workers: int, durations: dict, overhead: dict = None) -> tuple:
+    """
+    Longest-processing-time-first over whole classes, so a class's setUpClass runs on one worker
+    only: a class weighs its tests' durations plus its setup/teardown time (overhead, class id -> s)
+    and goes, heaviest first, to the least loaded worker. Classes with a test without history are
+    units that idle workers take from a shared list (work stealing). Missing durations and overheads
+    are predicted at the median of the known ones.
+
+    Returns:
+        (per-worker sorted test ids, steal units, predicted makespan in seconds)
+    """
+    overhead = overhead or {}
+    classes = by_class(test_ids)
+    known_tests = [durations[t] for t in test_ids if t in durations]
+    guess = statistics.median(known_tests) if known_tests else 0.0
+    known_overhead = [overhead[c] for c in classes if c in overhead]
+    guess_overhead = statistics.median(known_overhead) if known_overhead else 0.0
+    weights = {c: overhead.get(c, guess_overhead) + sum(durations.get(t, guess) for t in ids)
+               for c, ids in classes.items()}
+
+    loads = [0.0] * workers
+    buckets = [[] for _ in range(workers)]
+    known = [c for c, ids in classes.items() if all(t in durations for t in ids)]
+    for class_id in sorted(known, key=lambda c: (-weights[c], c)):
+        i = loads.index(min(loads))
+        buckets[i].extend(classes[class_id])
+        loads[i] += weights[class_id]
+
+    # Stolen by whichever worker is free first; predicted on the least loaded one
+    units = [c for c in classes if c not in known]
+    for class_id in units:
+        i = loads.index(min(loads))
+        loads[i] += weights[class_id]
+    # An empty bucket is still a worker when there are units to steal
+    buckets = [sorted(b) for b in buckets if b or units]
+    return buckets, [classes[c] for c in units], max(loads) if loads else 0.0
+
+
+# ------------------- Worker process -------------------
+class _StreamingResult(unittest.TestResult):
+    """
+    Pushes one event per finished test to the parent instead of buffering until the end.
+    Test durations exclude class setup and teardown; run_class() reports those per class.
+    """
+
+    def __init__(self, events, worker_id):
+        super().__init__()
+        self.events = events
+        self.worker_id = worker_id
+        self._started = {}
+        self._first_start = self._last_stop = None
+
+    def run_class(self, loader, test_ids):
+        """Run one class's tests as their own suite and report its setUpClass/tearDownClass time."""
+        suite = loader.loadTestsFromNames(test_ids)
+        self._first_start = self._last_stop = None
+        start = time.perf_counter()
+        suite.run(self)  # a top-level run tears the class down before returning
+        end = time.perf_counter()
+        setup = (self._first_start or end) - start
+        teardown = end - (self._last_stop or end)
+        self.events.put(("class", self.worker_id, test_ids[0].rsplit(".", 1)[0], setup, teardown))
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+        if self._first_start is None:
+            self._first_start = self._started[test.id()]
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self._last_stop = time.perf_counter()
+
+    def _emit(self, test, status, message=""):
+        duration = time.perf_counter() - self._started.pop(test.id(), time.perf_counter())
+        self.events.put(("test", self.worker_id, test.id(), status, duration, message))
+
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._emit(test, "ok")
+
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._emit(test, "FAIL", self._exc_info_to_string(err, test))
+
+    def addError(self, test, err):
+        super().addError(test, err)
+        self._emit(test, "ERROR", self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        self._emit(test, "skipped", reason)
+
+
+def _worker(worker_id, test_ids, events, units=(), next_unit=None):
+    """
+    Run test_ids class by class, then take units (one class's test ids) by index from the shared
+    counter next_unit until none are left. Steps go to this process's file in the run's journal
+    (inherited STEP_JOURNAL_DIR).
+    """
+    from tests.base_test import BaseTest, close_shared
+
+    BaseTest.report_per_class = False
+    result = _StreamingResult(events, worker_id)
+    loader = unittest.defaultTestLoader
+    try:
+        for class_ids in by_class(test_ids).values():
+            result.run_class(loader, class_ids)
+        while next_unit is not None:
+            with next_unit.get_lock():
+                index = next_unit.value
+                next_unit.value += 1
+            if index >= len(units):
+                break
+            result.run_class(loader, units[index])
+    finally:
+        # multiprocessing children skip atexit, so close the journal and shared browser explicitly
+        step_journal.current().close()
+        try:
+            stats = close_shared()
+        except Exception as e:
+            print(f"[w{worker_id}] closing the shared browser failed: {e}", flush=True)
+            stats = None
+        if stats:
+            events.put(("pool", worker_id, stats))
+        events.put(("done", worker_id))
+
+
+# ------------------- Change-driven selection -------------------
+def current_fingerprints() -> dict:
+    from playwright.sync_api import sync_playwright
+    from utils.browser_server import connect_or_launch
+
+    with sync_playwright() as pw:
+        browser = connect_or_launch(pw)
+        try:
+            return change_selection.fingerprint_pages(browser)
+        finally:
+            browser.close()
+
+
+def select_changed(test_ids: list, state: dict, fingerprints: dict) -> list:
+    """Keep tests that visit a changed page (or whose pages are unknown) and print the rest."""
+    changed = change_selection.changed_pages(state["fingerprints"], fingerprints)
+    selected, skipped = change_selection.select(test_ids, state, changed)
+    if state["fingerprints"]:
+        print(f"Changed pages: {', '.join(sorted(changed)) or 'none'}")
+    for test_id, reason in skipped:
+        print(f"skip {test_id} ({reason})")
+    if skipped:
+        print(f"Skipped {len(skipped)} of {len(test_ids)} tests; use --full to run them\n", flush=True)
+    return selected
+
+
+def run(test_ids: list, workers: int, report_root: str = "reports", selection: tuple = None,
+        use_history: bool = True) -> int:
+    """
+    selection: (state, fingerprints, all test ids) to update config.SELECTION_STATE_FILE after the run;
+               fingerprints None means they are taken after the run (--full).
+    use_history: schedule longest-first from earlier results.json durations (see schedule) instead of round-robin.
+    """
+    # Workers journal into the report directory, so a crashed run still leaves its steps there
+    timestamp_dir = time.strftime("%Y-%m-%d-%H-%M-%S")
+    report_dir = os.path.join(report_root, timestamp_dir)
+    os.environ[step_journal.ENV_VAR] = os.path.join(report_dir, JOURNAL_SUBDIR)
+    if config.HAR_MODE == "record":
+        har_replay.clear_recordings()
+    ctx = multiprocessing.get_context("spawn")
+    events = ctx.Queue()
+    if use_history:
+        durations, overhead = past_durations(report_root), past_class_overhead(report_root)
+        classes = len(by_class(test_ids))
+        buckets, units, predicted = schedule(test_ids, min(workers, classes), durations, overhead)
+        print(f"Scheduled {classes - len(units)} classes longest-first from history, "
+              f"{len(units)} without history as shared units; predicted makespan {predicted:.2f}s", flush=True)
+    else:
+        buckets, units, predicted = assign(test_ids, workers), [], None
+    next_unit = ctx.Value("i", 0)
+    procs = [ctx.Process(target=_worker, args=(i, ids, events, units, next_unit), daemon=True)
+             for i, ids in enumerate(buckets)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+
+    outcomes, classes, pool_stats, finished = [], [], [], set()
+    while len(finished) < len(procs):
+        try:
+            kind, worker_id, *payload = events.get(timeout=1)
+        except queue.Empty:
+            # A worker that died without reporting (crash, kill) must not hang the run
+            for i, p in enumerate(procs):
+                if i not in finished and p.exitcode is not None:
+                    print(f"[w{i}] worker exited with code {p.exitcode} before finishing", flush=True)
+                    outcomes.append({"test_id": f"worker-{i}", "worker": i, "status": "ERROR",
+                                     "duration": 0.0, "message": f"exit code {p.exitcode}"})
+                    finished.add(i)
+            continue
+        if kind == "done":
+            finished.add(worker_id)
+            continue
+        if kind == "pool":
+            pool_stats.append(payload[0])
+            continue
+        if kind == "class":
+            class_id, setup, teardown = payload
+            classes.append({"class_id": class_id, "worker": worker_id, "setup": setup, "teardown": teardown})
+            continue
+        test_id, status, duration, message = payload
+        outcomes.append({"test_id": test_id, "worker": worker_id, "status": status,
+                         "duration": duration, "message": message})
+        print(f"[w{worker_id}] {test_id} ... {status} ({duration:.2f}s)", flush=True)
+    for p in procs:
+        p.join()
+    if config.HAR_MODE == "record":
+        # Workers only write part files (<Class>/<pid>-<test>.har); one class can span several of them
+        for class_name, count in har_replay.merge_recordings().items():
+            print(f"Recorded {count} requests into {har_replay.har_path(class_name)}")
+
+    wall = time.perf_counter() - start
+    failed = [o for o in outcomes if o["status"] in ("FAIL", "ERROR")]
+    print(f"\nRan {len(outcomes)} tests on {len(procs)} workers in {wall:.2f}s, {len(failed)} failed")
+    busy = [sum(o["duration"] for o in outcomes if o["worker"] == i)
+            + sum(c["setup"] + c["teardown"] for c in classes if c["worker"] == i) for i in range(len(procs))]
+    if busy:
+        prediction = f"predicted {predicted:.2f}s, " if predicted is not None else ""
+        print(f"Makespan: {prediction}actual {max(busy):.2f}s in tests and class setup ({wall:.2f}s wall); "
+              f"per worker: {', '.join(f'w{i} {b:.2f}s' for i, b in enumerate(busy))}")
+    if pool_stats:
+        total = {key: sum(stats[key] for stats in pool_stats) for key in pool_stats[0]}
+        print(f"{format_stats(total)} over {len(pool_stats)} workers")
+    for o in failed:
+        print(f"\n{o['status']}: {o['test_id']}\n{o['message']}")
+
+    journal_dir = os.environ[step_journal.ENV_VAR]
+    user_data = step_journal.user_data(journal_dir)
+    generate_full_pipeline_report(user_data, report_root=report_root, timestamp_dir=timestamp_dir,
+                                  run_key=os.path.abspath(journal_dir))
+    with open(os.path.join(report_dir, RESULTS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"outcomes": outcomes, "classes": classes, "journal": JOURNAL_SUBDIR, "wall_time": wall,
+                   "predicted_makespan": predicted, "worker_busy": busy}, f, default=str)
+
+    if selection:
+        state, fingerprints, all_ids = selection
+        if fingerprints is None:
+            try:
+                fingerprints = current_fingerprints()
+            except Exception as e:
+                print(f"Could not fingerprint pages, keeping the stored fingerprints: {e}")
+                fingerprints = {}
+        state["test_pages"].update(change_selection.learn_test_pages(user_data, test_ids))
+        passed = {o["test_id"] for o in outcomes if o["status"] == "ok"}
+        change_selection.advance(state, fingerprints, all_ids, passed)
+        change_selection.save_state(state)
+    return 1 if failed else 0
+
+
+def merge(paths: list, report_root: str = "reports") -> int:
+    """Combine results.json files (and the journals next to them) from several shards into one report."""
+    outcomes, classes, journals = [], [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        outcomes.extend(data.get("outcomes", []))
+        classes.extend(data.get("classes", []))
+        if "journals" in data:  # an earlier merge
+            journals.extend(data["journals"])
+        else:
+            journals.append(os.path.join(os.path.dirname(path), data.get("journal", JOURNAL_SUBDIR)))
+    # Each shard added its own run to the latency history already
+    report_dir = generate_full_pipeline_report(step_journal.user_data(journals), report_root=report_root,
+                                               history_db=None)
+    with open(os.path.join(report_dir, RESULTS_FILE), "w", encoding="utf-8") as f:
+        json.dump({"outcomes": outcomes, "classes": classes, "journals": [os.path.abspath(j) for j in journals]},
+                  f, default=str)
+    return 1 if any(o["status"] in ("FAIL", "ERROR") for o in outcomes) else 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "merge":
+        parser = argparse.ArgumentParser(prog="run_tests.py merge", description=merge.__doc__)
+        parser.add_argument("results", nargs="+", help=f"{RESULTS_FILE} files written by shard runs")
+        parser.add_argument("--report-root", default="reports")
+        args = parser.parse_args(argv[1:])
+        return merge(args.results, args.report_root)
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-w", "--workers", type=int, default=config.TEST_WORKERS)
+    parser.add_argument("-k", dest="keyword", help="only run test ids containing this text")
+    parser.add_argument("--shard", type=parse_shard, help="i/n: run only the i-th of n shards")
+    parser.add_argument("--report-root", default="reports")
+    parser.add_argument("--full", action="store_true", help="run every test even if its pages are unchanged")
+    parser.add_argument("--no-history", action="store_true",
+                        help="assign tests round-robin instead of longest-first from past durations")
+    args = parser.parse_args(argv)
+
+    test_ids = all_ids = discover()
+    if args.keyword:
+        test_ids = [t for t in test_ids if args.keyword in t]
+    if args.shard:
+        test_ids = [t for t in test_ids if in_shard(t, *args.shard)]
+
+    # --full runs everything, so pages are only fingerprinted after the run, to update the stored state
+    selection = (change_selection.load_state(), None, all_ids)
+    if not args.full:
+        try:
+            selection = (selection[0], current_fingerprints(), all_ids)
+        except Exception as e:
+            print(f"Could not fingerprint pages, running without change-driven selection: {e}")
+            selection = None
+    if selection and selection[1] is not None:
+        test_ids = select_changed(test_ids, *selection[:2])
+    if not test_ids:
+        print("No tests selected")
+        return 0
+    return run(test_ids, max(1, args.workers), args.report_root, selection, use_history=not args.no_history)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,50 @@
+import atexit
 import os
 import unittest
 from playwright.sync_api import sync_playwright
-from config import HEADLESS, SCREENSHOT_DIR
+from config import SCREENSHOT_DIR, SHARE_BROWSER, CONTEXT_POOL_SIZE, HAR_MODE, FAST_MODE
 from utils.report_generator import generate_full_pipeline_report
+from utils.auth_cache import login_storage_state
+from utils.context_pool import ContextPool, format_stats
+from utils.context_setup import prepare_context
+from utils.browser_server import connect_or_launch
+from utils import har_replay, screenshots, step_journal
+from utils.resource_blocker import ResourceLedger
+
+# Browser and context pool shared by every test class of this process (config.SHARE_BROWSER)
+_shared = {}
+
+
+def _shared_browser():
+    if not _shared:
+        pw = sync_playwright().start()
+        browser = connect_or_launch(pw)
+        _shared.update(pw=pw, browser=browser, pool=ContextPool(browser) if CONTEXT_POOL_SIZE else None)
+        atexit.register(_close_at_exit)
+    return _shared["pw"], _shared["browser"], _shared["pool"]
+
+
+def close_shared():
+    """
+    Close this process's shared pool and browser, if any, and return the pool's stats (None without one).
+    run_tests.py workers call it themselves: multiprocessing children skip atexit.
+    """
+    if not _shared:
+        return None
+    pool = _shared.get("pool")
+    stats = dict(pool.stats) if pool else None
+    if pool:
+        pool.close()
+    _shared["browser"].close()
+    _shared["pw"].stop()
+    _shared.clear()
+    return stats
+
+
+def _close_at_exit():
+    stats = close_shared()
+    if stats:
+        print(format_stats(stats))
 
 
 class BaseTest(unittest.TestCase):
@@ -10,55 +52,198 @@ class BaseTest(unittest.TestCase):
     Uses a class-level browser to avoid Windows asyncio issues.
     Provides utilities like visibility checks, smart scrolling,
     caching, screenshot-on-failure, and step collection for reports.
+
+    Set `login_as` to a key of config.USERS to start every test already
+    authenticated (session cached on disk by utils.auth_cache).
+    Classes that drive their own browsers set `uses_page = False` and get
+    no per-test context or page; they list the app pages they reach in
+    `visited_pages` (utils.change_selection.PAGES names) for run_tests.py.
+
+    With config.HAR_MODE = "record" each class writes hars/<Class>.har;
+    with "replay" every request of the test contexts is answered from it and
+    misses are reported. The login behind `login_as` is not part of the HAR:
+    utils.auth_cache still logs in over the network when its cached session
+    is missing or expired.
     """
 
+    login_as = None
+    uses_page = True
+    visited_pages = ()
+    # Fast mode per class (non-visual classes set True; config.FAST_MODE is the default);
+    # single tests opt out with @full_resources
+    fast_mode = FAST_MODE
+    # Steps go to the step journal; run_tests.py turns this off and builds one report for the whole run
+    report_per_class = True
+
     # ------------------- Class-level setup/teardown -------------------
     @classmethod
     def setUpClass(cls):
         os.path.isdir(SCREENSHOT_DIR)
-        cls._pw = sync_playwright().start()
-        cls._browser = cls._pw.chromium.launch(headless=HEADLESS)
-        cls.all_steps = []  # accumulator for all steps across tests
+        if SHARE_BROWSER:
+            cls._pw, cls._browser, cls._pool = _shared_browser()
+        else:
+            cls._pw = sync_playwright().start()
+            cls._browser = connect_or_launch(cls._pw)
+            cls._pool = ContextPool(cls._browser) if CONTEXT_POOL_SIZE else None
+        if HAR_MODE:
+            # HAR recording is flushed when a context closes, so HAR runs use fresh contexts
+            cls._pool = None
+        if HAR_MODE == "replay":
+            stale = har_replay.staleness(har_replay.har_path(cls.__name__))
+            if stale:
+                print(f"HAR for {cls.__name__} needs re-recording (HAR_MODE = 'record'): {stale}")
+        cls._har_parts = []
+        if not cls.uses_page:
+            cls._pool = None
+        if cls._pool:
+            cls._pool.prewarm(storage_state=cls._storage_state(cls.login_as), fast_mode=cls.fast_mode)
+        cls._ledger = ResourceLedger() if cls.fast_mode else None
 
     @classmethod
     def tearDownClass(cls):
-        # generate full pipeline report at the end of all tests
-        if cls.all_steps:
-            user_data = {cls.__name__: {"steps": [s for t in cls.all_steps for s in t["steps"]]}}
-            generate_full_pipeline_report(user_data, report_root="reports")
-        cls._browser.close()
-        cls._pw.stop()
+        # screenshots referenced by the steps must be on disk before the report is built
+        screenshots.writer.flush()
+        journal = step_journal.current()
+        journal.flush()
+        # generate full pipeline report at the end of all tests, streamed back from this class's journal records
+        if cls.report_per_class:
+            user_data = journal.user_data([cls.__name__])
+            if user_data:
+                generate_full_pipeline_report(user_data, report_root="reports",
+                                              run_key=os.path.abspath(step_journal.run_dir()))
+        if cls._ledger:
+            cls._ledger.save()
+        # Under run_tests.py a class may span workers; the parent merges every part after the run
+        if HAR_MODE == "record" and cls._har_parts and cls.report_per_class:
+            count = har_replay.merge_hars(cls._har_parts, har_replay.har_path(cls.__name__))
+            har_replay.discard_parts(cls.__name__, parts=cls._har_parts)
+            print(f"Recorded {count} requests into {har_replay.har_path(cls.__name__)}")
+        if not SHARE_BROWSER:
+            if cls._pool:
+                print(cls._pool.report())
+                cls._pool.close()
+            cls._browser.close()
+            cls._pw.stop()
+
+    @classmethod
+    def _storage_state(cls, user_key):
+        return login_storage_state(cls._browser, user_key) if user_key else None
+
+    @classmethod
+    def new_context(cls, user_key=None, **kwargs):
+        """New browser context, already logged in as user_key when given."""
+        storage_state = cls._storage_state(user_key)
+        if storage_state:
+            kwargs["storage_state"] = storage_state
+        return prepare_context(cls._browser.new_context(**kwargs), fast_mode=cls.fast_mode)
+
+    def _record_fast_mode(self):
+        """Fast-mode tests report what they skipped; full-resource tests feed the ledger."""
+        perf = None
+        if self.page.url.startswith("http"):
+            try:
+                perf = self._ledger.measure(self.page)
+            except Exception:
+                pass
+        if self._blocker.enabled:
+            summary = self._ledger.summary(self._blocker.take_blocked(), perf)
+            self.record_fn({"name": "fast mode", "ok": True, "details": summary})
+        elif perf:
+            self._ledger.observe(perf)
 
     # ------------------- Per-test setup/teardown -------------------
     def setUp(self):
-        self.context = self._browser.new_context()
-        self.page = self.context.new_page()
+        self._har_missed = []
+        # Steps go to the journal as they are recorded, so a crash keeps what the test got through
+        self.record_fn = self._journal_step  # callback for page objects
+        self.screenshot_dir = SCREENSHOT_DIR
+        if not self.uses_page:
+            self.context = self.page = self._blocker = None
+            return
+        if self._pool:
+            self.context, self.page = self._pool.acquire(self._storage_state(self.login_as), self.fast_mode)
+        elif HAR_MODE == "record":
+            path = har_replay.part_path(self.__class__.__name__, self._testMethodName)
+            self._har_parts.append(path)
+            self.context = self.new_context(self.login_as, **har_replay.record_context_kwargs(path))
+            self.page = self.context.new_page()
+        else:
+            self.context = self.new_context(self.login_as)
+            if HAR_MODE == "replay":
+                har_replay.install_replay(self.context, har_replay.har_path(self.__class__.__name__),
+                                          self._har_missed)
+                blocker = getattr(self.context, "resource_blocker", None)
+                if blocker:
+                    # Registered again after the HAR routes so fast mode still sees requests first
+                    blocker.install(self.context)
+            self.page = self.context.new_page()
+
+        self._blocker = getattr(self.context, "resource_blocker", None)
+        if self._blocker:
+            test_fn = getattr(self, self._testMethodName)
+            self._blocker.enabled = self.fast_mode and not getattr(test_fn, "full_resources", False)
+            self._blocker.take_blocked()
+
+        # Main-frame URLs, reported so run_tests.py can learn which pages each test visits
+        self._visited = []
+        self._nav_listener = self._on_navigated
+        self.page.on("framenavigated", self._nav_listener)
 
         # Directory for screenshots
-        self.screenshot_dir = SCREENSHOT_DIR
         os.makedirs(self.screenshot_dir, exist_ok=True)
 
         # Initialize standard user cache
         self._standard_cache = {}
 
-        # Per-test step collection
-        self.steps = []
-        self.record_fn = self.steps.append  # callback for page objects
+    def _on_navigated(self, frame):
+        if frame == self.page.main_frame and frame.url not in self._visited:
+            self._visited.append(frame.url)
 
-    def tearDown(self):
-        # Record this test's steps in class-level list
-        self.__class__.all_steps.append({
-            "test_name": self._testMethodName,
-            "steps": self.steps
-        })
-
-        # Screenshot on failure (or always)
-        name = f"{self.__class__.__name__}.{self._testMethodName}.png"
-        path = os.path.join(self.screenshot_dir, name)
+    def _failed(self) -> bool:
+        """True once the test body (or one of its subTests) failed; valid inside tearDown."""
+        outcome = getattr(self, "_outcome", None)
+        if outcome is None:
+            return False
+        if hasattr(outcome, "errors"):  # Python < 3.11
+            return any(exc_info for _, exc_info in outcome.errors)
+        result = outcome.result
+        return any(getattr(test, "test_case", test) is self
+                   for test, _ in result.failures + result.errors)
+
+    def _take_screenshot(self):
+        """Capture per config.SCREENSHOT_MODE and record it as a "screenshot" step."""
+        if not screenshots.should_capture(self.id(), self._failed()):
+            return
         try:
-            self.page.screenshot(path=path, full_page=True)
+            shot = screenshots.capture(self.page)
         except Exception:
-            pass
+            return
+        self.record_fn({"name": "screenshot", "ok": True, "details": {}, **shot})
+
+    def tearDown(self):
+        if not self.uses_page:
+            if self.visited_pages:
+                self.record_fn({"name": "pages visited", "ok": True,
+                                "details": {"pages": list(self.visited_pages)}})
+            step_journal.current().flush()
+            return
+        self.page.remove_listener("framenavigated", self._nav_listener)
+        try:
+            self._take_screenshot()
+            if self._visited:
+                self.record_fn({"name": "pages visited", "ok": True, "details": {"urls": self._visited}})
+            if self._har_missed:
+                self.record_fn(har_replay.missed_step(self._har_missed))
+            if self._blocker:
+                self._record_fast_mode()
+            step_journal.current().flush()
         finally:
-            self.page.close()
-            self.context.close()
+            if self._pool:
+                self._pool.release(self.context)
+            else:
+                self.page.close()
+                self.context.close()
+
+    def _journal_step(self, step):
+        """Append one step of this test to the journal; nothing is kept in memory."""
+        step_journal.current().step(self.__class__.__name__, step, test_name=self._testMethodName)
@@ -0,0 +1,55 @@
+# tests/test_auth_cache.py
+import json
+import os
+import tempfile
+import time
+import unittest
+from utils import auth_cache
+
+
+class AuthCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = auth_cache.cache_path("standard_user", cache_dir=self.dir)
+
+    def _write(self, cookies=(), age=0.0):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"cookies": list(cookies), "origins": []}, f)
+        mtime = time.time() - age
+        os.utime(self.path, (mtime, mtime))
+
+    def test_cache_path_is_per_user_and_base_url(self):
+        other_url = auth_cache.cache_path("standard_user", base_url="http://localhost/", cache_dir=self.dir)
+        other_user = auth_cache.cache_path("problem_user", cache_dir=self.dir)
+        self.assertEqual(len({self.path, other_url, other_user}), 3)
+        self.assertEqual(os.path.dirname(self.path), self.dir)
+        self.assertTrue(os.path.basename(self.path).startswith("standard_user-"))
+
+    def test_is_fresh_honours_ttl(self):
+        self.assertFalse(auth_cache.is_fresh(self.path))  # missing
+        self._write(age=10)
+        self.assertTrue(auth_cache.is_fresh(self.path, ttl=60))
+        self._write(age=120)
+        self.assertFalse(auth_cache.is_fresh(self.path, ttl=60))
+
+    def test_is_fresh_rejects_expiring_cookies_and_bad_files(self):
+        self._write([{"name": "session", "expires": -1}, {"name": "later", "expires": time.time() + 3600}])
+        self.assertTrue(auth_cache.is_fresh(self.path, ttl=60))
+        self._write([{"name": "session", "expires": time.time() + 30}])
+        self.assertFalse(auth_cache.is_fresh(self.path, ttl=60))
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertFalse(auth_cache.is_fresh(self.path, ttl=60))
+
+    def test_invalidate_removes_file_and_remembered_path(self):
+        self._write()
+        auth_cache._session_paths[(auth_cache.config.BASE_URL, "standard_user")] = self.path
+        auth_cache.invalidate("standard_user", cache_dir=self.dir)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertNotIn((auth_cache.config.BASE_URL, "standard_user"), auth_cache._session_paths)
+        auth_cache.invalidate(cache_dir=self.dir)  # every user, nothing left to remove
+
+
+if __name__ == "__main__":
+    unittest.main()
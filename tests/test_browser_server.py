@@ -0,0 +1,83 @@
+# tests/test_browser_server.py
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import unittest
+from unittest import mock
+from utils import browser_server
+
+
+class BrowserServerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "server.json")
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.live = f"http://127.0.0.1:{self.listener.getsockname()[1]}"
+        with socket.socket() as s:  # a port nothing listens on
+            s.bind(("127.0.0.1", 0))
+            self.dead = f"http://127.0.0.1:{s.getsockname()[1]}"
+
+    def tearDown(self):
+        self.listener.close()
+
+    def _record(self, endpoint, pid=12345):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"endpoint": endpoint, "pid": pid, "started": 0}, f)
+
+    def _quiet(self, fn, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn(*args)
+
+    def test_status_reflects_state_file_and_listener(self):
+        self.assertEqual(self._quiet(browser_server.status, self.path), 1)
+        self._record(self.live)
+        self.assertEqual(self._quiet(browser_server.status, self.path), 0)
+        self._record(self.dead)
+        self.assertEqual(self._quiet(browser_server.status, self.path), 1)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{broken")
+        self.assertIsNone(browser_server.read_endpoint(self.path))
+
+    def test_stop_signals_recorded_pid_and_removes_state_file(self):
+        self.assertEqual(self._quiet(browser_server.stop, self.path), 0)  # nothing recorded
+        self._record(self.dead, pid=4242)
+        with mock.patch.object(browser_server.os, "kill") as kill:
+            self.assertEqual(self._quiet(browser_server.stop, self.path), 0)
+        kill.assert_called_once_with(4242, browser_server.signal.SIGTERM)
+        self.assertFalse(os.path.exists(self.path))
+
+    def _connect(self, info, connect=None):
+        pw = mock.Mock()
+        if connect is not None:
+            pw.chromium.connect_over_cdp.side_effect = connect
+        with mock.patch.object(browser_server.config, "REUSE_BROWSER_SERVER", True), \
+                mock.patch.object(browser_server, "read_endpoint", return_value=info):
+            return pw, browser_server.connect_or_launch(pw, headless=True)
+
+    def test_connects_to_a_listening_server(self):
+        pw, browser = self._connect({"endpoint": self.live, "pid": 1})
+        pw.chromium.connect_over_cdp.assert_called_once_with(self.live)
+        self.assertIs(browser, pw.chromium.connect_over_cdp.return_value)
+        pw.chromium.launch.assert_not_called()
+
+    def test_launches_when_no_server_is_listening(self):
+        for info in ({"endpoint": self.dead, "pid": 1}, None):
+            with self.subTest(info=info):
+                pw, browser = self._connect(info)
+                self.assertIs(browser, pw.chromium.launch.return_value)
+                pw.chromium.launch.assert_called_once_with(headless=True)
+                pw.chromium.connect_over_cdp.assert_not_called()
+
+    def test_launches_when_the_server_refuses_the_connection(self):
+        with self.assertLogs(level="WARNING"):
+            pw, browser = self._connect({"endpoint": self.live, "pid": 1}, connect=RuntimeError("refused"))
+        self.assertIs(browser, pw.chromium.launch.return_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_cache_user_structures.py
+from urllib.parse import urljoin
+import config
+from tests.base_test import BaseTest
+from pages.login_page import LoginPage
+from pages.inventory_page import InventoryPage
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+from utils.structure_cache import StructureCache, page_fingerprint
+
+# Order matters: each page is reached from the previous one
+CACHED_PAGES = ("login", "inventory", "cart", "checkout_step_one", "checkout_step_two", "checkout_complete")
+
+
+class CacheUserStructuresTests(BaseTest):
+    """Cache page structures for every user in config.USERS, re-extracting only pages whose fingerprint changed."""
+    uses_page = False  # every user gets its own context in _cache_user
+    visited_pages = CACHED_PAGES
+
+    def _reach(self, page, page_name) -> bool:
+        """Navigate to page_name from the page reached before it."""
+        if page_name == "login":
+            page.goto(config.BASE_URL)
+            return page.locator('[data-test="login-button"]').count() > 0
+        if page_name == "inventory":
+            page.goto(urljoin(config.BASE_URL, "inventory.html"))
+            return page.url.endswith("inventory.html")
+        if page_name == "cart":
+            return CartPage(page, record_fn=self.record_fn).open_seeded()
+        if page_name == "checkout_step_one":
+            return CartPage(page, record_fn=self.record_fn).go_to_checkout()
+        checkout = CheckoutPage(page)
+        if page_name == "checkout_step_two":
+            checkout.enter_info(checkout.first_name, checkout.last_name, checkout.postal_code)
+            checkout.click_continue()
+            return page.url.endswith("checkout-step-two.html")
+        checkout.finish_checkout()
+        return page.url.endswith("checkout-complete.html")
+
+    def _extract(self, page, page_name):
+        if page_name == "login":
+            return LoginPage(page, record_fn=self.record_fn).extract_login_page_structure()
+        if page_name == "inventory":
+            return InventoryPage(page, record_fn=self.record_fn).extract_inventory_page_structure()
+        if page_name == "cart":
+            return CartPage(page, record_fn=self.record_fn).extract_cart_page_structure()
+        checkout = CheckoutPage(page)
+        return {
+            "checkout_step_one": checkout.extract_step_one_structure,
+            "checkout_step_two": checkout.extract_step_two_structure,
+            "checkout_complete": checkout.extract_complete_structure,
+        }[page_name]()
+
+    def _cache_user(self, cache, user_key) -> list:
+        """Walk CACHED_PAGES as user_key; returns the page names that were cached."""
+        try:
+            context = self.new_context(user_key)
+            pages = CACHED_PAGES
+        except RuntimeError:
+            # Users that cannot log in (locked_out_user) only ever see the login page
+            context = self.new_context()
+            pages = CACHED_PAGES[:1]
+        blocker = getattr(context, "resource_blocker", None)
+        if blocker:
+            blocker.enabled = False  # cached structures include element positions
+
+        cached = []
+        page = context.new_page()
+        try:
+            for page_name in pages:
+                try:
+                    reached = self._reach(page, page_name)
+                except Exception as e:
+                    reached = False
+                    self.record_fn({"name": f"{user_key}: reach {page_name}", "ok": False,
+                                    "details": {"error": f"{e.__class__.__name__}: {e}"}})
+                if not reached:
+                    break  # later pages are only reachable through this one
+                before = cache.entry(user_key, page_name)
+                cache.refresh(user_key, page_name, page_fingerprint(page), lambda: self._extract(page, page_name))
+                after = cache.entry(user_key, page_name)
+                self.record_fn({"name": f"{user_key}: cache {page_name}", "ok": True, "details": {
+                    "refreshed": before is None or before["captured_at"] != after["captured_at"],
+                    "hash": after["hash"][:12],
+                }})
+                cached.append(page_name)
+        finally:
+            page.close()
+            context.close()
+        return cached
+
+    def test_cache_all_users_state(self):
+        cache = StructureCache()
+        try:
+            for user_key in config.USERS:
+                with self.subTest(user=user_key):
+                    cached = self._cache_user(cache, user_key)
+                    self.assertIn("login", cached, f"{user_key}: login page should always be cached")
+                    if user_key == "standard_user":
+                        self.assertEqual(list(CACHED_PAGES), cached, "standard_user should reach every page")
+        finally:
+            cache.save_index()
+        print(f"Structure cache updated at {cache.root}")
@@ -0,0 +1,53 @@
+# tests/test_change_selection.py
+import unittest
+from urllib.parse import urljoin
+import config
+from utils import change_selection
+
+CART = "tests.test_cart.CartTests.test_remove"
+LOGIN = "tests.test_login_page.LoginPageTests.test_valid_login"
+NEW = "tests.test_new.NewTests.test_new"
+
+
+class ChangeSelectionTests(unittest.TestCase):
+
+    def test_page_name_maps_app_routes_only(self):
+        self.assertEqual(change_selection.page_name(config.BASE_URL), "login")
+        self.assertEqual(change_selection.page_name(urljoin(config.BASE_URL, "checkout-step-two.html")),
+                         "checkout_step_two")
+        self.assertIsNone(change_selection.page_name("https://example.com/cart.html"))
+        self.assertIsNone(change_selection.page_name("about:blank"))
+
+    def test_learn_test_pages_from_step_urls(self):
+        user_data = {
+            "CartTests": {"steps": [
+                {"name": "open", "test_name": "test_remove", "url": urljoin(config.BASE_URL, "cart.html")},
+                {"name": "pages visited", "test_name": "test_remove",
+                 "details": {"urls": [config.BASE_URL, urljoin(config.BASE_URL, "inventory.html")]}},
+            ]},
+            "LoginPageTests": {"steps": [{"name": "fast mode", "test_name": "test_valid_login", "details": {}}]},
+            "NewTests": {"steps": [{"name": "pages visited", "test_name": "test_new",
+                                    "details": {"pages": ["checkout_complete", "nowhere"]}}]},
+        }
+        learned = change_selection.learn_test_pages(user_data, [CART, LOGIN, NEW])
+        self.assertEqual(learned, {CART: ["cart", "inventory", "login"], NEW: ["checkout_complete"]})
+
+    def test_select_skips_tests_on_unchanged_pages(self):
+        state = {"fingerprints": {"login": "a", "cart": "b"}, "test_pages": {CART: ["cart"], LOGIN: ["login"]}}
+        changed = change_selection.changed_pages(state["fingerprints"], {"login": "a", "cart": "c"})
+        selected, skipped = change_selection.select([CART, LOGIN, NEW], state, changed)
+        self.assertEqual(selected, [CART, NEW])
+        self.assertEqual(skipped, [(LOGIN, "unchanged: login")])
+
+    def test_select_runs_everything_without_stored_fingerprints(self):
+        state = {"fingerprints": {}, "test_pages": {LOGIN: ["login"]}}
+        self.assertEqual(change_selection.select([LOGIN], state, set()), ([LOGIN], []))
+
+    def test_advance_keeps_fingerprints_of_pages_with_failed_tests(self):
+        state = {"fingerprints": {"login": "a", "cart": "b"}, "test_pages": {CART: ["cart"], LOGIN: ["login"]}}
+        change_selection.advance(state, {"login": "x", "cart": "y"}, [CART, LOGIN, NEW], passed={LOGIN})
+        self.assertEqual(state["fingerprints"], {"login": "x", "cart": "b"})
+
+
+if __name__ == "__main__":
+    unittest.main()
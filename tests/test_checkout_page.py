@@ -5,10 +5,18 @@ from pages.checkout_page import CheckoutPage
 SPECIALS = ["!", "@", "/", "*", "\\", '"']
 
 class CheckoutPageTests(BaseTest):
+    fast_mode = True  # form filling only; no layout is read
 
     first_name = "John"
     last_name = "Doe" 
     postal_code = "12345"     
+
+    login_as = "standard_user"
+
+    def setUp(self):
+        super().setUp()
+        # Start straight at step one with a seeded cart
+        CheckoutPage(self.page).open_step_one_seeded()
     
     def test_checkout_fields_visible_and_fill(self,
             first_name: str = first_name,
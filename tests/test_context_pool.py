@@ -0,0 +1,179 @@
+# tests/test_context_pool.py
+import json
+import os
+import tempfile
+import unittest
+from utils.context_pool import RESET_PATH, ContextPool, format_stats
+
+
+class _Frame:
+    def __init__(self, url):
+        self.url = url
+
+
+class _Page:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+        self.main_frame = None
+        self.closed = False
+        self.evaluated = []  # (origin path, arg)
+        self._handlers = []
+
+    def on(self, event, handler):
+        self._handlers.append(handler)
+
+    def goto(self, url):
+        self.url = url
+        self.main_frame = _Frame(url)
+        for handler in self._handlers:
+            handler(self.main_frame)
+
+    def evaluate(self, js, arg=None):
+        self.evaluated.append((self.url, arg))
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+class _Context:
+    def __init__(self, storage_state=None):
+        self.storage_state = storage_state
+        self.pages = []
+        self.routes = []
+        self.init_scripts = []
+        self.cookies = []
+        self.closed = False
+        self._on_page = []
+
+    def route(self, pattern, handler):
+        self.routes.append(pattern)
+
+    def route_from_har(self, *args, **kwargs):
+        self.routes.append("har")
+
+    def unroute_all(self):
+        self.routes = []
+
+    def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    def on(self, event, handler):
+        self._on_page.append(handler)
+
+    def new_page(self):
+        page = _Page(self)
+        self.pages.append(page)
+        for handler in self._on_page:
+            handler(page)
+        return page
+
+    def clear_cookies(self):
+        self.cookies = []
+
+    def clear_permissions(self):
+        pass
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def close(self):
+        self.closed = True
+
+
+class _Browser:
+    def __init__(self):
+        self.contexts = []
+
+    def new_context(self, storage_state=None):
+        self.contexts.append(_Context(storage_state))
+        return self.contexts[-1]
+
+
+class ContextPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.browser = _Browser()
+        self.pool = ContextPool(self.browser, size=2, max_uses=3)
+
+    def _state_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "state.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"cookies": [{"name": "session-username", "value": "standard_user"}],
+                       "origins": [{"origin": "https://app.test",
+                                    "localStorage": [{"name": "cart-contents", "value": "[4]"}]}]}, f)
+        return path
+
+    def test_released_context_is_reused_for_the_same_state(self):
+        context, _ = self.pool.acquire()
+        self.pool.release(context)
+        again, _ = self.pool.acquire()
+        self.assertIs(again, context)
+        other, _ = self.pool.acquire(self._state_file())
+        self.assertIsNot(other, context)
+        self.assertEqual((self.pool.stats["hits"], self.pool.stats["misses"]), (1, 2))
+
+    def test_fast_mode_contexts_are_pooled_apart(self):
+        context, _ = self.pool.acquire(fast_mode=False)
+        self.pool.release(context)
+        self.assertIsNot(self.pool.acquire(fast_mode=True)[0], context)
+        self.assertIs(self.pool.acquire(fast_mode=False)[0], context)
+
+    def test_report_formats_summed_stats(self):
+        context, _ = self.pool.acquire()
+        self.pool.release(context)
+        self.pool.acquire()
+        self.assertIn("1 hits, 1 misses (50% hit rate)", self.pool.report())
+        total = {key: value * 2 for key, value in self.pool.stats.items()}
+        self.assertIn("2 hits, 2 misses (50% hit rate), 0 recycled, 2 resets", format_stats(total))
+
+    def test_dirty_and_worn_out_contexts_are_closed(self):
+        context, _ = self.pool.acquire()
+        context.add_init_script("window.x = 1")
+        self.pool.release(context)
+        self.assertTrue(context.closed)
+        fresh, _ = self.pool.acquire()
+        self.assertIsNot(fresh, context)
+        for _ in range(2):
+            self.pool.release(fresh)
+            self.assertIs(self.pool.acquire()[0], fresh)
+        self.pool.release(fresh)  # third use reached max_uses
+        self.assertTrue(fresh.closed)
+        self.assertEqual(self.pool.stats["recycled"], 2)
+
+    def test_reset_restores_cookies_and_local_storage_per_origin(self):
+        state = self._state_file()
+        context, page = self.pool.acquire(state)
+        page.goto("https://app.test/inventory.html")
+        page.goto("https://other.test/")
+        context.add_cookies([{"name": "leaked", "value": "1"}])
+        extra = context.new_page()
+        self.pool.release(context)
+
+        self.assertTrue(extra.closed)
+        self.assertEqual(page.evaluated, [
+            ("https://app.test" + RESET_PATH, [{"name": "cart-contents", "value": "[4]"}]),
+            ("https://other.test" + RESET_PATH, []),
+        ])
+        self.assertEqual([c["name"] for c in context.cookies], ["session-username"])
+        self.assertEqual(page.url, "about:blank")
+
+        # Only the state's origin is visited on the next reset
+        self.assertIs(self.pool.acquire(state)[0], context)
+        page.evaluated.clear()
+        self.pool.release(context)
+        self.assertEqual([url for url, _ in page.evaluated], ["https://app.test" + RESET_PATH])
+
+    def test_routes_added_by_a_test_are_dropped_on_reset(self):
+        context, _ = self.pool.acquire()
+        baseline = list(context.routes)
+        context.route("**/api/*", lambda route: None)
+        self.pool.release(context)
+        self.assertEqual(context.routes, baseline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# tests/test_har_replay.py
+import json
+import os
+import tempfile
+import unittest
+from utils import har_replay
+
+
+def _har(*urls):
+    return {"log": {"version": "1.2", "pages": [],
+                    "entries": [{"request": {"url": u}, "response": {"status": 200}} for u in urls]}}
+
+
+class HarReplayTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def _write(self, name, har):
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(har, f)
+        return path
+
+    def test_merge_concatenates_entries_and_skips_missing_parts(self):
+        a = self._write("a.har", _har("https://www.saucedemo.com/"))
+        b = self._write("b.har", _har("https://www.saucedemo.com/static/js/main.js"))
+        out = os.path.join(self.dir, "Class.har")
+        self.assertEqual(har_replay.merge_hars([a, os.path.join(self.dir, "gone.har"), b], out), 2)
+        self.assertIsNone(har_replay.staleness(out, base_url="https://www.saucedemo.com/"))
+
+    def test_merge_recordings_combines_parts_of_every_process(self):
+        for name, url in (("Login/101-test_a.har", "https://www.saucedemo.com/a"),
+                          ("Login/202-test_b.har", "https://www.saucedemo.com/b"),
+                          ("Cart/101-test_c.har", "https://www.saucedemo.com/c")):
+            os.makedirs(os.path.join(self.dir, os.path.dirname(name)), exist_ok=True)
+            self._write(name, _har(url))
+        self.assertEqual(har_replay.merge_recordings(self.dir), {"Cart": 1, "Login": 2})
+        self.assertEqual(sorted(os.listdir(self.dir)), ["Cart.har", "Login.har"])
+
+    def test_discarding_own_parts_keeps_other_processes_parts(self):
+        path = har_replay.part_path("Login", "test_a", har_dir=self.dir)
+        self.assertTrue(os.path.basename(path).startswith(f"{os.getpid()}-"))
+        os.makedirs(os.path.dirname(path))
+        mine = self._write(os.path.relpath(path, self.dir), _har())
+        theirs = self._write("Login/1-test_b.har", _har())
+        har_replay.discard_parts("Login", har_dir=self.dir, parts=[mine])
+        self.assertEqual(os.listdir(os.path.join(self.dir, "Login")), [os.path.basename(theirs)])
+        har_replay.discard_parts("Login", har_dir=self.dir, parts=[theirs])
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "Login")))
+
+    def test_staleness_reasons(self):
+        self.assertIn("does not exist", har_replay.staleness(os.path.join(self.dir, "x.har")))
+        other = self._write("other.har", _har("https://example.com/"))
+        self.assertIn("no requests", har_replay.staleness(other, base_url="https://www.saucedemo.com/"))
+        os.utime(other, (0, 0))
+        self.assertIn("days old", har_replay.staleness(other, max_age_days=1))
+
+    def test_only_app_origin_misses_fail_the_step(self):
+        step = har_replay.missed_step(["https://events.backtrace.io/x"], base_url="https://www.saucedemo.com/")
+        self.assertTrue(step["ok"])
+        step = har_replay.missed_step(["https://www.saucedemo.com/a.js"], base_url="https://www.saucedemo.com/")
+        self.assertFalse(step["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,14 @@
 # tests/test_login_page.py
 from tests.base_test import BaseTest
 from pages.login_page import LoginPage
+from utils.resource_blocker import full_resources
 import config
 
 SPECIALS = ["!", "@", "/", "*", "\\", '"']
 
 
 class LoginPageTests(BaseTest):
+    fast_mode = True  # form behaviour; the scroll test below keeps real resources
 
     def setUp(self):
         super().setUp()
@@ -14,6 +16,7 @@ class LoginPageTests(BaseTest):
         self.login = LoginPage(self.page, record_fn=self.record_fn)
 
     # ------------------- Tests -------------------
+    @full_resources
     def test_fields_visible_and_scroll(self):
         self.login.scroll_all()
         self.assertTrue(self.login.is_username_visible(), "Username field should be visible")
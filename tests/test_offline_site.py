@@ -0,0 +1,38 @@
+# tests/test_offline_site.py
+import json
+import os
+import tempfile
+import unittest
+from utils import offline_site
+
+
+class OfflineSiteResolveTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.dir, "static", "js"))
+        for path, body in (("index.html", "<html></html>"), ("static/js/main.js", "1;")):
+            with open(os.path.join(self.dir, *path.split("/")), "w", encoding="utf-8") as f:
+                f.write(body)
+        with open(os.path.join(self.dir, offline_site.MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"static/js/main.js": {"file": "static/js/main.js",
+                                             "content_type": "application/javascript"}}, f)
+        offline_site._manifests.pop(self.dir, None)
+
+    def test_manifest_entry_keeps_recorded_content_type(self):
+        path, content_type, status = offline_site.resolve("/static/js/main.js", self.dir)
+        self.assertTrue(path.endswith("main.js"))
+        self.assertEqual((content_type, status), ("application/javascript", 200))
+
+    def test_spa_routes_fall_back_to_index(self):
+        for route in ("/", "/inventory.html", "/checkout-step-one.html"):
+            path, content_type, _ = offline_site.resolve(route, self.dir)
+            self.assertTrue(path.endswith("index.html"), route)
+            self.assertEqual(content_type, "text/html")
+
+    def test_missing_asset_is_not_served(self):
+        self.assertIsNone(offline_site.resolve("/static/media/logo.svg", self.dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_report_generator.py
+import json
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+from utils import report_generator
+from utils.report_generator import INDEX_FILE, JSON_FILE, JUNIT_FILE, generate_full_pipeline_report
+
+
+def _steps():
+    yield {"name": "open", "ok": True, "duration": 0.2, "wait": 0.1, "test_name": "test_a", "details": {}}
+    yield {"name": "click <b>", "ok": False, "duration": 0.5, "test_name": "test_a", "details": {"error": "x"},
+           "screenshot": "screenshots/abc.jpg"}
+    yield {"name": "open", "ok": True, "duration": 0.3, "test_name": "test_b"}
+
+
+class ReportGeneratorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.report_dir = generate_full_pipeline_report(
+            {"standard_user": {"steps": _steps(), "meta": {"vitals": {"login": {"lcp_ms": 120.0}}}},
+             "problem user": {"steps": iter(())}},
+            report_root=self.root, timestamp_dir="run", history_db=os.path.join(self.root, "history.sqlite"))
+
+    def test_index_links_one_page_per_user(self):
+        with open(os.path.join(self.report_dir, INDEX_FILE), encoding="utf-8") as f:
+            index = f.read()
+        self.assertIn("users/000-standard_user.html", index)
+        self.assertIn("users/001-problem_user.html", index)
+        self.assertIn("lcp_ms", index)
+        with open(os.path.join(self.report_dir, "users", "000-standard_user.html"), encoding="utf-8") as f:
+            page = f.read()
+        self.assertIn("click &lt;b&gt;", page)
+        self.assertIn("<details><summary class='fail'>test_a", page)
+        self.assertIn(os.path.relpath("screenshots/abc.jpg", os.path.join(self.report_dir, "users")), page)
+        self.assertNotIn("<details open>", page)
+
+    def test_json_sidecar(self):
+        with open(os.path.join(self.report_dir, JSON_FILE), encoding="utf-8") as f:
+            data = json.load(f)
+        user = data["users"][0]
+        self.assertEqual(len(user["steps"]), 3)
+        self.assertEqual(user["summary"]["status"], "FAILED")
+        self.assertEqual(user["latency"]["open"]["count"], 2)
+        self.assertEqual(data["users"][1]["summary"]["steps"], 0)
+        self.assertEqual(user["summary"]["regressions"], [])
+
+    def test_junit_sidecar(self):
+        suites = ET.parse(os.path.join(self.report_dir, JUNIT_FILE)).getroot()
+        suite = suites.find("testsuite")
+        self.assertEqual((suite.get("tests"), suite.get("failures")), ("2", "1"))
+        failure = suite.find("testcase[@name='test_a']/failure")
+        self.assertIn("click <b>", failure.get("message"))
+
+    def test_interleaved_tests_are_grouped_and_missing_thumbnails_fall_back(self):
+        thumb = os.path.join(self.root, "thumb.jpg")
+        with open(thumb, "wb") as f:
+            f.write(b"jpg")
+        steps = [
+            {"name": "a1", "ok": True, "test_name": "test_a", "screenshot": "shots/1.jpg", "thumbnail": thumb},
+            {"name": "b1", "ok": True, "test_name": "test_b", "screenshot": "shots/2.jpg",
+             "thumbnail": os.path.join(self.root, "never-made.jpg")},
+            {"name": "a2", "ok": False, "test_name": "test_a"},
+        ]
+        report_dir = generate_full_pipeline_report({"u": {"steps": steps}}, report_root=self.root,
+                                                   timestamp_dir="merged", history_db=None)
+        suite = ET.parse(os.path.join(report_dir, JUNIT_FILE)).getroot().find("testsuite")
+        self.assertEqual([c.get("name") for c in suite.findall("testcase")], ["test_a", "test_b"])
+        with open(os.path.join(report_dir, "users", "000-u.html"), encoding="utf-8") as f:
+            page = f.read()
+        self.assertEqual(page.count("<details><summary"), 2)
+        self.assertIn("test_a — 2 steps, 1 failed", page)
+        users_dir = os.path.join(report_dir, "users")
+        self.assertIn(f"src='{os.path.relpath(thumb, users_dir)}'", page)
+        self.assertIn(f"src='{os.path.relpath('shots/2.jpg', users_dir)}'", page)
+
+    def test_rows_spooled_to_disk_keep_their_order(self):
+        steps = ({"name": f"step{i}", "ok": True, "test_name": "test_a"} for i in range(200))
+        with mock.patch.object(report_generator, "ROW_SPOOL_BYTES", 1024):
+            report_dir = generate_full_pipeline_report({"u": {"steps": steps}}, report_root=self.root,
+                                                       timestamp_dir="spooled", history_db=None)
+        with open(os.path.join(report_dir, "users", "000-u.html"), encoding="utf-8") as f:
+            page = f.read()
+        self.assertIn("test_a — 200 steps", page)
+        positions = [page.index(f"<td>step{i}</td>") for i in (0, 100, 199)]
+        self.assertEqual(positions, sorted(positions))
+
+
+if __name__ == "__main__":
+    unittest.main()
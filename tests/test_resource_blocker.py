@@ -0,0 +1,44 @@
+# tests/test_resource_blocker.py
+import os
+import tempfile
+import unittest
+from utils.resource_blocker import ResourceBlocker, ResourceLedger
+
+
+class ResourceBlockerTests(unittest.TestCase):
+
+    def test_matches_by_type_and_pattern(self):
+        blocker = ResourceBlocker(resource_types=("image",), url_patterns=("*backtrace.io*",))
+        self.assertTrue(blocker.matches("image", "https://www.saucedemo.com/static/media/bike.jpg"))
+        self.assertTrue(blocker.matches("fetch", "https://events.backtrace.io/api/summed-events"))
+        self.assertFalse(blocker.matches("script", "https://www.saucedemo.com/static/js/main.js"))
+
+    def test_ledger_reports_skipped_bytes_and_saved_load_time(self):
+        path = os.path.join(tempfile.mkdtemp(), "ledger.json")
+        ledger = ResourceLedger(path)
+        ledger.observe({"url": "https://www.saucedemo.com/inventory.html", "load_ms": 900.0,
+                        "resources": [["https://www.saucedemo.com/a.jpg", 1000], ["https://x/b.woff", 500]]})
+        ledger.save()
+
+        summary = ResourceLedger(path).summary(
+            ["https://www.saucedemo.com/a.jpg", "https://x/b.woff", "https://x/unknown.png"],
+            {"url": "https://www.saucedemo.com/inventory.html", "load_ms": 400.0, "resources": []})
+        self.assertEqual(summary, {"requests_blocked": 3, "bytes_skipped": 1500,
+                                   "load_ms": 400.0, "load_ms_saved": 500.0})
+
+    def test_ledgers_of_different_processes_merge_on_save(self):
+        path = os.path.join(tempfile.mkdtemp(), "ledger.json")
+        first, second = ResourceLedger(path), ResourceLedger(path)
+        first.observe({"url": "https://x/inventory.html", "load_ms": 900.0, "resources": [["https://x/a.jpg", 10]]})
+        second.observe({"url": "https://x/cart.html", "load_ms": 300.0, "resources": [["https://x/b.jpg", 20]]})
+        first.save()
+        second.save()
+
+        merged = ResourceLedger(path)
+        self.assertEqual(merged.sizes, {"https://x/a.jpg": 10, "https://x/b.jpg": 20})
+        self.assertEqual(merged.loads, {"/inventory.html": 900.0, "/cart.html": 300.0})
+        self.assertEqual(sorted(os.listdir(os.path.dirname(path))), ["ledger.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
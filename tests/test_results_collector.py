@@ -0,0 +1,95 @@
+# tests/test_results_collector.py
+import io
+import json
+import struct
+import unittest
+from unittest import mock
+from utils import results_collector
+from utils.results_collector import Step, UserResult, latency_stats, percentile
+
+
+class ResultsCollectorTests(unittest.TestCase):
+
+    def test_percentile_nearest_rank(self):
+        values = [float(v) for v in range(1, 11)]
+        self.assertEqual(percentile(values, 50), 5.0)
+        self.assertEqual(percentile(values, 95), 10.0)
+        self.assertEqual(percentile([3.0], 95), 3.0)
+
+    def test_log_accumulates_timings_and_latency(self):
+        result = UserResult(username="standard_user")
+        result.log("login", True, duration=0.5)
+        result.log("login", True, duration=1.5)
+        result.log("untimed", False)
+        data = result.to_dict()
+        self.assertEqual(data["timings"], {"login": 2.0})
+        self.assertEqual(data["latency"]["login"], {"count": 2, "p50": 0.5, "p95": 1.5, "max": 1.5})
+        self.assertEqual(data["errors"], ["untimed"])
+
+    def test_record_accepts_record_step_dicts(self):
+        result = UserResult(username="u")
+        result.record({"name": "fill username", "ok": True, "start": 1.0, "duration": 0.2, "wait": 0.1,
+                       "details": {"args": ("u",)}})
+        step = result.to_dict()["steps"][0]
+        self.assertEqual((step["duration"], step["wait"], step["details"]["args"]), (0.2, 0.1, ("u",)))
+
+    def test_measure_logs_failures_and_reraises(self):
+        result = UserResult(username="u")
+        self.assertEqual(result.measure("count", len, [1, 2]), 2)
+        with self.assertRaises(ZeroDivisionError):
+            result.measure("boom", lambda: 1 / 0)
+        self.assertEqual(result.errors, ["boom"])
+        self.assertEqual(latency_stats(result.to_dict()["steps"]).keys(), {"count", "boom"})
+
+    def _sample(self):
+        result = UserResult(username="u", meta={"vitals": {"login": {"lcp_ms": 10.0}}})
+        result.log("open", True, start=1.0, duration=0.25, wait=0.1)
+        result.log("click", False, duration=0.5, error="timeout")
+        result.log("open", True, duration=0.75)
+        return result
+
+    def test_failures_are_tracked_incrementally(self):
+        result = self._sample()
+        self.assertEqual(result.errors, ["click"])
+        self.assertEqual(result.steps[1], Step("click", False, {"error": "timeout"}, None, 0.5, None))
+        self.assertEqual(result.to_dict(steps=False)["errors"], ["click"])
+        self.assertNotIn("steps", result.to_dict(steps=False))
+
+    def test_sink_receives_each_step_as_logged(self):
+        seen = []
+        result = UserResult(username="u", sink=seen.append)
+        result.log("open", True, duration=0.25)
+        self.assertEqual([s["name"] for s in seen], ["open"])
+        result.log("click", False, error="timeout")
+        self.assertEqual(seen, list(result.iter_steps()))
+
+    def test_write_json_matches_to_dict(self):
+        result = self._sample()
+        buffer = io.StringIO()
+        result.write_json(buffer)
+        self.assertEqual(json.loads(buffer.getvalue()), json.loads(json.dumps(result.to_dict())))
+
+    def test_binary_round_trip(self):
+        result = self._sample()
+        restored = UserResult.from_bytes(result.to_bytes())
+        self.assertEqual(restored.to_dict(), result.to_dict())
+        restored.log("click", False)
+        self.assertEqual(restored.errors, ["click", "click"])
+        with self.assertRaises(ValueError):
+            UserResult.from_bytes(b"nope")
+
+    def test_binary_form_is_little_endian(self):
+        result = UserResult(username="u")
+        result.log("open", True, duration=0.25)
+        data = result.to_bytes()
+        header_len, count = struct.unpack_from("<II", data, 4)
+        offset = 12 + header_len
+        self.assertEqual(data[offset:offset + 4], struct.pack("<I", 0))
+        self.assertEqual(data[offset + 5 + 8:offset + 5 + 16], struct.pack("<d", 0.25))
+        # The byte-swapping path taken on big-endian hosts round-trips too
+        with mock.patch.object(results_collector, "_SWAP", True):
+            self.assertEqual(UserResult.from_bytes(result.to_bytes()).to_dict(), result.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# tests/test_run_benchmarks.py
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from benchmarks.run_benchmarks import compare, main
+
+
+def _results(median_s, round_trips):
+    return {"benchmarks": {"smart_scroll": {"median_s": median_s, "round_trips": round_trips}}}
+
+
+class CompareTests(unittest.TestCase):
+
+    def test_threshold_is_a_relative_increase(self):
+        baseline = _results(0.100, 10)
+        self.assertEqual(compare(baseline, _results(0.119, 12), threshold=0.2), [])
+        regressions = compare(baseline, _results(0.121, 13), threshold=0.2)
+        self.assertEqual([r.split(":")[0] for r in regressions], ["smart_scroll.median_s", "smart_scroll.round_trips"])
+        self.assertEqual(compare(baseline, {"benchmarks": {}}, threshold=0.2), [])  # benchmark not run
+
+    def test_exit_codes(self):
+        directory = tempfile.mkdtemp()
+        paths = {}
+        for name, data in (("base", _results(0.1, 10)), ("same", _results(0.1, 10)), ("slow", _results(0.5, 10))):
+            paths[name] = os.path.join(directory, f"{name}.json")
+            with open(paths[name], "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["compare", paths["base"], paths["same"]]), 0)
+            self.assertEqual(main(["compare", paths["base"], paths["slow"]]), 1)
+            self.assertEqual(main(["compare", paths["base"], paths["slow"], "--threshold", "5"]), 0)
+            self.assertEqual(main(["compare", os.path.join(directory, "missing.json"), paths["same"]]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests/test_run_history.py
+import os
+import sqlite3
+import tempfile
+import unittest
+from utils.report_generator import generate_full_pipeline_report
+from utils.run_history import RunHistory, regression_z, sparkline
+
+
+def _run(history, login_mean):
+    return history.add_run("t", "reports/x", [
+        ("standard_user", "test_login", "login", 2, 0, login_mean * 2, login_mean, login_mean, login_mean),
+        ("standard_user", "test_cart", "add to cart", 1, 1, 0.1, 0.1, 0.1, 0.1),
+    ])
+
+
+class RunHistoryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.db = os.path.join(self.dir, "history.sqlite")
+
+    def test_trends_and_slowest(self):
+        history = RunHistory(self.db)
+        for mean in (0.5, 0.6, 0.7):
+            _run(history, mean)
+        self.assertEqual([round(v, 3) for v in history.trends("standard_user", runs=2)["login"]], [0.6, 0.7])
+        slowest = history.slowest(runs=3)
+        self.assertEqual(slowest[0][:5], ("standard_user", "test_login", "login", 3, 6))
+        self.assertAlmostEqual(slowest[0][5], 0.6)
+        self.assertEqual(history.slowest(runs=3, user="nobody"), [])
+        history.close()
+
+    def test_same_run_key_replaces_rows_of_reported_users(self):
+        history = RunHistory(self.db)
+        _run(history, 0.5)
+        row = ("standard_user", "test_login", "login", 1, 0, 0.9, 0.9, 0.9, 0.9)
+        first = history.add_run("t", "reports/a", [row], run_key="journals/a")
+        history.add_run("t", "reports/a", [("problem_user", *row[1:])], run_key="journals/a")  # next class
+        self.assertEqual(history.add_run("t", "reports/b", [row], run_key="journals/a"), first)  # re-report
+        self.assertEqual(history.trends("standard_user")["login"], [0.5, 0.9])
+        self.assertEqual(history.trends("problem_user")["login"], [0.9])
+        self.assertEqual(history.trends("standard_user", exclude_key="journals/a")["login"], [0.5])
+        history.close()
+
+    def test_history_without_run_keys_is_upgraded(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY AUTOINCREMENT, created TEXT NOT NULL, report_dir TEXT)")
+        conn.close()
+        history = RunHistory(self.db)
+        history.add_run("t", "reports/a", [], run_key="journals/a")
+        self.assertEqual(history.add_run("t", "reports/a", [], run_key="journals/a"), 1)
+        history.close()
+
+    def test_regression_z(self):
+        self.assertIsNone(regression_z([1.0, 1.0], 5.0))
+        self.assertLess(regression_z([1.0, 1.02, 0.98, 1.0], 1.03), 3)
+        self.assertGreater(regression_z([1.0, 1.02, 0.98, 1.0], 2.0), 3)
+
+    def test_sparkline_marks_flagged_point(self):
+        self.assertEqual(sparkline([]), "")
+        self.assertIn("#d00", sparkline([1.0, 1.0, 3.0], flagged=True))
+
+    def test_report_flags_slowdown_against_history(self):
+        def steps(duration):
+            return [{"name": "login", "ok": True, "duration": duration, "test_name": "test_login"}]
+
+        for i, duration in enumerate((0.50, 0.51, 0.49, 0.50)):
+            generate_full_pipeline_report({"standard_user": {"steps": steps(duration)}}, report_root=self.dir,
+                                          timestamp_dir=f"run{i}", history_db=self.db)
+        report_dir = generate_full_pipeline_report({"standard_user": {"steps": steps(1.5)}}, report_root=self.dir,
+                                                   timestamp_dir="slow", history_db=self.db)
+        with open(os.path.join(report_dir, "full_pipeline.html"), encoding="utf-8") as f:
+            self.assertIn("<td class='fail'>login</td>", f.read())
+        history = RunHistory(self.db)
+        self.assertEqual(len(history.trends("standard_user")["login"]), 5)
+        history.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# tests/test_run_tests.py
+import json
+import os
+import tempfile
+import unittest
+from run_tests import past_class_overhead, past_durations, schedule
+
+
+class ScheduleTests(unittest.TestCase):
+
+    def test_longest_first_balances_whole_classes(self):
+        durations = {"a.A.t1": 5.0, "a.A.t2": 1.0, "b.B.t1": 4.0, "c.C.t1": 3.0, "c.C.t2": 2.0}
+        overhead = {"a.A": 1.0, "b.B": 2.0, "c.C": 1.0}  # weights: A 7, B 6, C 6
+        buckets, units, predicted = schedule(sorted(durations), 2, durations, overhead)
+        self.assertEqual(buckets, [["a.A.t1", "a.A.t2"], ["b.B.t1", "c.C.t1", "c.C.t2"]])
+        self.assertEqual(predicted, 12.0)
+        self.assertEqual(units, [])
+
+    def test_a_class_is_never_split(self):
+        durations = {"a.A.t1": 3.0, "a.A.t2": 3.0, "a.A.t3": 3.0, "b.B.t1": 1.0}
+        buckets, _, predicted = schedule(sorted(durations), 2, durations)
+        self.assertEqual(buckets, [["a.A.t1", "a.A.t2", "a.A.t3"], ["b.B.t1"]])
+        self.assertEqual(predicted, 9.0)
+
+    def test_classes_without_full_history_become_units(self):
+        ids = ["a.A.t1", "a.A.t2", "b.B.t1", "c.C.t1"]
+        buckets, units, predicted = schedule(ids, 3, {"a.A.t1": 1.0, "c.C.t1": 2.0}, {"c.C": 1.0})
+        self.assertEqual(buckets, [["c.C.t1"], [], []])
+        self.assertEqual(units, [["a.A.t1", "a.A.t2"], ["b.B.t1"]])
+        # A: 1.0 + 1.5 (median test) + 1.0 (median overhead); B: 1.5 + 1.0
+        self.assertEqual(predicted, 3.5)
+
+    def test_past_durations_takes_median_of_recent_runs(self):
+        root = tempfile.mkdtemp()
+        for name, duration in (("r1", 1.0), ("r2", 3.0), ("r3", 2.0)):
+            os.makedirs(os.path.join(root, name))
+            with open(os.path.join(root, name, "results.json"), "w", encoding="utf-8") as f:
+                json.dump({"outcomes": [{"test_id": "a.T.t", "status": "ok", "duration": duration},
+                                        {"test_id": "a.T.s", "status": "skipped", "duration": 0.0}]}, f)
+        self.assertEqual(past_durations(root), {"a.T.t": 2.0})
+        self.assertEqual(past_durations(root, runs=1), {"a.T.t": 2.0})
+        self.assertEqual(past_durations(root, runs=2), {"a.T.t": 2.5})
+
+    def test_past_class_overhead_sums_setup_and_teardown(self):
+        root = tempfile.mkdtemp()
+        for name, setup in (("r1", 1.0), ("r2", 3.0), ("r3", 2.0)):
+            os.makedirs(os.path.join(root, name))
+            with open(os.path.join(root, name, "results.json"), "w", encoding="utf-8") as f:
+                json.dump({"outcomes": [], "classes": [{"class_id": "a.T", "worker": 0,
+                                                        "setup": setup, "teardown": 0.5}]}, f)
+        self.assertEqual(past_class_overhead(root), {"a.T": 2.5})
+        self.assertEqual(past_class_overhead(root, runs=2), {"a.T": 3.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
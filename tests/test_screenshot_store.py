@@ -0,0 +1,77 @@
+# tests/test_screenshot_store.py
+import os
+import tempfile
+import unittest
+from utils import screenshot_store
+from utils.screenshot_store import ScreenshotStore, write_manifest
+
+
+class ScreenshotStoreTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def test_identical_captures_are_stored_once(self):
+        store = ScreenshotStore(self.dir, max_bytes=10_000)
+        a = store.path_for(b"same image", "jpg")
+        self.assertEqual(a, store.path_for(b"same image", "jpg"))
+        self.assertNotEqual(a, store.path_for(b"other image", "jpg"))
+        self.assertTrue(store.save(a, b"same image"))
+        self.assertFalse(store.save(a, b"same image"))
+        self.assertEqual(len([f for f in os.listdir(self.dir) if f.endswith(".jpg")]), 1)
+
+    def _earlier_run(self, root, *datas):
+        """Store datas as a previous run would have, oldest first; returns their paths."""
+        earlier = ScreenshotStore(root, max_bytes=10_000, report_root=os.path.join(self.dir, "reports"))
+        paths = []
+        for i, data in enumerate(datas):
+            path = earlier.path_for(data, "png")
+            earlier.save(path, data)
+            os.utime(path, (1000 + i, 1000 + i))
+            paths.append(path)
+        return paths
+
+    def test_eviction_removes_least_recently_used(self):
+        paths = self._earlier_run(self.dir, b"a" * 100, b"b" * 100)
+        store = ScreenshotStore(self.dir, max_bytes=250, report_root=os.path.join(self.dir, "reports"))
+        store.save(paths[0], b"a" * 100)  # reused by this run
+        store.save(store.path_for(b"c" * 100, "png"), b"c" * 100)
+        self.assertTrue(os.path.isfile(paths[0]))
+        self.assertFalse(os.path.isfile(paths[1]))
+        self.assertLessEqual(store.usage(), 250)
+
+    def test_images_of_the_run_in_progress_are_not_evicted(self):
+        store = ScreenshotStore(self.dir, max_bytes=150, report_root=os.path.join(self.dir, "reports"))
+        first = store.path_for(b"a" * 100, "png")
+        store.save(first, b"a" * 100)
+        os.utime(first, (1000, 1000))  # least recently used, but its report is not written yet
+        second = store.path_for(b"b" * 100, "png")
+        store.save(second, b"b" * 100)
+        self.assertTrue(os.path.isfile(first))
+        self.assertTrue(os.path.isfile(second))
+
+    def test_images_of_recent_reports_are_not_evicted(self):
+        reports = os.path.join(self.dir, "reports")
+        shots = os.path.join(self.dir, "shots")
+        linked, old = self._earlier_run(shots, b"l" * 100, b"o" * 100)
+        for i, (name, paths) in enumerate((("run1", [old]), ("run2", [linked]))):
+            os.makedirs(os.path.join(reports, name))
+            write_manifest(os.path.join(reports, name), paths)
+            os.utime(os.path.join(reports, name, "screenshots.txt"), (1000 + i, 1000 + i))
+        store = ScreenshotStore(shots, max_bytes=250, report_root=reports, keep_reports=1)
+        new = store.path_for(b"n" * 100, "png")
+        store.save(new, b"n" * 100)
+        # run2 is the newest report: its image stays although it is older than the other one
+        self.assertFalse(os.path.isfile(old))
+        self.assertTrue(os.path.isfile(linked))
+        self.assertTrue(os.path.isfile(new))
+
+    def test_no_thumbnail_without_pillow(self):
+        if screenshot_store.Image is not None:
+            self.skipTest("Pillow is installed")
+        store = ScreenshotStore(self.dir)
+        self.assertIsNone(store.thumbnail_for(store.path_for(b"x", "jpg")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# tests/test_screenshots.py
+import os
+import tempfile
+import unittest
+from utils import screenshots
+
+
+class ScreenshotTests(unittest.TestCase):
+
+    def test_modes(self):
+        self.assertFalse(screenshots.should_capture("t", failed=True, mode="off"))
+        self.assertTrue(screenshots.should_capture("t", failed=True, mode="failure"))
+        self.assertFalse(screenshots.should_capture("t", failed=False, mode="failure"))
+        self.assertTrue(screenshots.should_capture("t", failed=False, mode="always"))
+        with self.assertRaises(ValueError):
+            screenshots.should_capture("t", failed=False, mode="sometimes")
+
+    def test_sampling_is_stable_and_proportional(self):
+        ids = [f"tests.test_x.X.test_{i}" for i in range(2000)]
+        picked = [t for t in ids if screenshots.should_capture(t, failed=False, mode="sampled", sample_rate=0.1)]
+        self.assertTrue(100 < len(picked) < 300)
+        self.assertEqual(picked, [t for t in ids
+                                  if screenshots.should_capture(t, failed=False, mode="sampled", sample_rate=0.1)])
+        self.assertTrue(screenshots.should_capture(ids[0], failed=True, mode="sampled", sample_rate=0))
+
+    def test_writer_flush_waits_for_files(self):
+        directory = tempfile.mkdtemp()
+        writer = screenshots.ScreenshotWriter(max_pending=2)
+        paths = [writer.submit(os.path.join(directory, "sub", f"{i}.png"), b"x" * i) for i in range(5)]
+        writer.flush()
+        self.assertEqual([os.path.getsize(p) for p in paths], list(range(5)))
+
+    def test_writer_survives_write_errors(self):
+        directory = tempfile.mkdtemp()
+        writer = screenshots.ScreenshotWriter(max_pending=1)
+        with self.assertLogs(level="ERROR"):
+            writer.submit(os.path.join(directory, "a.png"), "not bytes")
+            writer.flush()
+        paths = [writer.submit(os.path.join(directory, name), b"ok") for name in ("b.png", "c.png")]
+        writer.flush()
+        self.assertTrue(all(os.path.isfile(p) for p in paths))
+
+    def test_writer_survives_store_errors(self):
+        class FailingStore:
+            def save(self, path, data):
+                if data == b"bad":
+                    raise ValueError("cannot make thumbnail")
+                saved.append(path)
+        saved = []
+        writer = screenshots.ScreenshotWriter(max_pending=1, store=FailingStore())
+        with self.assertLogs(level="ERROR"):
+            writer.submit("a.jpg", b"bad")
+            writer.flush()
+        for name in ("b.jpg", "c.jpg"):
+            writer.submit(name, b"ok")
+        writer.flush()
+        self.assertEqual(saved, ["b.jpg", "c.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+# tests/test_state_seeding.py
+import json
+import unittest
+from utils.state_seeding import CART_STORAGE_KEY, INVENTORY_ITEM_IDS, cart_ids, with_cart
+
+
+class StateSeedingTests(unittest.TestCase):
+
+    def test_cart_ids_defaults_to_whole_catalog(self):
+        self.assertEqual(cart_ids(), list(INVENTORY_ITEM_IDS.values()))
+
+    def test_cart_ids_accepts_names_and_ids(self):
+        self.assertEqual(cart_ids(["Sauce Labs Backpack", 0]), [4, 0])
+
+    def test_with_cart_replaces_existing_cart_and_keeps_cookies(self):
+        state = {
+            "cookies": [{"name": "session-username", "value": "standard_user"}],
+            "origins": [{"origin": "https://www.saucedemo.com",
+                         "localStorage": [{"name": CART_STORAGE_KEY, "value": "[1]"}]}],
+        }
+        seeded = with_cart(state, ["Sauce Labs Onesie"], base_url="https://www.saucedemo.com/")
+        self.assertEqual(seeded["cookies"], state["cookies"])
+        storage = seeded["origins"][0]["localStorage"]
+        self.assertEqual(storage, [{"name": CART_STORAGE_KEY, "value": json.dumps([2])}])
+        # the input state is left untouched
+        self.assertEqual(state["origins"][0]["localStorage"][0]["value"], "[1]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+# tests/test_step_journal.py
+import os
+import tempfile
+import unittest
+from utils.step_journal import StepJournal, read_records, user_data
+
+
+class StepJournalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def _journal(self, name="1.jsonl"):
+        return StepJournal(os.path.join(self.dir, name), buffer_bytes=1024)
+
+    def test_user_data_streams_steps_per_user(self):
+        a, b = self._journal("1.jsonl"), self._journal("2.jsonl")
+        a.step("LoginTests", {"name": "open", "ok": True, "duration": 0.1}, test_name="test_a")
+        b.step("standard_user", {"name": "login", "ok": False})
+        b.meta("standard_user", {"vitals": {"login": {"lcp_ms": 1.0}}})
+        a.step("LoginTests", {"name": "click", "ok": True}, test_name="test_b")
+        a.close()
+        b.close()
+
+        data = user_data(self.dir)
+        self.assertEqual(list(data), ["LoginTests", "standard_user"])
+        steps = list(data["LoginTests"]["steps"])
+        self.assertEqual([(s["name"], s["test_name"]) for s in steps], [("open", "test_a"), ("click", "test_b")])
+        self.assertEqual(list(data["LoginTests"]["steps"]), steps)  # re-iterable
+        self.assertEqual(data["standard_user"]["meta"]["vitals"]["login"]["lcp_ms"], 1.0)
+        self.assertEqual(list(user_data(self.dir, users=["standard_user", "missing"])), ["standard_user"])
+
+    def test_journal_reads_back_only_its_users_records(self):
+        journal = self._journal()
+        for i in range(3):
+            journal.step("A", {"name": f"a{i}", "ok": True})
+            journal.step("B", {"name": f"b{i}", "ok": True})
+        journal.meta("B", {"vitals": {}})
+        data = journal.user_data(["B", "missing"])
+        self.assertEqual(list(data), ["B"])
+        self.assertEqual([s["name"] for s in data["B"]["steps"]], ["b0", "b1", "b2"])
+        self.assertEqual(data["B"]["meta"], {"vitals": {}})
+        journal.close()
+
+    def test_reopened_journal_indexes_from_the_end_of_the_file(self):
+        first = self._journal()
+        first.step("A", {"name": "old", "ok": True})
+        first.close()
+        second = self._journal()
+        second.step("A", {"name": "new", "ok": True})
+        self.assertEqual([s["name"] for s in second.user_data(["A"])["A"]["steps"]], ["new"])
+        second.close()
+        self.assertEqual([s["name"] for s in user_data(self.dir)["A"]["steps"]], ["old", "new"])
+
+    def test_truncated_last_line_is_ignored(self):
+        journal = self._journal()
+        journal.step("u", {"name": "kept", "ok": True})
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"kind": "step", "user": "u", "na')
+        self.assertEqual([r["name"] for r in read_records(journal.path)], ["kept"])
+        self.assertEqual([s["name"] for s in user_data(self.dir)["u"]["steps"]], ["kept"])
+
+    def test_unserialisable_values_are_stored_as_text(self):
+        journal = self._journal()
+        journal.step("u", {"name": "s", "ok": True, "details": {"result": object()}})
+        journal.close()
+        self.assertIn("object", next(read_records(journal.path))["details"]["result"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+# tests/test_structure_cache.py
+import json
+import os
+import tempfile
+import unittest
+from utils.structure_cache import CACHE_VERSION, INDEX_FILE, StructureCache, content_hash
+
+
+class StructureCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def test_refresh_extracts_only_when_fingerprint_changes(self):
+        cache = StructureCache(self.dir)
+        calls = []
+        extract = lambda: calls.append(1) or {"buttons": len(calls)}
+        self.assertEqual(cache.refresh("standard_user", "login", "fp1", extract), {"buttons": 1})
+        self.assertEqual(cache.refresh("standard_user", "login", "fp1", extract), {"buttons": 1})
+        self.assertEqual(cache.refresh("standard_user", "login", "fp2", extract), {"buttons": 2})
+        self.assertEqual(len(calls), 2)
+
+    def test_index_round_trip_loads_single_entry(self):
+        cache = StructureCache(self.dir)
+        cache.put("standard_user", "inventory", {"items": 6}, "fp")
+        cache.put("problem_user", "login", {"items": 0}, "fp")
+        cache.save_index()
+
+        reloaded = StructureCache(self.dir)
+        self.assertEqual(reloaded.users(), ["problem_user", "standard_user"])
+        self.assertEqual(reloaded.entry("standard_user", "inventory")["hash"], content_hash({"items": 6}))
+        self.assertEqual(reloaded.get("standard_user", "inventory"), {"items": 6})
+        self.assertEqual(list(reloaded._loaded), [("standard_user", "inventory")])
+        self.assertIsNone(reloaded.get("standard_user", "cart"))
+
+    def test_put_reports_content_changes(self):
+        cache = StructureCache(self.dir)
+        self.assertTrue(cache.put("u", "cart", {"a": 1, "b": 2}, "fp"))
+        self.assertFalse(cache.put("u", "cart", {"b": 2, "a": 1}, "fp2"))
+        self.assertTrue(cache.is_current("u", "cart", "fp2"))
+
+    def test_other_version_index_is_ignored(self):
+        with open(os.path.join(self.dir, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION + 1, "entries": {"u/login": {}}}, f)
+        self.assertEqual(StructureCache(self.dir).index, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
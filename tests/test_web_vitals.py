@@ -0,0 +1,40 @@
+# tests/test_web_vitals.py
+import unittest
+from utils import web_vitals
+from utils.report_generator import _vitals_comparison
+from utils.results_collector import UserResult
+
+_DOCUMENT = {"url": "https://www.saucedemo.com/", "navigation": "document", "ttfb_ms": 50.0, "load_ms": 400.0,
+             "route_ms": None, "fcp_ms": 300.0, "lcp_ms": 350.0, "cls": 0.0, "long_tasks": 0}
+_ROUTE = {"url": "https://www.saucedemo.com/inventory.html", "navigation": "route", "ttfb_ms": None,
+          "load_ms": None, "route_ms": 42.0, "fcp_ms": None, "lcp_ms": None, "cls": 0.01, "long_tasks": 1}
+
+
+class WebVitalsTests(unittest.TestCase):
+
+    def test_store_keeps_only_measured_metrics_per_page(self):
+        result = UserResult("standard_user")
+        web_vitals.store(result, "login", _DOCUMENT)
+        stored = web_vitals.store(result, "inventory", _ROUTE)
+        self.assertEqual(set(result.meta["vitals"]), {"login", "inventory"})
+        self.assertNotIn("lcp_ms", stored)
+        self.assertEqual(stored["route_ms"], 42.0)
+        self.assertEqual(result.meta["vitals"]["login"]["lcp_ms"], 350.0)
+
+    def test_comparison_shows_document_metrics_for_loads_and_route_metrics_for_route_changes(self):
+        users = {}
+        for user, scale in (("standard_user", 1.0), ("performance_glitch_user", 3.0)):
+            result = UserResult(user)
+            web_vitals.store(result, "login", _DOCUMENT)
+            web_vitals.store(result, "inventory", dict(_ROUTE, route_ms=_ROUTE["route_ms"] * scale))
+            users[user] = {"meta": result.meta}
+        rows = _vitals_comparison(users)
+        inventory = [r for r in rows if "inventory (route)" in r]
+        self.assertEqual([r.split("</td>")[1][4:] for r in inventory], ["route_ms", "cls", "long_tasks"])
+        self.assertIn("<td class='num'>42.0</td><td class='num'>126.0</td>", inventory[0])
+        self.assertTrue(any("login (document)" in r and ">lcp_ms<" in r for r in rows))
+        self.assertEqual(_vitals_comparison({"u": {"meta": {}}}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# utils/auth_cache.py
+import hashlib
+import json
+import os
+import time
+import config
+from pages.login_page import LoginPage
+from utils.context_setup import prepare_context
+
+# Paths already validated in this run, keyed by (base_url, user_key).
+_session_paths = {}
+
+
+def cache_path(user_key: str, base_url: str = config.BASE_URL, cache_dir: str = config.AUTH_CACHE_DIR) -> str:
+    """One storage_state file per user and BASE_URL, so switching environments never reuses a session."""
+    digest = hashlib.sha1(f"{base_url}|{user_key}".encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{user_key}-{digest}.json")
+
+
+def is_fresh(path: str, ttl: float = config.AUTH_CACHE_TTL) -> bool:
+    """A cached session is fresh if the file is younger than ttl and none of its cookies expire within a minute."""
+    if not os.path.isfile(path) or time.time() - os.path.getmtime(path) > ttl:
+        return False
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return False
+    horizon = time.time() + 60
+    return all(c.get("expires", -1) <= 0 or c["expires"] > horizon for c in state.get("cookies", []))
+
+
+def login_storage_state(browser, user_key: str, base_url: str = config.BASE_URL,
+                        cache_dir: str = config.AUTH_CACHE_DIR, ttl: float = config.AUTH_CACHE_TTL) -> str:
+    """
+    Return a storage_state file for an authenticated session of config.USERS[user_key].
+    Logs in through the UI only when there is no fresh cached session.
+
+    Raises:
+        RuntimeError: if the user cannot log in (e.g. locked_out_user).
+    """
+    key = (base_url, user_key)
+    path = _session_paths.get(key) or cache_path(user_key, base_url, cache_dir)
+    if is_fresh(path, ttl):
+        _session_paths[key] = path
+        return path
+
+    creds = config.USERS[user_key]
+    context = prepare_context(browser.new_context())
+    try:
+        page = context.new_page()
+        page.goto(base_url)
+        login = LoginPage(page)
+        login.fill_username(creds["username"])
+        login.fill_password(creds["password"])
+        login.click_login()
+        try:
+            page.wait_for_url("**/inventory.html", timeout=10000)
+        except Exception:
+            raise RuntimeError(f"Login failed for {user_key}: {login.get_error_text() or 'no inventory page'}")
+        os.makedirs(cache_dir, exist_ok=True)
+        context.storage_state(path=path)
+    finally:
+        context.close()
+
+    _session_paths[key] = path
+    return path
+
+
+def invalidate(user_key: str = None, base_url: str = config.BASE_URL, cache_dir: str = config.AUTH_CACHE_DIR):
+    """Drop the cached session of one user, or of every user when user_key is None."""
+    for key in ([user_key] if user_key else list(config.USERS)):
+        _session_paths.pop((base_url, key), None)
+        path = cache_path(key, base_url, cache_dir)
+        if os.path.isfile(path):
+            os.remove(path)
@@ -0,0 +1,49 @@
+# utils/batch_reader.py
+from typing import Dict
+from playwright.sync_api import Page
+from utils.dom_snapshot import IS_VISIBLE_JS
+
+# Resolves every query against the live DOM in one pass. "visible" follows Playwright's
+# is_visible (first match, non-empty box, visibility: visible); "text" is the first match's innerText.
+_BATCH_JS = """
+(queries) => {
+    const isVisible = """ + IS_VISIBLE_JS + """;
+    const out = {};
+    for (const [key, q] of Object.entries(queries)) {
+        const all = q.count || q.texts ? Array.from(document.querySelectorAll(q.selector)) : null;
+        const el = all ? all[0] || null : document.querySelector(q.selector);
+        const row = {};
+        for (const name of q.attributes || []) row[name] = el ? el.getAttribute(name) : null;
+        if (q.visible) row.visible = isVisible(el);
+        if (q.text) row.text = el ? el.innerText : '';
+        if (q.count) row.count = all.length;
+        if (q.texts) row.texts = all.map(e => e.innerText);
+        out[key] = row;
+    }
+    return out;
+}
+"""
+
+
+def query(selector: str, attributes=(), visible: bool = False, text: bool = False,
+          count: bool = False, texts: bool = False) -> Dict:
+    """
+    Declare what to read for one selector:
+        attributes - attribute names of the first match (None when absent)
+        visible    - is_visible() of the first match
+        text       - inner_text() of the first match ("" when nothing matches)
+        count      - number of matches
+        texts      - all_inner_texts()
+    """
+    return {"selector": selector, "attributes": list(attributes), "visible": visible,
+            "text": text, "count": count, "texts": texts}
+
+
+def read_batch(page: Page, queries: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Resolve a dict of key -> query(...) in one page.evaluate.
+
+    Returns:
+        key -> {attribute: value, ..., "visible", "text", "count", "texts"} (only the requested entries).
+    """
+    return page.evaluate(_BATCH_JS, queries)
@@ -0,0 +1,138 @@
+# utils/browser_server.py
+"""
+Long-lived Chromium that test runs connect to over CDP instead of launching their own.
+
+    python -m utils.browser_server start     # background server, address written to BROWSER_SERVER_FILE
+    python -m utils.browser_server status
+    python -m utils.browser_server stop
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+from playwright.sync_api import sync_playwright
+import config
+
+
+def read_endpoint(path: str = config.BROWSER_SERVER_FILE):
+    """Return the recorded server info dict, or None if the file is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_listening(endpoint: str, timeout: float = 0.2) -> bool:
+    parts = urlparse(endpoint)
+    try:
+        with socket.create_connection((parts.hostname, parts.port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def connect_or_launch(pw, headless: bool = config.HEADLESS):
+    """
+    Connect to the running browser server if one is listening, otherwise launch a browser.
+    Closing a connected browser only drops this run's contexts and connection.
+    """
+    if config.REUSE_BROWSER_SERVER:
+        info = read_endpoint()
+        if info and is_listening(info["endpoint"]):
+            try:
+                return pw.chromium.connect_over_cdp(info["endpoint"])
+            except Exception as e:
+                logging.warning(f"Browser server at {info['endpoint']} refused connection, launching instead: {e}")
+    return pw.chromium.launch(headless=headless)
+
+
+# ------------------ Server process ------------------
+def serve(port: int, headless: bool = config.HEADLESS, path: str = config.BROWSER_SERVER_FILE):
+    """Run the browser in the foreground until SIGTERM/SIGINT."""
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    endpoint = f"http://127.0.0.1:{port}"
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=headless, args=[f"--remote-debugging-port={port}"])
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"endpoint": endpoint, "pid": os.getpid(), "started": time.time()}, f)
+        print(f"Browser server listening on {endpoint}", flush=True)
+        try:
+            while not stop.wait(0.5) and browser.is_connected():
+                pass
+        finally:
+            browser.close()
+            if os.path.isfile(path) and (read_endpoint(path) or {}).get("pid") == os.getpid():
+                os.remove(path)
+
+
+def start(port: int, timeout: float = 15.0) -> int:
+    info = read_endpoint()
+    if info and is_listening(info["endpoint"]):
+        print(f"Already running at {info['endpoint']} (pid {info['pid']})")
+        return 0
+    subprocess.Popen([sys.executable, "-m", "utils.browser_server", "serve", "--port", str(port)],
+                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = read_endpoint()
+        if info and is_listening(info["endpoint"]):
+            print(f"Browser server started at {info['endpoint']} (pid {info['pid']})")
+            return 0
+        time.sleep(0.1)
+    print("Browser server did not come up in time")
+    return 1
+
+
+def stop(path: str = config.BROWSER_SERVER_FILE) -> int:
+    info = read_endpoint(path)
+    if not info:
+        print("No browser server recorded")
+        return 0
+    try:
+        os.kill(info["pid"], signal.SIGTERM)
+    except OSError:
+        pass
+    for _ in range(50):
+        if not is_listening(info["endpoint"]):
+            break
+        time.sleep(0.1)
+    if os.path.isfile(path):
+        os.remove(path)
+    print(f"Stopped browser server (pid {info['pid']})")
+    return 0
+
+
+def status(path: str = config.BROWSER_SERVER_FILE) -> int:
+    info = read_endpoint(path)
+    if info and is_listening(info["endpoint"]):
+        print(f"Running at {info['endpoint']} (pid {info['pid']})")
+        return 0
+    print("Not running")
+    return 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("start", "stop", "status", "serve"))
+    parser.add_argument("--port", type=int, default=config.BROWSER_SERVER_PORT)
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.port)
+        return 0
+    if args.command == "start":
+        return start(args.port)
+    return stop() if args.command == "stop" else status()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
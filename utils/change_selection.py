@@ -0,0 +1,129 @@
+# utils/change_selection.py
+import json
+import os
+from urllib.parse import urljoin, urlparse
+import config
+from pages.cart_page import CartPage
+from pages.checkout_page import CheckoutPage
+from pages.inventory_page import InventoryPage
+from pages.login_page import LoginPage
+from utils.auth_cache import login_storage_state
+from utils.context_setup import prepare_context
+from utils.state_seeding import seed_cart
+from utils.structure_cache import content_hash, page_fingerprint
+
+# page name -> (path under BASE_URL, structure extractor); every page is opened directly (cart seeded)
+PAGES = {
+    "login": ("", lambda page: LoginPage(page).extract_login_page_structure()),
+    "inventory": ("inventory.html", lambda page: InventoryPage(page).extract_inventory_page_structure()),
+    "cart": ("cart.html", lambda page: CartPage(page).extract_cart_page_structure()),
+    "checkout_step_one": ("checkout-step-one.html", lambda page: CheckoutPage(page).extract_step_one_structure()),
+    "checkout_step_two": ("checkout-step-two.html", lambda page: CheckoutPage(page).extract_step_two_structure()),
+    "checkout_complete": ("checkout-complete.html", lambda page: CheckoutPage(page).extract_complete_structure()),
+}
+_PATHS = {path: name for name, (path, _) in PAGES.items()}
+_PATHS["index.html"] = "login"
+
+
+def page_name(url: str):
+    """PAGES key for an app URL, or None for other origins and unknown routes."""
+    if not url or not url.startswith(config.BASE_URL):
+        return None
+    return _PATHS.get(urlparse(url).path.rsplit("/", 1)[-1])
+
+
+def fingerprint_pages(browser, user_key: str = "standard_user") -> dict:
+    """
+    page name -> hash of its extract_*_structure output and its assets/data-test hooks.
+    The login page is read before the session is added, everything else as user_key.
+    """
+    fingerprints = {}
+    context = prepare_context(browser.new_context())
+    try:
+        page = context.new_page()
+        path, extract = PAGES["login"]
+        page.goto(urljoin(config.BASE_URL, path))
+        fingerprints["login"] = content_hash([page_fingerprint(page), extract(page)])
+
+        state = login_storage_state(browser, user_key)
+        with open(state, encoding="utf-8") as f:
+            context.add_cookies(json.load(f).get("cookies", []))
+        seed_cart(context)
+        for name, (path, extract) in PAGES.items():
+            if name == "login":
+                continue
+            page.goto(urljoin(config.BASE_URL, path))
+            fingerprints[name] = content_hash([page_fingerprint(page), extract(page)])
+    finally:
+        context.close()
+    return fingerprints
+
+
+# ------------------ Stored state ------------------
+def load_state(path: str = config.SELECTION_STATE_FILE) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    return {"fingerprints": data.get("fingerprints", {}), "test_pages": data.get("test_pages", {})}
+
+
+def save_state(state: dict, path: str = config.SELECTION_STATE_FILE) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def learn_test_pages(user_data: dict, test_ids: list) -> dict:
+    """
+    test id -> sorted page names, from the "url" of recorded steps (record_step, BaseTest's
+    "pages visited" step, which also carries a class's declared `visited_pages`).
+    Tests that recorded no app page are left out and so always run.
+    """
+    ids = {tuple(t.rsplit(".", 2)[-2:]): t for t in test_ids}
+    learned = {}
+    for class_name, data in user_data.items():
+        for step in data.get("steps", []):
+            test_id = ids.get((class_name, step.get("test_name")))
+            if not test_id:
+                continue
+            urls = [step.get("url")] + list((step.get("details") or {}).get("urls", []))
+            names = {page_name(u) for u in urls if isinstance(u, str)} - {None}
+            names.update(n for n in (step.get("details") or {}).get("pages", []) if n in PAGES)
+            if names:
+                learned.setdefault(test_id, set()).update(names)
+    return {t: sorted(p) for t, p in learned.items()}
+
+
+def advance(state: dict, fingerprints: dict, all_ids: list, passed: set) -> None:
+    """
+    Store a page's new fingerprint only when every test known to visit it passed in this run, so
+    failed and filtered-out (-k, --shard) tests are selected again next time. Tests whose pages
+    are unknown always run anyway and block nothing.
+    """
+    blocked = {p for t in all_ids if t not in passed for p in state["test_pages"].get(t, ())}
+    for name, digest in fingerprints.items():
+        if name not in blocked:
+            state["fingerprints"][name] = digest
+
+
+def changed_pages(old: dict, new: dict) -> set:
+    return {name for name, digest in new.items() if old.get(name) != digest}
+
+
+def select(test_ids: list, state: dict, changed: set) -> tuple:
+    """
+    Split test_ids into (selected, skipped); skipped is a list of (test id, reason).
+    Without stored fingerprints nothing can be compared, so everything runs.
+    """
+    if not state["fingerprints"]:
+        return list(test_ids), []
+    selected, skipped = [], []
+    for test_id in test_ids:
+        pages = state["test_pages"].get(test_id)
+        if not pages or changed.intersection(pages):
+            selected.append(test_id)
+        else:
+            skipped.append((test_id, f"unchanged: {', '.join(pages)}"))
+    return selected, skipped
@@ -0,0 +1,199 @@
+# utils/context_pool.py
+import json
+import os
+import time
+from urllib.parse import urlparse
+import config
+from utils.context_setup import install_routes, prepare_context
+
+# Empty document served by a route on every origin a reset has to visit; never hits the network
+RESET_PATH = "/__context_pool_reset__"
+_RESET_PAGE = "<!doctype html><title>reset</title>"
+# Web storage of one origin back to what the context was created with
+_RESTORE_STORAGE_JS = """
+items => {
+    localStorage.clear();
+    sessionStorage.clear();
+    for (const { name, value } of items) localStorage.setItem(name, value);
+}
+"""
+
+
+def format_stats(stats: dict) -> str:
+    """One line for ContextPool.stats, or for the key-wise sum of several pools' stats."""
+    total = stats["hits"] + stats["misses"]
+    hit_rate = stats["hits"] / total * 100 if total else 0.0
+    avg_reset = stats["reset_seconds"] / stats["resets"] * 1000 if stats["resets"] else 0.0
+    return (f"Context pool: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.0f}% hit rate), "
+            f"{stats['recycled']} recycled, {stats['resets']} resets averaging {avg_reset:.1f} ms")
+
+
+def _origin(url: str):
+    parts = urlparse(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme in ("http", "https") else None
+
+
+class _Slot:
+    __slots__ = ("context", "page", "fast_mode", "uses", "dirty", "rerouted", "origins")
+
+    def __init__(self, context, page, fast_mode=False):
+        self.context = context
+        self.page = page
+        self.fast_mode = fast_mode
+        self.uses = 0
+        self.dirty = False
+        self.rerouted = False
+        self.origins = set()  # origins the context's pages navigated to since the last reset
+
+
+class ContextPool:
+    """
+    Keeps browser contexts warm between tests.
+
+    acquire() hands out an idle (context, page) pair for the given storage_state and fast mode
+    (contexts with and without the resource blocker are kept apart), or creates one.
+    release() resets it (cookies, web storage of every origin the test visited, permissions, routes
+    the test added) and parks it for the next test. A context is closed instead of reused when it reached
+    max_uses, when the pool for its key is full, or when the test added an init script (those cannot be
+    removed). Contexts created from a storage_state file get that file's cookies and per-origin
+    localStorage back after every reset, so a reused context starts like a fresh one.
+    """
+
+    def __init__(self, browser, size: int = config.CONTEXT_POOL_SIZE, max_uses: int = config.CONTEXT_MAX_USES):
+        self.browser = browser
+        self.size = size
+        self.max_uses = max_uses
+        self._idle = {}      # (storage_state path or None, fast_mode) -> [_Slot]
+        self._busy = {}      # id(context) -> (key, _Slot)
+        self._states = {}    # storage_state path -> (mtime, parsed file)
+        self.stats = {"hits": 0, "misses": 0, "recycled": 0, "resets": 0, "reset_seconds": 0.0}
+
+    # ------------------ Public API ------------------
+    def acquire(self, storage_state: str = None, fast_mode: bool = config.FAST_MODE):
+        """Return (context, page) ready for a test."""
+        key = (storage_state, fast_mode)
+        idle = self._idle.get(key)
+        if idle:
+            slot = idle.pop()
+            self.stats["hits"] += 1
+        else:
+            slot = self._create(storage_state, fast_mode)
+            self.stats["misses"] += 1
+        slot.uses += 1
+        self._busy[id(slot.context)] = (key, slot)
+        return slot.context, slot.page
+
+    def release(self, context) -> None:
+        key, slot = self._busy.pop(id(context))
+        idle = self._idle.setdefault(key, [])
+        if slot.dirty or slot.uses >= self.max_uses or len(idle) >= self.size or slot.page.is_closed():
+            self._discard(slot)
+            return
+        start = time.perf_counter()
+        try:
+            self._reset(slot, key[0])
+        except Exception:
+            self._discard(slot)
+            return
+        finally:
+            self.stats["resets"] += 1
+            self.stats["reset_seconds"] += time.perf_counter() - start
+        idle.append(slot)
+
+    def prewarm(self, count: int = None, storage_state: str = None, fast_mode: bool = config.FAST_MODE) -> None:
+        """Create idle contexts up front so the first tests of a class are pool hits too."""
+        idle = self._idle.setdefault((storage_state, fast_mode), [])
+        while len(idle) < min(count or self.size, self.size):
+            idle.append(self._create(storage_state, fast_mode))
+
+    def close(self) -> None:
+        for slots in self._idle.values():
+            for slot in slots:
+                slot.context.close()
+        self._idle.clear()
+
+    def report(self) -> str:
+        return format_stats(self.stats)
+
+    # ------------------ Internals ------------------
+    def _create(self, storage_state, fast_mode):
+        context = self.browser.new_context(storage_state=storage_state) if storage_state \
+            else self.browser.new_context()
+        prepare_context(context, fast_mode)
+        self._install_reset_route(context)
+        slot = _Slot(context, None, fast_mode)
+
+        def track(page):
+            page.on("framenavigated", lambda frame: self._track_origin(slot, page, frame))
+        context.on("page", track)
+        slot.page = context.new_page()
+
+        # Init scripts added by a test survive any reset, so such a context is not reused
+        original_init_script = context.add_init_script
+
+        def add_init_script(*args, **kwargs):
+            slot.dirty = True
+            return original_init_script(*args, **kwargs)
+        context.add_init_script = add_init_script
+
+        # Routes added by a test are dropped on reset and the run-wide ones reinstalled
+        for name in ("route", "route_from_har"):
+            setattr(context, name, self._flag_reroute(slot, getattr(context, name)))
+        return slot
+
+    @staticmethod
+    def _install_reset_route(context):
+        context.route(f"**{RESET_PATH}", lambda route: route.fulfill(
+            status=200, body=_RESET_PAGE, content_type="text/html"))
+
+    @staticmethod
+    def _track_origin(slot, page, frame):
+        origin = _origin(frame.url)
+        if origin and frame == page.main_frame:
+            slot.origins.add(origin)
+
+    def _state(self, storage_state) -> dict:
+        """Parsed storage_state file, re-read only when the auth cache rewrote it."""
+        mtime = os.path.getmtime(storage_state)
+        cached = self._states.get(storage_state)
+        if cached is None or cached[0] != mtime:
+            with open(storage_state, encoding="utf-8") as f:
+                cached = self._states[storage_state] = (mtime, json.load(f))
+        return cached[1]
+
+    @staticmethod
+    def _flag_reroute(slot, method):
+        def wrapper(*args, **kwargs):
+            slot.rerouted = True
+            return method(*args, **kwargs)
+        return wrapper
+
+    def _reset(self, slot, storage_state):
+        context, page = slot.context, slot.page
+        for extra in context.pages:
+            if extra is not page:
+                extra.close()
+        if slot.rerouted:
+            context.unroute_all()
+            install_routes(context, slot.fast_mode)
+            self._install_reset_route(context)
+            slot.rerouted = False
+        state = self._state(storage_state) if storage_state else {}
+        saved = {o["origin"]: o.get("localStorage", []) for o in state.get("origins", [])}
+        # Clear what the test left and put the state's localStorage back, origin by origin
+        for origin in sorted(slot.origins | set(saved)):
+            page.goto(origin + RESET_PATH)
+            page.evaluate(_RESTORE_STORAGE_JS, saved.get(origin, []))
+        context.clear_cookies()
+        context.clear_permissions()
+        if state.get("cookies"):
+            context.add_cookies(state["cookies"])
+        page.goto("about:blank")
+        slot.origins.clear()
+
+    def _discard(self, slot):
+        self.stats["recycled"] += 1
+        try:
+            slot.context.close()
+        except Exception:
+            pass
@@ -0,0 +1,25 @@
+# utils/context_setup.py
+import config
+from utils import offline_site, resource_blocker, web_vitals
+
+
+def install_routes(context, fast_mode: bool = config.FAST_MODE):
+    """Request interception every context of a run gets (offline stand-in), plus fast mode when asked."""
+    if config.OFFLINE_MODE:
+        offline_site.install(context)
+    if fast_mode:
+        # Registered last so it sees requests first and falls back to the routes above
+        resource_blocker.install(context)
+
+
+def install_scripts(context):
+    """Init scripts every context of a run gets (Web Vitals observers)."""
+    if config.COLLECT_WEB_VITALS:
+        web_vitals.install(context)
+
+
+def prepare_context(context, fast_mode: bool = config.FAST_MODE):
+    """Apply run-wide configuration to a freshly created context and return it."""
+    install_routes(context, fast_mode)
+    install_scripts(context)
+    return context
@@ -0,0 +1,65 @@
+# utils/dom_snapshot.py
+from typing import Dict, List, Sequence
+from playwright.sync_api import Page
+
+# Column order of the rows returned by the in-page snapshot script.
+SNAPSHOT_FIELDS = ("tag", "text", "x", "y", "width", "height", "visible", "data_test")
+
+# Playwright's is_visible() as a page-side function expression, shared by every in-page reader:
+# an element (null is not) with a non-empty box and visibility: visible.
+IS_VISIBLE_JS = """el => {
+    if (!el) return false;
+    const r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0 && getComputedStyle(el).visibility === 'visible';
+}"""
+
+# Walks the subtree once inside the browser and returns one compact row per element.
+# Non-HTML elements (svg, path, ...) are skipped, like Playwright's inner_text() would refuse them.
+_SNAPSHOT_JS = """
+([rootSelector, visibleOnly]) => {
+    const isVisible = """ + IS_VISIBLE_JS + """;
+    const root = document.querySelector(rootSelector);
+    if (!root) return [];
+    const rows = [];
+    for (const el of root.querySelectorAll('*')) {
+        if (!(el instanceof HTMLElement)) continue;
+        const visible = isVisible(el);
+        if (visibleOnly && !visible) continue;
+        const rect = el.getBoundingClientRect();
+        rows.push([
+            el.tagName,
+            (el.innerText || '').trim(),
+            rect.x,
+            rect.y,
+            rect.width,
+            rect.height,
+            visible,
+            el.getAttribute('data-test'),
+        ]);
+    }
+    return rows;
+}
+"""
+
+
+def snapshot_rows(page: Page, root_selector: str = "body", visible_only: bool = True) -> List[list]:
+    """
+    Snapshot every element under root_selector in a single page.evaluate.
+
+    Returns:
+        list of rows ordered like SNAPSHOT_FIELDS.
+    """
+    return page.evaluate(_SNAPSHOT_JS, [root_selector, visible_only])
+
+
+def snapshot_elements(page: Page, root_selector: str = "body", visible_only: bool = True,
+                      fields: Sequence[str] = SNAPSHOT_FIELDS) -> List[Dict]:
+    """
+    Same as snapshot_rows but returns dicts limited to the requested fields,
+    which is what the extract_*_structure methods store in the cache.
+    """
+    indexes = [SNAPSHOT_FIELDS.index(f) for f in fields]
+    return [
+        {field: row[i] for field, i in zip(fields, indexes)}
+        for row in snapshot_rows(page, root_selector, visible_only)
+    ]
@@ -0,0 +1,128 @@
+# utils/har_replay.py
+import glob
+import json
+import os
+import shutil
+import time
+from urllib.parse import urlparse
+import config
+
+
+def har_path(class_name: str, har_dir: str = config.HAR_DIR) -> str:
+    return os.path.join(har_dir, f"{class_name}.har")
+
+
+def part_path(class_name: str, test_name: str, har_dir: str = config.HAR_DIR) -> str:
+    """
+    Per-test recording, merged into the class HAR by merge_hars. Named after the process,
+    since run_tests.py may run one class's tests in several workers at once.
+    """
+    return os.path.join(har_dir, class_name, f"{os.getpid()}-{test_name}.har")
+
+
+def record_context_kwargs(path: str) -> dict:
+    """browser.new_context kwargs that record every request of the context into path on close."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return {"record_har_path": path, "record_har_content": "embed"}
+
+
+def install_replay(context, path: str, missed: list) -> None:
+    """
+    Serve the context's requests from the HAR. Requests the HAR cannot answer are
+    aborted and their URLs appended to `missed`, so replay never touches the network.
+    """
+    def not_recorded(route):
+        missed.append(route.request.url)
+        route.abort("internetdisconnected")
+
+    # Routes registered last are matched first: the HAR falls back to not_recorded
+    context.route("**/*", not_recorded)
+    context.route_from_har(path, not_found="fallback")
+
+
+def merge_hars(parts: list, out_path: str) -> int:
+    """Concatenate the pages and entries of several HAR files. Returns the number of entries."""
+    merged = None
+    for part in parts:
+        if not os.path.isfile(part):
+            continue
+        with open(part, encoding="utf-8") as f:
+            har = json.load(f)
+        if merged is None:
+            merged = har
+        else:
+            merged["log"].setdefault("pages", []).extend(har["log"].get("pages", []))
+            merged["log"]["entries"].extend(har["log"].get("entries", []))
+    if merged is None:
+        return 0
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(merged, f)
+    return len(merged["log"]["entries"])
+
+
+def discard_parts(class_name: str, har_dir: str = config.HAR_DIR, parts: list = None) -> None:
+    """Delete a class's part files: only `parts` when given (the directory goes once empty), else all."""
+    class_dir = os.path.join(har_dir, class_name)
+    if parts is None:
+        shutil.rmtree(class_dir, ignore_errors=True)
+        return
+    for part in parts:
+        if os.path.isfile(part):
+            os.remove(part)
+    try:
+        os.rmdir(class_dir)
+    except OSError:
+        pass  # other processes still recording into it
+
+
+def _class_dirs(har_dir: str) -> list:
+    return sorted(d for d in glob.glob(os.path.join(har_dir, "*")) if os.path.isdir(d))
+
+
+def clear_recordings(har_dir: str = config.HAR_DIR) -> None:
+    """Drop part files left by an interrupted recording, before a new one starts."""
+    for class_dir in _class_dirs(har_dir):
+        shutil.rmtree(class_dir, ignore_errors=True)
+
+
+def merge_recordings(har_dir: str = config.HAR_DIR) -> dict:
+    """
+    Merge the part files of every class, whichever processes wrote them, into <Class>.har
+    and delete the parts. Used by run_tests.py once all workers exited. Returns {class: entries}.
+    """
+    counts = {}
+    for class_dir in _class_dirs(har_dir):
+        name = os.path.basename(class_dir)
+        counts[name] = merge_hars(sorted(glob.glob(os.path.join(class_dir, "*.har"))), har_path(name, har_dir))
+        discard_parts(name, har_dir)
+    return counts
+
+
+def staleness(path: str, base_url: str = config.BASE_URL, max_age_days: float = config.HAR_MAX_AGE_DAYS):
+    """
+    Return why a recording should be refreshed, or None if it is usable:
+    missing, older than max_age_days, or recorded against another origin than base_url.
+    """
+    if not os.path.isfile(path):
+        return f"{path} does not exist"
+    age_days = (time.time() - os.path.getmtime(path)) / 86400
+    if age_days > max_age_days:
+        return f"{path} is {age_days:.1f} days old (limit {max_age_days})"
+    host = urlparse(base_url).netloc
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)["log"].get("entries", [])
+    if not any(urlparse(e["request"]["url"]).netloc == host for e in entries):
+        return f"{path} has no requests to {host}"
+    return None
+
+
+def missed_step(missed: list, base_url: str = config.BASE_URL) -> dict:
+    """Report step for requests the HAR could not answer; only app-origin misses fail it."""
+    host = urlparse(base_url).netloc
+    own = [u for u in missed if urlparse(u).netloc == host]
+    return {
+        "name": "HAR replay misses",
+        "ok": not own,
+        "details": {"app_requests": own, "third_party_requests": [u for u in missed if u not in own]},
+    }
@@ -0,0 +1,66 @@
+# utils/ipc_counter.py
+import threading
+import time
+from contextlib import contextmanager
+
+from playwright._impl._connection import Channel
+
+_local = threading.local()
+_original_inner_send = None
+
+
+def _stats():
+    if not hasattr(_local, "calls"):
+        _local.calls = 0
+        _local.seconds = 0.0
+    return _local
+
+
+def install():
+    """
+    Patch Playwright's protocol channel so every driver round-trip is counted.
+    Counters are per thread, matching the sync API which drives one event loop per thread.
+    Safe to call more than once.
+    """
+    global _original_inner_send
+    if _original_inner_send is not None:
+        return
+    _original_inner_send = Channel.inner_send
+
+    async def counted_inner_send(self, method, params, return_as_dict):
+        stats = _stats()
+        stats.calls += 1
+        start = time.perf_counter()
+        try:
+            return await _original_inner_send(self, method, params, return_as_dict)
+        finally:
+            stats.seconds += time.perf_counter() - start
+
+    Channel.inner_send = counted_inner_send
+
+
+def snapshot() -> tuple:
+    """Return (round_trips, seconds_waited) accumulated by the current thread."""
+    stats = _stats()
+    return stats.calls, stats.seconds
+
+
+@contextmanager
+def count_round_trips():
+    """
+    Count Playwright round-trips made inside the block.
+
+    Usage:
+        with count_round_trips() as ipc:
+            page.locator("body").inner_text()
+        print(ipc["calls"], ipc["seconds"])
+    """
+    install()
+    calls, seconds = snapshot()
+    counter = {"calls": 0, "seconds": 0.0}
+    try:
+        yield counter
+    finally:
+        end_calls, end_seconds = snapshot()
+        counter["calls"] = end_calls - calls
+        counter["seconds"] = end_seconds - seconds
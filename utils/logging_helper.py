@@ -1,6 +1,86 @@
 # utils/logging_helper.py
 import logging
+import reprlib
+import time
 import traceback
+from functools import wraps
+from utils import ipc_counter
+
+
+class StepTimer:
+    """
+    Measures one step: wall-clock start (epoch seconds), duration and the part of it
+    spent waiting on Playwright round-trips, all in seconds.
+    """
+    __slots__ = ("start", "_t0", "_ipc0")
+
+    def __init__(self):
+        ipc_counter.install()
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._ipc0 = ipc_counter.snapshot()[1]
+
+    def timing(self) -> dict:
+        return {
+            "start": self.start,
+            "duration": time.perf_counter() - self._t0,
+            "wait": ipc_counter.snapshot()[1] - self._ipc0,
+        }
+
+
+# Step details keep a short repr of args and results, not the objects (extracted structures can be large)
+_repr = reprlib.Repr()
+_repr.maxstring = _repr.maxother = 120
+_repr.maxlist = _repr.maxtuple = _repr.maxdict = 6
+
+
+def brief(value) -> str:
+    return _repr.repr(value)
+
+
+def _page_url(page_object):
+    """URL the page object's page is on (no round-trip), or None."""
+    page = getattr(page_object, "page", None)
+    try:
+        return page.url if page else None
+    except Exception:
+        return None
+
+
+def record_step(description):
+    """Decorator to wrap page object methods for automatic step recording (with timing)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            step_desc = description or fn.__name__
+            timer = StepTimer()
+            try:
+                result = fn(self, *args, **kwargs)
+                if self.record_fn:
+                    self.record_fn({
+                        "name": step_desc,
+                        "ok": True,
+                        **timer.timing(),
+                        "url": _page_url(self),
+                        "details": {"args": brief(args), "kwargs": brief(kwargs), "result": brief(result)}
+                    })
+                return result
+            except Exception as e:
+                if self.record_fn:
+                    self.record_fn({
+                        "name": step_desc,
+                        "ok": False,
+                        **timer.timing(),
+                        "url": _page_url(self),
+                        "details": {
+                            "error": f"{e.__class__.__name__}: {e}",
+                            "args": brief(args),
+                            "kwargs": brief(kwargs)
+                        }
+                    })
+                raise
+        return wrapper
+    return decorator
 
 def safe_action(action_desc: str, action_fn, default=None, record_fn=None, details=None):
     """
@@ -12,22 +92,24 @@ def safe_action(action_desc: str, action_fn, default=None, record_fn=None, detai
         default: Value to return if an exception occurs (instead of raising).
         record_fn (callable): Optional function to record step results into a report.
                               Signature: record_fn(step_name: str, success: bool, details: dict).
+                              details also carries "start", "duration" and "wait" (seconds).
         details (dict): Optional extra info to pass into record_fn.
 
     Returns:
         Result of action_fn() if successful, otherwise `default`.
     """
+    timer = StepTimer()
     try:
         result = action_fn()
         logging.info(f"Success: {action_desc}")
         if record_fn:
-            record_fn(action_desc, True, details or {})
+            record_fn(action_desc, True, {**(details or {}), **timer.timing()})
         return result
     except Exception as e:
         logging.error(f"Failed to {action_desc}. Exception: {e.__class__.__name__}: {e}")
         logging.debug(traceback.format_exc())
         if record_fn:
-            record_fn(action_desc, False, {"error": str(e), **(details or {})})
+            record_fn(action_desc, False, {"error": str(e), **(details or {}), **timer.timing()})
         if default is not None:
             return default
         raise
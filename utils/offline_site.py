@@ -0,0 +1,151 @@
+# utils/offline_site.py
+"""
+Local stand-in for the app under test: recorded static assets served from disk
+through context.route, so page objects and config.BASE_URL stay unchanged.
+
+    python -m utils.offline_site record     # capture the live site into OFFLINE_FIXTURE_DIR
+    (then set OFFLINE_MODE = True in config.py)
+"""
+import argparse
+import json
+import mimetypes
+import os
+import sys
+from urllib.parse import urljoin, urlparse
+import config
+
+MANIFEST = "manifest.json"
+# Pages visited while recording; SPA routes fall back to index.html when served
+RECORD_PATHS = ("", "inventory.html", "inventory-item.html?id=4", "cart.html",
+                "checkout-step-one.html", "checkout-step-two.html", "checkout-complete.html")
+
+_manifests = {}   # fixture_dir -> {path: entry}
+_bodies = {}      # absolute file path -> bytes
+
+
+def _origin(base_url: str) -> str:
+    parts = urlparse(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def load_manifest(fixture_dir: str = config.OFFLINE_FIXTURE_DIR) -> dict:
+    """path -> {"file", "content_type", "status"}; cached per directory for the whole run."""
+    if fixture_dir not in _manifests:
+        manifest_path = os.path.join(fixture_dir, MANIFEST)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                _manifests[fixture_dir] = json.load(f)
+        else:
+            # Hand-written fixtures without a manifest: serve files by path
+            _manifests[fixture_dir] = {}
+    return _manifests[fixture_dir]
+
+
+def _body(path: str) -> bytes:
+    if path not in _bodies:
+        with open(path, "rb") as f:
+            _bodies[path] = f.read()
+    return _bodies[path]
+
+
+def resolve(url_path: str, fixture_dir: str = config.OFFLINE_FIXTURE_DIR):
+    """Map a request path to (file, content_type, status), or None when nothing matches."""
+    manifest = load_manifest(fixture_dir)
+    path = url_path.lstrip("/") or "index.html"
+    entry = manifest.get(path)
+    if entry:
+        return os.path.join(fixture_dir, entry["file"]), entry["content_type"], entry.get("status", 200)
+    candidate = os.path.join(fixture_dir, *path.split("/"))
+    if os.path.isfile(candidate):
+        return candidate, mimetypes.guess_type(candidate)[0] or "application/octet-stream", 200
+    # Client-side routes (inventory.html, cart.html, ...) are served by the single-page app
+    if path.endswith(".html") or "." not in os.path.basename(path):
+        index = os.path.join(fixture_dir, "index.html")
+        if os.path.isfile(index):
+            return index, "text/html", 200
+    return None
+
+
+def install(context, fixture_dir: str = config.OFFLINE_FIXTURE_DIR, base_url: str = config.BASE_URL):
+    """
+    Serve base_url's origin from fixture_dir and abort every other origin
+    (analytics, fonts, telemetry), so nothing leaves the machine.
+    """
+    origin = _origin(base_url)
+
+    def abort_foreign(route):
+        route.abort("blockedbyclient")
+
+    def serve(route):
+        found = resolve(urlparse(route.request.url).path, fixture_dir)
+        if not found:
+            route.fulfill(status=404, body="not recorded", content_type="text/plain")
+            return
+        path, content_type, status = found
+        route.fulfill(status=status, body=_body(path), content_type=content_type)
+
+    # Routes registered last are matched first
+    context.route("**/*", abort_foreign)
+    context.route(f"{origin}/**", serve)
+
+
+# ------------------ Recording ------------------
+def record(fixture_dir: str = config.OFFLINE_FIXTURE_DIR, base_url: str = config.BASE_URL,
+           user_key: str = "standard_user") -> int:
+    """Visit RECORD_PATHS on the live site as user_key and store every same-origin response."""
+    from playwright.sync_api import sync_playwright
+    from pages.login_page import LoginPage
+
+    origin = _origin(base_url)
+    manifest = {}
+
+    def save(response):
+        parts = urlparse(response.url)
+        if f"{parts.scheme}://{parts.netloc}" != origin or response.request.method != "GET":
+            return
+        path = parts.path.lstrip("/") or "index.html"
+        if path in manifest or not response.ok:
+            return
+        try:
+            body = response.body()
+        except Exception:
+            return
+        target = os.path.join(fixture_dir, *path.split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(body)
+        content_type = response.headers.get("content-type", "application/octet-stream").split(";")[0]
+        manifest[path] = {"file": path, "content_type": content_type, "status": response.status}
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=config.HEADLESS)
+        context = browser.new_context()
+        page = context.new_page()
+        page.on("response", save)
+        page.goto(base_url, wait_until="networkidle")
+        login = LoginPage(page)
+        login.fill_username(config.USERS[user_key]["username"])
+        login.fill_password(config.USERS[user_key]["password"])
+        login.click_login()
+        page.wait_for_url("**/inventory.html")
+        for path in RECORD_PATHS[1:]:
+            page.goto(urljoin(base_url, path), wait_until="networkidle")
+        browser.close()
+
+    with open(os.path.join(fixture_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    _manifests.pop(fixture_dir, None)
+    print(f"Recorded {len(manifest)} responses into {fixture_dir}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("record",))
+    parser.add_argument("--dir", default=config.OFFLINE_FIXTURE_DIR)
+    args = parser.parse_args(argv)
+    return record(args.dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# utils/pipeline_executor.py
+import logging
+import queue
+import threading
+import time
+from playwright.sync_api import sync_playwright
+import config
+from utils.results_collector import UserResult
+from utils.context_setup import prepare_context
+
+
+def run_pipeline(user_flow, users: dict = None, max_workers: int = config.PIPELINE_CONCURRENCY,
+                 headless: bool = config.HEADLESS, journal=None) -> dict:
+    """
+    Run user_flow for every user concurrently, each user in its own browser context.
+
+    Each worker thread owns a sync Playwright instance and one browser (the sync API
+    cannot be shared between threads) and takes users from a queue until none are left.
+
+    Args:
+        user_flow (callable): user_flow(page, user_key, user_data, user_result) -> None.
+                              Log steps on user_result; exceptions are logged as a failed step.
+        users (dict): defaults to config.USERS.
+        max_workers (int): upper bound on concurrent browsers.
+        journal (StepJournal): when given, each user's steps are appended to it as they are logged,
+                               its meta once the user finishes; both are left out of the returned dicts.
+
+    Returns:
+        dict of user_key -> UserResult.to_dict(), in the order of `users`,
+        ready for generate_full_pipeline_report (or step_journal.user_data with a journal).
+    """
+    users = config.USERS if users is None else users
+    pending = queue.Queue()
+    for user_key, user_data in users.items():
+        pending.put((user_key, user_data))
+
+    results = {}
+    lock = threading.Lock()
+
+    def worker():
+        pw = sync_playwright().start()
+        try:
+            browser = pw.chromium.launch(headless=headless)
+            try:
+                while True:
+                    try:
+                        user_key, user_data = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    result = _run_user(browser, user_flow, user_key, user_data, journal)
+                    with lock:
+                        results[user_key] = result
+            finally:
+                browser.close()
+        finally:
+            pw.stop()
+
+    workers = [threading.Thread(target=worker, name=f"pipeline-worker-{i}", daemon=True)
+               for i in range(max(1, min(max_workers, len(users))))]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    # Users never picked up (e.g. every worker failed to launch) still get an entry
+    for user_key in users:
+        if user_key not in results:
+            missing = UserResult(username=user_key, sink=_sink(journal, user_key))
+            missing.log("pipeline_not_run", False, error="no worker ran this user")
+            results[user_key] = _finish(missing, journal)
+    return {user_key: results[user_key] for user_key in users}
+
+
+def _sink(journal, user_key):
+    """Journal each step of user_key the moment it is logged, so a crash mid-flow keeps them."""
+    return None if journal is None else lambda step: journal.step(user_key, step)
+
+
+def _finish(user_result: UserResult, journal) -> dict:
+    if journal is None:
+        return user_result.to_dict()
+    journal.meta(user_result.username, user_result.meta)
+    return user_result.to_dict(steps=False)
+
+
+def _run_user(browser, user_flow, user_key, user_data, journal=None) -> dict:
+    user_result = UserResult(username=user_key, sink=_sink(journal, user_key))
+    start = time.perf_counter()
+    context = prepare_context(browser.new_context())
+    try:
+        user_flow(context.new_page(), user_key, user_data, user_result)
+    except Exception as e:
+        logging.error(f"Pipeline failed for {user_key}. Exception: {e.__class__.__name__}: {e}")
+        user_result.log("pipeline_exception", False, error=f"{e.__class__.__name__}: {e}")
+    finally:
+        context.close()
+        user_result.timings["total"] = time.perf_counter() - start
+    return _finish(user_result, journal)
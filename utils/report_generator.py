@@ -1,62 +1,346 @@
 # utils/report_generator.py
 import os
 import datetime
+import heapq
+import html
+import json
+import re
+import shutil
+import statistics
+import tempfile
+from xml.sax.saxutils import quoteattr
+import config
+from utils.results_collector import latency_stats, percentile
+from utils.run_history import RunHistory, regression_z, sparkline
+from utils.screenshot_store import write_manifest
+from utils.web_vitals import METRICS as VITALS_METRICS
 
-def generate_full_pipeline_report(all_user_data, report_root="reports", timestamp_dir=None):
+SLOWEST_STEPS = 10
+ROW_SPOOL_BYTES = 64 * 1024  # a test's step rows are kept in memory up to this size, then in a temp file
+INDEX_FILE = "full_pipeline.html"
+JSON_FILE = "report.json"
+JUNIT_FILE = "junit.xml"
+USER_DIR = "users"
+
+_STYLE = (
+    "<style>body{font-family:Arial,sans-serif} .pass{color:green} .fail{color:red} "
+    "table{border-collapse:collapse;width:100%} th,td{border:1px solid #ccc;padding:4px;text-align:left} "
+    "img{max-width:250px;max-height:200px;display:block;margin:4px 0} details{margin-bottom:10px} "
+    "pre{background:#f4f4f4;padding:8px;} th.sort{cursor:pointer} td.num{text-align:right} "
+    "main{display:flex;flex-direction:column} .summary{order:-1}"
+    "</style>"
+)
+
+# Click a header to sort its table (numeric when both cells parse as numbers)
+_SORT_JS = (
+    "<script>document.addEventListener('click',e=>{const th=e.target.closest('th.sort');if(!th)return;"
+    "const t=th.closest('table'),i=[...th.parentNode.children].indexOf(th),asc=th.dataset.asc!=='1';"
+    "th.dataset.asc=asc?'1':'0';const rows=[...t.querySelectorAll('tr')].slice(1);"
+    "rows.sort((a,b)=>{const x=a.children[i].textContent,y=b.children[i].textContent,"
+    "nx=parseFloat(x),ny=parseFloat(y);const c=isNaN(nx)||isNaN(ny)?x.localeCompare(y):nx-ny;"
+    "return asc?c:-c;});rows.forEach(r=>t.appendChild(r));});</script>"
+)
+
+# Step tables stay in a <template> until their <details> is first opened: closed tests cost no layout or images
+_LAZY_JS = (
+    "<script>document.addEventListener('toggle',e=>{const d=e.target;if(!d.open)return;"
+    "const t=d.querySelector(':scope>template');if(t)t.replaceWith(t.content);},true);</script>"
+)
+
+_STEP_HEADER = ("<table><tr><th class='sort'>Action</th><th class='sort'>Status</th>"
+                "<th class='sort'>Latency (ms)</th><th class='sort'>Wait (ms)</th>"
+                "<th>Details</th><th>Screenshot</th></tr>")
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}" if seconds is not None else ""
+
+
+def _metric(value, metric) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.3f}" if metric == "cls" else f"{value:.1f}"
+    return str(value)
+
+
+def _e(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def _vitals_comparison(all_user_data) -> list:
+    """One row per page and metric, one column per user, from meta["vitals"]; metrics nobody has are left out."""
+    vitals = {user: (data.get("meta") or {}).get("vitals") or {} for user, data in all_user_data.items()}
+    pages = list(dict.fromkeys(p for per_user in vitals.values() for p in per_user))
+    if not pages:
+        return []
+    users = list(vitals)
+    rows = ["<details open><summary>Browser metrics by user</summary><table><tr><th class='sort'>Page</th>"
+            "<th class='sort'>Metric</th>" + "".join(f"<th class='sort'>{_e(u)}</th>" for u in users) + "</tr>"]
+    for page in pages:
+        kinds = {vitals[u][page].get("navigation") for u in users if page in vitals[u]} - {None}
+        label = f"{page} ({'/'.join(sorted(kinds))})" if kinds else page
+        for metric in VITALS_METRICS:
+            values = [vitals[u].get(page, {}).get(metric) for u in users]
+            if all(v is None for v in values):
+                continue
+            cells = "".join(f"<td class='num'>{_metric(v, metric)}</td>" for v in values)
+            rows.append(f"<tr><td>{_e(label)}</td><td>{metric}</td>{cells}</tr>")
+    rows.append("</table></details>")
+    return rows
+
+
+def _user_page(index: int, user: str) -> str:
+    return f"{USER_DIR}/{index:03d}-{re.sub(r'[^A-Za-z0-9_.-]', '_', user)}.html"
+
+
+def _screenshot_cell(step, page_dir) -> str:
+    # The screenshot writer is flushed before reporting. A thumbnail path is handed out before it is made
+    # and Pillow may have failed on it, so the full image is shown when the thumbnail file is missing.
+    if not step.get("screenshot"):
+        return ""
+    full = os.path.relpath(step["screenshot"], page_dir)
+    thumb = step.get("thumbnail")
+    thumb = os.path.relpath(thumb, page_dir) if thumb and os.path.isfile(thumb) else full
+    return f"<a href='{_e(full)}' target='_blank'><img src='{_e(thumb)}' alt='screenshot' loading='lazy'></a>"
+
+
+class _TestCase:
+    """
+    One test's totals for the JUnit sidecar and its step rows, spooled (in memory up to ROW_SPOOL_BYTES,
+    then on disk) until the user's steps end: the summary line needs the totals first.
+    """
+    __slots__ = ("name", "rows", "steps", "failed", "duration")
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = tempfile.SpooledTemporaryFile(max_size=ROW_SPOOL_BYTES, mode="w+", encoding="utf-8")
+        self.steps = 0
+        self.failed = []
+        self.duration = 0.0
+
+    def add_row(self, row: str) -> None:
+        self.rows.write(row)
+
+    def write(self, f):
+        status = "fail" if self.failed else "pass"
+        f.write(f"<details><summary class='{status}'>{_e(self.name)} — {self.steps} steps, "
+                f"{len(self.failed)} failed, {_ms(self.duration)} ms</summary><template>{_STEP_HEADER}\n")
+        self.rows.seek(0)
+        shutil.copyfileobj(self.rows, f)
+        f.write("</table></template></details>\n")
+        self.rows.close()
+        self.rows = None  # only the totals are kept for JUnit
+
+
+def _write_user(f, json_out, user, data, page_dir, history=None, screenshots=None, run_key=None):
     """
-    Generates HTML report with per-test steps and screenshots.
+    Stream one user's steps into the JSON sidecar and their page (f). Steps are grouped by test name
+    even when a test's steps are not contiguous (journals of several workers): each row goes to its
+    test's spool as it arrives, so memory holds at most ROW_SPOOL_BYTES of rows per test, the
+    per-(test, step) durations and the slowest steps. Linked screenshot and thumbnail paths are
+    added to the `screenshots` set. History of run_key itself is not a baseline.
+
+    Returns:
+        (summary, test cases, run-history rows for this user)
+    """
+    by_test, slowest, cases = {}, [], {}  # (test, step) -> [failures, durations]; test name -> _TestCase
+    count = 0
+    json_out.write(f"{{\"username\": {json.dumps(user)}, \"steps\": [")
+    for step in data.get("steps", ()):
+        test_name = step.get("test_name", "General")
+        case = cases.get(test_name)
+        if case is None:
+            case = cases[test_name] = _TestCase(test_name)
+
+        ok = bool(step.get("ok"))
+        duration = step.get("duration")
+        case.steps += 1
+        key = by_test.setdefault((test_name, step.get("name")), [0, []])
+        if not ok:
+            case.failed.append(step.get("name"))
+            key[0] += 1
+        if duration is not None:
+            case.duration += duration
+            key[1].append(duration)
+            entry = (duration, count, test_name, step.get("name"), step.get("wait"))
+            if len(slowest) < SLOWEST_STEPS:
+                heapq.heappush(slowest, entry)
+            else:
+                heapq.heappushpop(slowest, entry)
+
+        if screenshots is not None and step.get("screenshot"):
+            screenshots.update(p for p in (step["screenshot"], step.get("thumbnail")) if p)
+        details = step.get("details", {}) or {}
+        dstr = "; ".join(f"{k}: {v}" for k, v in details.items())
+        case.add_row(f"<tr><td>{_e(step.get('name'))}</td><td class='{'pass' if ok else 'fail'}'>"
+                         f"{'OK' if ok else 'FAIL'}</td><td class='num'>{_ms(duration)}</td>"
+                         f"<td class='num'>{_ms(step.get('wait'))}</td><td>{_e(dstr)}</td>"
+                         f"<td>{_screenshot_cell(step, page_dir)}</td></tr>\n")
+        json_out.write(("," if count else "") + json.dumps(step, default=str))
+        count += 1
+    cases = list(cases.values())
+    for case in cases:
+        case.write(f)
+
+    durations = {}
+    for (_, name), (_, values) in by_test.items():
+        durations.setdefault(name, []).extend(values)
+    stats = data.get("latency") or latency_stats(
+        {"name": name, "duration": d} for name, values in durations.items() for d in values)
+    history_rows = [(user, test, name, len(values), failures, sum(values),
+                     percentile(values, 50) if values else None, percentile(values, 95) if values else None,
+                     max(values) if values else None)
+                    for (test, name), (failures, values) in by_test.items()]
+
+    # Compare each step's mean latency with its mean in the previous runs (run_history)
+    past = history.trends(user, exclude_key=run_key) if history else {}
+    trends, regressions = {}, []
+    for name, values in durations.items():
+        if not values:
+            continue
+        current = statistics.fmean(values)
+        z = regression_z(past.get(name, []), current)
+        flagged = z is not None and z > config.HISTORY_Z_THRESHOLD
+        trends[name] = (past.get(name, []) + [current], z, flagged)
+        if flagged:
+            regressions.append({"step": name, "mean": current, "baseline": statistics.fmean(past[name]), "z": z})
+    failed_steps = sum(len(c.failed) for c in cases)
+    summary = {
+        "username": user,
+        "status": "FAILED" if data.get("errors") or failed_steps else "PASSED",
+        "tests": len(cases),
+        "steps": count,
+        "failed_steps": failed_steps,
+        "duration": sum(c.duration for c in cases),
+        "regressions": regressions,
+    }
+    json_out.write(f"], \"summary\": {json.dumps(summary)}, \"latency\": {json.dumps(stats)}, "
+                   f"\"meta\": {json.dumps(data.get('meta') or {}, default=str)}}}")
+
+    # Summary tables come last in the stream; CSS order shows them above the steps
+    status_class = "fail" if summary["status"] == "FAILED" else "pass"
+    f.write(f"<section class='summary'><h2 class='{status_class}'>{_e(user)} — {summary['status']}</h2>"
+            f"<p>{count} steps in {len(cases)} tests, {failed_steps} failed</p>")
+    if regressions:
+        f.write("<p class='fail'>Slower than the last runs: " + ", ".join(
+            f"{_e(r['step'])} ({_ms(r['baseline'])} → {_ms(r['mean'])} ms, z={r['z']:.1f})" for r in regressions)
+            + "</p>")
+    if stats:
+        f.write("<details><summary>Latency by step</summary>"
+                "<table><tr><th class='sort'>Step</th><th class='sort'>Count</th><th class='sort'>p50 (ms)</th>"
+                "<th class='sort'>p95 (ms)</th><th class='sort'>Max (ms)</th><th>Trend (mean per run)</th>"
+                "<th class='sort'>z</th></tr>")
+        for name, st in sorted(stats.items(), key=lambda kv: -kv[1]["p95"]):
+            series, z, flagged = trends.get(name, ([], None, False))
+            f.write(f"<tr><td>{_e(name)}</td><td class='num'>{st['count']}</td><td class='num'>{_ms(st['p50'])}</td>"
+                    f"<td class='num'>{_ms(st['p95'])}</td><td class='num'>{_ms(st['max'])}</td>"
+                    f"<td>{sparkline(series, flagged=flagged) if len(series) > 1 else ''}</td>"
+                    f"<td class='num{' fail' if flagged else ''}'>{'' if z is None else f'{z:.1f}'}</td></tr>")
+        f.write("</table></details>")
+    if slowest:
+        timed = sorted(slowest, reverse=True)
+        f.write(f"<details><summary>Slowest {len(timed)} steps</summary>"
+                "<table><tr><th>Test</th><th>Action</th><th>Latency (ms)</th><th>Playwright wait (ms)</th></tr>")
+        for duration, _, test_name, name, wait in timed:
+            f.write(f"<tr><td>{_e(test_name)}</td><td>{_e(name)}</td>"
+                    f"<td class='num'>{_ms(duration)}</td><td class='num'>{_ms(wait)}</td></tr>")
+        f.write("</table></details>")
+    f.write("</section>\n")
+    return summary, cases, history_rows
+
+
+def _junit_suite(user, cases) -> str:
+    failures = sum(1 for c in cases if c.failed)
+    rows = [f"<testsuite name={quoteattr(user)} tests=\"{len(cases)}\" failures=\"{failures}\" errors=\"0\" "
+            f"time=\"{sum(c.duration for c in cases):.3f}\">"]
+    for c in cases:
+        rows.append(f"<testcase classname={quoteattr(user)} name={quoteattr(c.name)} time=\"{c.duration:.3f}\">")
+        if c.failed:
+            rows.append(f"<failure message={quoteattr('failed steps: ' + ', '.join(map(str, c.failed)))}/>")
+        rows.append("</testcase>")
+    rows.append("</testsuite>\n")
+    return "\n".join(rows)
+
+
+def generate_full_pipeline_report(all_user_data, report_root="reports", timestamp_dir=None,
+                                  history_db=config.HISTORY_DB, run_key=None):
+    """
+    Generates the report for {user: {"steps": iterable of step dicts, "meta", "latency", "errors"}}:
+
+        full_pipeline.html     index: one row per user and the browser-metrics comparison
+        users/NNN-<user>.html  one page per user; test step tables are collapsed and built on first open
+        report.json            every user's steps, summary, latency and meta
+        junit.xml              one testsuite per user, one testcase per test
+        screenshots.txt        screenshots the report links to, kept by the screenshot store
+
+    Each user's steps are consumed once, in order, and written as they arrive. Per-step latency is
+    compared with earlier runs in history_db (utils.run_history) and then added to it; None skips that.
+    run_key identifies the run being reported (its journal directory): reporting the same run again
+    replaces its history rows instead of adding another run.
     """
     if timestamp_dir is None:
         timestamp_dir = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
     report_dir = os.path.join(report_root, timestamp_dir)
-    os.makedirs(report_dir, exist_ok=True)
-
-    total = len(all_user_data)
+    page_dir = os.path.join(report_dir, USER_DIR)
+    os.makedirs(page_dir, exist_ok=True)
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    html = [
-        "<!doctype html>",
-        "<html><head><meta charset='utf-8'><title>Full Pipeline Report</title>",
-        "<style>body{font-family:Arial,sans-serif} .pass{color:green} .fail{color:red} "
-        "table{border-collapse:collapse;width:100%} th,td{border:1px solid #ccc;padding:4px;text-align:left} "
-        "img{max-width:250px;max-height:200px;display:block;margin:4px 0} details{margin-bottom:10px} pre{background:#f4f4f4;padding:8px;}"
-        "</style></head><body>",
+    def head(title):
+        return f"<!doctype html>\n<html><head><meta charset='utf-8'><title>{_e(title)}</title>{_STYLE}</head><body>\n"
+
+    history = RunHistory(history_db) if history_db else None
+    summaries, history_rows, screenshots = [], [], set()
+    with open(os.path.join(report_dir, JSON_FILE), "w", encoding="utf-8") as json_out, \
+            open(os.path.join(report_dir, JUNIT_FILE), "w", encoding="utf-8") as junit:
+        json_out.write(f"{{\"created\": {json.dumps(timestamp)}, \"users\": [")
+        junit.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<testsuites name=\"Full Pipeline\">\n")
+        for i, (user, data) in enumerate(all_user_data.items()):
+            page = _user_page(i, user)
+            with open(os.path.join(report_dir, page), "w", encoding="utf-8") as f:
+                f.write(head(user))
+                f.write(f"<p><a href='../{INDEX_FILE}'>All users</a> · {timestamp}</p><main>\n")
+                json_out.write("," if i else "")
+                summary, cases, rows = _write_user(f, json_out, user, data, page_dir, history, screenshots,
+                                                  run_key)
+                f.write(f"</main>{_SORT_JS}{_LAZY_JS}</body></html>\n")
+            summaries.append({**summary, "page": page})
+            history_rows.extend(rows)
+            junit.write(_junit_suite(user, cases))
+        json_out.write("]}\n")
+        junit.write("</testsuites>\n")
+    # Keeps the screenshot store from evicting what this report links to (ScreenshotStore.protected)
+    write_manifest(report_dir, screenshots)
+    if history:
+        try:
+            history.add_run(timestamp, report_dir, history_rows, run_key=run_key)
+        finally:
+            history.close()
+
+    html_rows = [
+        head("Full Pipeline Report"),
         f"<h1>Full Pipeline Report</h1><p>{timestamp}</p>",
-        f"<p>Total Users: {total}</p>"
+        f"<p>Total Users: {len(summaries)} · <a href='{JSON_FILE}'>JSON</a> · <a href='{JUNIT_FILE}'>JUnit XML</a></p>",
+        "<table><tr><th class='sort'>User</th><th class='sort'>Status</th><th class='sort'>Tests</th>"
+        "<th class='sort'>Steps</th><th class='sort'>Failed steps</th><th class='sort'>Step time (ms)</th>"
+        "<th class='sort'>Latency regressions</th></tr>",
     ]
+    for s in summaries:
+        status_class = "fail" if s["status"] == "FAILED" else "pass"
+        html_rows.append(f"<tr><td><a href='{_e(s['page'])}'>{_e(s['username'])}</a></td>"
+                         f"<td class='{status_class}'>{s['status']}</td><td class='num'>{s['tests']}</td>"
+                         f"<td class='num'>{s['steps']}</td><td class='num'>{s['failed_steps']}</td>"
+                         f"<td class='num'>{_ms(s['duration'])}</td>"
+                         f"<td class='{'fail' if s['regressions'] else ''}'>"
+                         f"{_e(', '.join(r['step'] for r in s['regressions']))}</td></tr>")
+    html_rows.append("</table>")
+    html_rows.extend(_vitals_comparison(all_user_data))
+    html_rows.append(_SORT_JS)
+    html_rows.append("</body></html>")
 
-    for user, data in all_user_data.items():
-        has_errors = bool(data.get("errors")) or any(not s.get("ok") for s in data.get("steps", []))
-        status_class = "fail" if has_errors else "pass"
-        status_label = "FAILED" if has_errors else "PASSED"
-        html.append(f"<details open><summary class='{status_class}'>{user} — {status_label}</summary>")
-
-        # Split steps per test if 'test_name' present
-        test_groups = {}
-        for step in data.get("steps", []):
-            test_name = step.get("test_name", "General")
-            test_groups.setdefault(test_name, []).append(step)
-
-        for test_name, steps in test_groups.items():
-            html.append(f"<details open><summary>{test_name}</summary>")
-            html.append("<table><tr><th>Action</th><th>Status</th><th>Details</th><th>Screenshot</th></tr>")
-            for s in steps:
-                status = "OK" if s.get("ok") else "FAIL"
-                details = s.get("details", {}) or {}
-                dstr = "; ".join(f"{k}: {v}" for k, v in details.items())
-                screenshot_html = ""
-                if s.get("screenshot") and os.path.isfile(s["screenshot"]):
-                    screenshot_html = f"<img src='{s['screenshot']}' alt='screenshot'>"
-                html.append(f"<tr><td>{s.get('name')}</td><td class='{status_class}'>{status}</td><td>{dstr}</td><td>{screenshot_html}</td></tr>")
-            html.append("</table></details>")
-
-        html.append("</details>")
-
-    html.append("</body></html>")
-
-    path = os.path.join(report_dir, "full_pipeline.html")
+    path = os.path.join(report_dir, INDEX_FILE)
     with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(html))
+        f.write("\n".join(html_rows))
 
     print(f"HTML report generated: {path}")
     return report_dir
@@ -0,0 +1,158 @@
+# utils/resource_blocker.py
+import base64
+import fnmatch
+import json
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import config
+
+# 1x1 transparent GIF: images keep loading "successfully" so no broken-image handlers fire
+_PIXEL = base64.b64decode("R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7")
+
+# Navigation load time and transferred size of every resource of the current document
+_PERF_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    return {
+        url: location.href,
+        load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+        resources: performance.getEntriesByType('resource')
+            .map(r => [r.name, r.encodedBodySize || r.transferSize || 0]),
+    };
+}
+"""
+
+
+def full_resources(test_fn):
+    """Opt a test out of fast mode (visual/layout tests that need real images and fonts)."""
+    test_fn.full_resources = True
+    return test_fn
+
+
+class ResourceBlocker:
+    """
+    Aborts or stubs requests by resource type and URL pattern for one context.
+    Toggle `enabled` per test; requests it lets through fall back to other routes (offline, HAR).
+    """
+
+    def __init__(self, resource_types=config.FAST_MODE_BLOCK_TYPES, url_patterns=config.FAST_MODE_BLOCK_PATTERNS):
+        self.resource_types = set(resource_types)
+        self.url_patterns = list(url_patterns)
+        self.enabled = True
+        self.blocked = []
+
+    def install(self, context):
+        context.route("**/*", self._handle)
+        return self
+
+    def matches(self, resource_type: str, url: str) -> bool:
+        return resource_type in self.resource_types or any(fnmatch.fnmatch(url, p) for p in self.url_patterns)
+
+    def _handle(self, route):
+        request = route.request
+        if not self.enabled or not self.matches(request.resource_type, request.url):
+            route.fallback()
+            return
+        self.blocked.append(request.url)
+        if request.resource_type == "image":
+            route.fulfill(status=200, body=_PIXEL, content_type="image/gif")
+        else:
+            route.abort("blockedbyclient")
+
+    def take_blocked(self) -> list:
+        blocked, self.blocked = self.blocked, []
+        return blocked
+
+
+@contextmanager
+def _file_lock(path: str, timeout: float = 10.0, stale: float = 60.0):
+    """Cross-process lock: an O_EXCL lock file next to path; one left by a dead process expires after `stale`."""
+    lock = path + ".lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > stale:
+                    os.remove(lock)
+                    continue
+            except OSError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"could not lock {path}")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.remove(lock)
+
+
+class ResourceLedger:
+    """
+    Remembers resource sizes and page-load times seen by tests running with full resources,
+    so fast-mode tests can report bytes and load time they skipped.
+    Every test class of every worker process shares the file: save() merges what this
+    instance observed into it under a lock instead of overwriting it.
+    """
+
+    def __init__(self, path: str = config.FAST_MODE_LEDGER):
+        self.path = path
+        self.sizes, self.loads = self._read()
+        self._new_sizes, self._new_loads = {}, {}
+
+    def _read(self) -> tuple:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("sizes", {}), data.get("loads", {})
+        except (OSError, ValueError):
+            return {}, {}
+
+    @staticmethod
+    def measure(page) -> dict:
+        """One evaluate: load time and resource sizes of the page's current document."""
+        return page.evaluate(_PERF_JS)
+
+    def observe(self, perf: dict) -> None:
+        for url, size in perf["resources"]:
+            if size:
+                self.sizes[url] = self._new_sizes[url] = size
+        if perf["load_ms"]:
+            path = urlparse(perf["url"]).path
+            self.loads[path] = self._new_loads[path] = perf["load_ms"]
+
+    def summary(self, blocked: list, perf: dict = None) -> dict:
+        baseline = self.loads.get(urlparse(perf["url"]).path) if perf else None
+        load_ms = perf["load_ms"] if perf else None
+        return {
+            "requests_blocked": len(blocked),
+            "bytes_skipped": sum(self.sizes.get(u, 0) for u in blocked),
+            "load_ms": load_ms,
+            "load_ms_saved": baseline - load_ms if baseline and load_ms else None,
+        }
+
+    def save(self) -> None:
+        if not self._new_sizes and not self._new_loads:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with _file_lock(self.path):
+            sizes, loads = self._read()
+            sizes.update(self._new_sizes)
+            loads.update(self._new_loads)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"sizes": sizes, "loads": loads}, f)
+            os.replace(tmp, self.path)
+        self.sizes, self.loads = sizes, loads
+        self._new_sizes, self._new_loads = {}, {}
+
+
+def install(context) -> ResourceBlocker:
+    """Install a blocker on the context and keep it reachable as context.resource_blocker."""
+    blocker = ResourceBlocker().install(context)
+    context.resource_blocker = blocker
+    return blocker
@@ -1,36 +1,230 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+import json
+import math
+import struct
+import sys
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from utils.logging_helper import StepTimer
 
-@dataclass
-class Step:
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil without math
+    return ordered[int(rank) - 1]
+
+
+def _stats(durations: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {"count": len(values), "p50": percentile(values, 50),
+               "p95": percentile(values, 95), "max": max(values)}
+        for name, values in durations.items()
+    }
+
+
+def latency_stats(steps: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Aggregate step dicts with a "duration" into {name: {count, p50, p95, max}} (seconds)."""
+    durations: Dict[str, List[float]] = {}
+    for s in steps:
+        if s.get("duration") is not None:
+            durations.setdefault(s["name"], []).append(s["duration"])
+    return _stats(durations)
+
+
+class Step(NamedTuple):
     name: str
     ok: bool
-    details: Dict[str, Any] = field(default_factory=dict)
+    details: Optional[Dict[str, Any]] = None
+    start: Optional[float] = None
+    duration: Optional[float] = None
+    wait: Optional[float] = None
+
+
+_NAN = float("nan")
+_MAGIC = b"URS1"
+# The binary form is little-endian with 4-byte name ids on every platform (shards may be merged elsewhere)
+_ID_TYPE = next(t for t in ("I", "L") if array(t).itemsize == 4)
+_SWAP = sys.byteorder != "little"
+
+
+def _le_bytes(column: array) -> bytes:
+    if _SWAP:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _num(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
 
-@dataclass
 class UserResult:
-    username: str
-    steps: List[Step] = field(default_factory=list)
-    timings: Dict[str, float] = field(default_factory=dict)
-    login_time: Optional[float] = None
-    screenshot: Optional[str] = None
-    meta: Dict[str, Any] = field(default_factory=dict)
-
-    def log(self, name: str, ok: bool, **details):
-        self.steps.append(Step(name=name, ok=ok, details=details))
+    """
+    One user's steps, stored column-wise: step names are interned to ids and steps hold
+    an id, an ok flag, three float timings (NaN = not measured) and their details (None when
+    empty). Failures are tracked as they are logged, and the JSON/binary writers read the
+    columns directly instead of building a dict per step first. A `sink` (e.g. a journal
+    writer) is handed every logged step as it happens.
+    """
+    __slots__ = ("username", "timings", "login_time", "screenshot", "meta", "sink",
+                 "_names", "_name_ids", "_ids", "_ok", "_start", "_duration", "_wait", "_details", "_failed")
+
+    def __init__(self, username: str, steps: Iterable[Step] = (), timings: Dict[str, float] = None,
+                 login_time: Optional[float] = None, screenshot: Optional[str] = None,
+                 meta: Dict[str, Any] = None, sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.username = username
+        self.sink = sink
+        self.timings = {} if timings is None else timings
+        self.login_time = login_time
+        self.screenshot = screenshot
+        self.meta = {} if meta is None else meta
+        self._names: List[str] = []          # id -> name
+        self._name_ids: Dict[str, int] = {}  # name -> id
+        self._ids = array(_ID_TYPE)
+        self._ok = bytearray()
+        self._start = array("d")
+        self._duration = array("d")
+        self._wait = array("d")
+        self._details: List[Optional[Dict[str, Any]]] = []
+        self._failed: List[int] = []         # step indexes, in order
+        for s in steps:
+            self._append(s.name, s.ok, s.start, s.duration, s.wait, s.details)
+
+    def _append(self, name, ok, start, duration, wait, details) -> None:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        if not ok:
+            self._failed.append(len(self._ok))
+        self._ids.append(name_id)
+        self._ok.append(1 if ok else 0)
+        self._start.append(_NAN if start is None else start)
+        self._duration.append(_NAN if duration is None else duration)
+        self._wait.append(_NAN if wait is None else wait)
+        self._details.append(details or None)
+
+    def __len__(self) -> int:
+        return len(self._ok)
+
+    def log(self, name: str, ok: bool, start: float = None, duration: float = None, wait: float = None,
+            **details):
+        self._append(name, ok, start, duration, wait, details)
+        if duration is not None:
+            self.timings[name] = self.timings.get(name, 0.0) + duration
+        if self.sink is not None:
+            self.sink(self._step(len(self) - 1))
         return ok
 
+    def record(self, step: Dict[str, Any]) -> None:
+        """record_fn for page objects: accepts the step dicts produced by record_step."""
+        self.log(step["name"], step["ok"], start=step.get("start"), duration=step.get("duration"),
+                 wait=step.get("wait"), **(step.get("details") or {}))
+
+    def measure(self, name: str, fn, *args, **details):
+        """Run fn(*args), log it as a timed step (ok = truthy result) and return the result."""
+        timer = StepTimer()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.log(name, False, **timer.timing(), error=f"{e.__class__.__name__}: {e}", **details)
+            raise
+        self.log(name, bool(result), **timer.timing(), **details)
+        return result
+
+    # ------------------ Reading ------------------
+    @property
+    def steps(self) -> List[Step]:
+        return [Step(self._names[self._ids[i]], bool(self._ok[i]), self._details[i] or {},
+                     _num(self._start[i]), _num(self._duration[i]), _num(self._wait[i]))
+                for i in range(len(self))]
+
+    def iter_steps(self) -> Iterator[Dict[str, Any]]:
+        """Step dicts one at a time (for journals and reports) without materialising the list."""
+        for i in range(len(self)):
+            yield self._step(i)
+
+    def _step(self, i: int) -> Dict[str, Any]:
+        return {"name": self._names[self._ids[i]], "ok": bool(self._ok[i]), "details": self._details[i] or {},
+                "start": _num(self._start[i]), "duration": _num(self._duration[i]), "wait": _num(self._wait[i])}
+
     @property
     def errors(self) -> List[str]:
-        return [s.name for s in self.steps if not s.ok]
-
-    def to_dict(self) -> Dict[str, Any]:
-        return {
-            "username": self.username,
-            "steps": [{"name": s.name, "ok": s.ok, "details": s.details} for s in self.steps],
-            "timings": self.timings,
-            "login_time": self.login_time,
-            "screenshot": self.screenshot,
-            "meta": self.meta,
-            "errors": self.errors,
-        }
+        return [self._names[self._ids[i]] for i in self._failed]
+
+    def latency(self) -> Dict[str, Dict[str, float]]:
+        durations: Dict[str, List[float]] = {}
+        for name_id, duration in zip(self._ids, self._duration):
+            if not math.isnan(duration):
+                durations.setdefault(self._names[name_id], []).append(duration)
+        return _stats(durations)
+
+    def _header(self) -> Dict[str, Any]:
+        return {"username": self.username, "timings": self.timings, "latency": self.latency(),
+                "login_time": self.login_time, "screenshot": self.screenshot, "meta": self.meta,
+                "errors": self.errors}
+
+    def to_dict(self, steps: bool = True) -> Dict[str, Any]:
+        data = self._header()
+        if steps:
+            data = {"username": self.username, "steps": list(self.iter_steps()), **data}
+        return data
+
+    # ------------------ Serialisation ------------------
+    def write_json(self, f) -> None:
+        """Write to_dict() as JSON to a text file, one step at a time."""
+        names = [json.dumps(n) for n in self._names]
+        f.write(f"{{\"username\": {json.dumps(self.username)}, \"steps\": [")
+        for i in range(len(self)):
+            details = self._details[i]
+            f.write(f"{',' if i else ''}{{\"name\": {names[self._ids[i]]}, "
+                    f"\"ok\": {'true' if self._ok[i] else 'false'}, "
+                    f"\"details\": {json.dumps(details, default=str) if details else '{}'}, "
+                    f"\"start\": {json.dumps(_num(self._start[i]))}, "
+                    f"\"duration\": {json.dumps(_num(self._duration[i]))}, "
+                    f"\"wait\": {json.dumps(_num(self._wait[i]))}}}")
+        header = json.dumps({k: v for k, v in self._header().items() if k != "username"}, default=str)
+        f.write(f"], {header[1:]}")
+
+    def to_bytes(self) -> bytes:
+        """
+        Binary form: b"URS1", a length-prefixed JSON header (fields, names, details),
+        then the columns (uint32 name ids, ok flags, float64 start, duration, wait), all little-endian.
+        """
+        header = json.dumps({"username": self.username, "timings": self.timings, "login_time": self.login_time,
+                             "screenshot": self.screenshot, "meta": self.meta, "names": self._names,
+                             "details": self._details}, default=str).encode("utf-8")
+        count = len(self)
+        return b"".join([_MAGIC, struct.pack("<II", len(header), count), header, _le_bytes(self._ids),
+                         bytes(self._ok), _le_bytes(self._start), _le_bytes(self._duration), _le_bytes(self._wait)])
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "UserResult":
+        if data[:4] != _MAGIC:
+            raise ValueError("not a serialised UserResult")
+        header_len, count = struct.unpack_from("<II", data, 4)
+        offset = 12
+        header = json.loads(data[offset:offset + header_len])
+        offset += header_len
+        result = cls(header["username"], timings=header["timings"], login_time=header["login_time"],
+                     screenshot=header["screenshot"], meta=header["meta"])
+        result._names = header["names"]
+        result._name_ids = {name: i for i, name in enumerate(result._names)}
+        result._details = header["details"]
+
+        def column(typecode):
+            nonlocal offset
+            col = array(typecode)
+            size = col.itemsize * count
+            col.frombytes(data[offset:offset + size])
+            if _SWAP:
+                col.byteswap()
+            offset += size
+            return col
+
+        result._ids = column(_ID_TYPE)
+        result._ok = bytearray(data[offset:offset + count])
+        offset += count
+        result._start, result._duration, result._wait = column("d"), column("d"), column("d")
+        result._failed = [i for i, ok in enumerate(result._ok) if not ok]
+        return result
@@ -0,0 +1,162 @@
+# utils/run_history.py
+"""
+SQLite history of step latencies across report runs.
+
+    python -m utils.run_history slowest -n 10            # slowest steps over the last 10 runs
+    python -m utils.run_history slowest -n 20 --user performance_glitch_user --limit 5
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL,
+    report_dir TEXT,
+    run_key TEXT
+);
+CREATE TABLE IF NOT EXISTS step_stats (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    user TEXT NOT NULL,
+    test TEXT NOT NULL,
+    step TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    total REAL NOT NULL,
+    p50 REAL,
+    p95 REAL,
+    max REAL
+);
+CREATE INDEX IF NOT EXISTS step_stats_key ON step_stats (user, step, run_id);
+CREATE INDEX IF NOT EXISTS step_stats_test ON step_stats (user, test, step, run_id);
+"""
+# Built after run_key exists; runs without a key (NULL) never collide
+_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS runs_key ON runs (run_key)"
+
+
+class RunHistory:
+    """
+    One row per (run, user, test, step) with that run's count, failures and latency (seconds).
+    A run may carry a unique run_key (its journal directory): reporting the same run again, or
+    one class of it at a time, replaces that run's rows for the reported users instead of adding a run.
+    """
+
+    def __init__(self, path: str = config.HISTORY_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        if "run_key" not in [row[1] for row in self.conn.execute("PRAGMA table_info(runs)")]:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN run_key TEXT")  # history from before run keys
+        self.conn.execute(_KEY_INDEX)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add_run(self, created: str, report_dir: str, rows, run_key: str = None) -> int:
+        """
+        rows: (user, test, step, count, failures, total, p50, p95, max) tuples.
+        With a run_key already in the history, its rows for these users are replaced.
+        """
+        rows = list(rows)
+        with self.conn:
+            found = self.conn.execute("SELECT id FROM runs WHERE run_key = ?", (run_key,)).fetchone() \
+                if run_key else None
+            if found:
+                run_id = found[0]
+                self.conn.execute("UPDATE runs SET created = ?, report_dir = ? WHERE id = ?",
+                                  (created, report_dir, run_id))
+                self.conn.executemany("DELETE FROM step_stats WHERE run_id = ? AND user = ?",
+                                      ((run_id, user) for user in {row[0] for row in rows}))
+            else:
+                run_id = self.conn.execute("INSERT INTO runs (created, report_dir, run_key) VALUES (?, ?, ?)",
+                                           (created, report_dir, run_key)).lastrowid
+            self.conn.executemany("INSERT INTO step_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                  ((run_id, *row) for row in rows))
+        return run_id
+
+    def trends(self, user: str, runs: int = config.HISTORY_BASELINE_RUNS, exclude_key: str = None) -> dict:
+        """step -> mean duration per run over the user's last `runs` runs (except run exclude_key), oldest first."""
+        cursor = self.conn.execute(
+            "SELECT step, run_id, SUM(total) / SUM(count) FROM step_stats "
+            "WHERE user = ? AND count > 0 AND run_id IN "
+            "(SELECT DISTINCT run_id FROM step_stats WHERE user = ? AND run_id NOT IN "
+            "(SELECT id FROM runs WHERE run_key = ?) ORDER BY run_id DESC LIMIT ?) "
+            "GROUP BY step, run_id ORDER BY run_id", (user, user, exclude_key, runs))
+        out = {}
+        for step, _, mean in cursor:
+            out.setdefault(step, []).append(mean)
+        return out
+
+    def slowest(self, runs: int = 10, limit: int = 20, user: str = None) -> list:
+        """(user, test, step, runs seen, executions, mean, worst p95) over the last `runs` runs, slowest mean first."""
+        query = ("SELECT user, test, step, COUNT(DISTINCT run_id), SUM(count), SUM(total) / SUM(count), MAX(p95) "
+                 "FROM step_stats WHERE count > 0 AND run_id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)")
+        params = [runs]
+        if user:
+            query += " AND user = ?"
+            params.append(user)
+        query += " GROUP BY user, test, step ORDER BY 6 DESC LIMIT ?"
+        params.append(limit)
+        return self.conn.execute(query, params).fetchall()
+
+
+def regression_z(baseline: list, current: float, min_runs: int = config.HISTORY_MIN_RUNS) -> float:
+    """
+    z-score of current against the baseline means, or None with too little history.
+    The spread is floored (5% of the mean, at least 1 ms) so a perfectly flat history
+    does not turn jitter into a regression.
+    """
+    if len(baseline) < min_runs:
+        return None
+    mean = statistics.fmean(baseline)
+    spread = max(statistics.pstdev(baseline), 0.05 * mean, 0.001)
+    return (current - mean) / spread
+
+
+def sparkline(values: list, width: int = 100, height: int = 18, flagged: bool = False) -> str:
+    """Inline SVG polyline of values (oldest first); the last point is red when flagged."""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1.0
+    step = width / max(len(values) - 1, 1)
+    points = [(i * step, height - 2 - (v - low) / span * (height - 4)) for i, v in enumerate(values)]
+    path = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+    x, y = points[-1]
+    return (f"<svg width='{width}' height='{height}' viewBox='-2 0 {width + 4} {height}'>"
+            f"<polyline fill='none' stroke='#36c' stroke-width='1.5' points='{path}'/>"
+            f"<circle cx='{x:.1f}' cy='{y:.1f}' r='2.5' fill='{'#d00' if flagged else '#36c'}'/></svg>")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m utils.run_history", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    slowest = sub.add_parser("slowest", help="slowest steps by mean latency")
+    slowest.add_argument("-n", "--runs", type=int, default=10, help="look at the last N runs")
+    slowest.add_argument("--limit", type=int, default=20)
+    slowest.add_argument("--user")
+    parser.add_argument("--db", default=config.HISTORY_DB)
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.db):
+        print(f"No history at {args.db}")
+        return 1
+    history = RunHistory(args.db)
+    try:
+        rows = history.slowest(args.runs, args.limit, args.user)
+    finally:
+        history.close()
+    print(f"{'User':<26}{'Test':<36}{'Step':<36}{'Runs':>5}{'Count':>7}{'Mean ms':>10}{'p95 ms':>10}")
+    for user, test, step, runs, count, mean, p95 in rows:
+        print(f"{user[:25]:<26}{test[:35]:<36}{step[:35]:<36}{runs:>5}{count:>7}"
+              f"{mean * 1000:>10.1f}{(p95 or 0) * 1000:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# utils/screenshot_store.py
+import glob
+import hashlib
+import io
+import logging
+import os
+import time
+import config
+
+try:  # in requirements.txt; without it thumbnails are skipped and the report shows the full image
+    from PIL import Image
+except ImportError:
+    Image = None
+
+THUMB_DIR = "thumbs"
+THUMB_SIZE = (250, 200)
+# Written by the report generator into each report directory: the screenshots that report links to
+MANIFEST_FILE = "screenshots.txt"
+
+
+def write_manifest(report_dir: str, paths) -> None:
+    with open(os.path.join(report_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        f.writelines(f"{p}\n" for p in sorted(paths))
+
+
+class ScreenshotStore:
+    """
+    Content-addressed screenshots: <root>/<sha256>.<ext>, so identical captures (same page for
+    several users, an unchanged page on the next run) are stored once. A file's mtime is its
+    last use; when the store grows past max_bytes the least recently used files are evicted,
+    except those linked from the newest keep_reports reports under report_root (their manifests)
+    and those of the run in progress, whose report is not written yet: every image this store
+    saved, and any image another process of the run saved or reused since this store was created.
+    Older reports may show broken images.
+    """
+
+    def __init__(self, root: str = config.SCREENSHOT_DIR,
+                 max_bytes: int = config.SCREENSHOT_STORE_MAX_MB * 1024 * 1024,
+                 report_root: str = "reports", keep_reports: int = config.SCREENSHOT_KEEP_REPORTS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.report_root = report_root
+        self.keep_reports = keep_reports
+        self._usage = None  # bytes on disk, scanned on first save
+        self._started = time.time()
+        self._saved = set()  # absolute paths saved (or reused) through this store
+
+    def path_for(self, data: bytes, ext: str) -> str:
+        return os.path.join(self.root, f"{hashlib.sha256(data).hexdigest()}.{ext}")
+
+    def thumbnail_for(self, path: str):
+        """Where the thumbnail of path lives, or None without Pillow."""
+        if Image is None:
+            return None
+        return os.path.join(self.root, THUMB_DIR, f"{os.path.splitext(os.path.basename(path))[0]}.jpg")
+
+    def save(self, path: str, data: bytes) -> bool:
+        """Write data to path (from path_for) unless already stored; returns True when a file was written."""
+        if self._usage is None:
+            self._usage = self.usage()
+        written = not os.path.isfile(path)
+        if written:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._usage += len(data)
+        else:
+            os.utime(path)  # mark as recently used
+        self._saved.add(os.path.abspath(path))
+        thumb = self.thumbnail_for(path)
+        if thumb and not os.path.isfile(thumb):
+            self._usage += self._write_thumbnail(data, thumb)
+        if self._usage > self.max_bytes:
+            self.evict()
+        return written
+
+    @staticmethod
+    def _write_thumbnail(data: bytes, thumb: str) -> int:
+        try:
+            os.makedirs(os.path.dirname(thumb), exist_ok=True)
+            with Image.open(io.BytesIO(data)) as img:
+                img.thumbnail(THUMB_SIZE)
+                img.convert("RGB").save(thumb, "JPEG", quality=70)
+            return os.path.getsize(thumb)
+        except Exception as e:
+            logging.warning(f"Could not create thumbnail {thumb}: {e}")
+            return 0
+
+    def _files(self) -> list:
+        """(mtime, size, path) of every stored image, thumbnails excluded."""
+        files = []
+        if os.path.isdir(self.root):
+            for entry in os.scandir(self.root):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    files.append((st.st_mtime, st.st_size, entry.path))
+        return files
+
+    def usage(self) -> int:
+        thumbs = os.path.join(self.root, THUMB_DIR)
+        total = sum(size for _, size, _ in self._files())
+        if os.path.isdir(thumbs):
+            total += sum(e.stat().st_size for e in os.scandir(thumbs) if e.is_file())
+        return total
+
+    def protected(self) -> set:
+        """Absolute paths linked from the newest keep_reports reports."""
+        manifests = sorted(glob.glob(os.path.join(self.report_root, "*", MANIFEST_FILE)), key=os.path.getmtime)
+        keep = set()
+        for manifest in manifests[-self.keep_reports:] if self.keep_reports else []:
+            try:
+                with open(manifest, encoding="utf-8") as f:
+                    keep.update(os.path.abspath(line.strip()) for line in f if line.strip())
+            except OSError:
+                continue
+        return keep
+
+    def evict(self, max_bytes: int = None) -> int:
+        """
+        Delete least recently used images (and their thumbnails) until usage <= max_bytes.
+        Images of the newest reports and of the run in progress stay even if that leaves the
+        store over the limit.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        usage = self.usage()
+        keep = self.protected() | self._saved
+        removed = 0
+        for mtime, size, path in sorted(self._files()):
+            if usage <= limit:
+                break
+            if mtime >= self._started or os.path.abspath(path) in keep:
+                continue
+            thumb = os.path.join(self.root, THUMB_DIR, f"{os.path.splitext(os.path.basename(path))[0]}.jpg")
+            for victim in (path, thumb):
+                try:
+                    usage -= os.path.getsize(victim)
+                    os.remove(victim)
+                except OSError:
+                    pass
+            removed += 1
+        self._usage = usage
+        return removed
@@ -0,0 +1,93 @@
+# utils/screenshots.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import zlib
+from playwright.sync_api import Page
+import config
+from utils.screenshot_store import ScreenshotStore
+
+MODES = ("off", "failure", "sampled", "always")
+
+
+def should_capture(test_id: str, failed: bool, mode: str = config.SCREENSHOT_MODE,
+                   sample_rate: float = config.SCREENSHOT_SAMPLE_RATE) -> bool:
+    """
+    failure - only failed tests
+    sampled - failed tests plus a fixed sample_rate share of the rest (the same tests every run)
+    always  - every test
+    """
+    if mode not in MODES:
+        raise ValueError(f"SCREENSHOT_MODE must be one of {MODES}, got {mode!r}")
+    if mode == "off":
+        return False
+    if failed or mode == "always":
+        return True
+    return mode == "sampled" and zlib.crc32(test_id.encode("utf-8")) % 10000 < sample_rate * 10000
+
+
+class ScreenshotWriter:
+    """
+    Writes screenshot bytes on a daemon thread so teardown only waits for the capture itself.
+    Playwright's sync API is bound to the test thread, so the browser still encodes the image;
+    file writes (through the store when given: dedup, thumbnails, eviction) happen here.
+    """
+
+    def __init__(self, max_pending: int = 16, store: ScreenshotStore = None):
+        self.store = store
+        self._queue = queue.Queue(maxsize=max_pending)  # bounds memory held by pending images
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _run(self):
+        while True:
+            path, data = self._queue.get()
+            try:
+                if self.store:
+                    self.store.save(path, data)
+                else:
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                    with open(path, "wb") as f:
+                        f.write(data)
+            except Exception as e:
+                # Any failure (disk, a thumbnail the store cannot make) must not kill the thread:
+                # flush() would then wait forever and submit() block once max_pending is reached
+                logging.error(f"Could not write screenshot {path}: {e.__class__.__name__}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def submit(self, path: str, data: bytes) -> str:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((path, data))
+        return path
+
+    def flush(self) -> None:
+        """Block until every submitted screenshot is on disk (before building a report)."""
+        if self._thread is not None:
+            self._queue.join()
+
+
+writer = ScreenshotWriter(store=ScreenshotStore())
+atexit.register(writer.flush)
+
+
+def capture(page: Page, image_format: str = config.SCREENSHOT_FORMAT, quality: int = config.SCREENSHOT_QUALITY,
+            full_page: bool = config.SCREENSHOT_FULL_PAGE, target: ScreenshotWriter = writer) -> dict:
+    """
+    Take a screenshot and hand it to the writer's store.
+
+    Returns:
+        {"screenshot": path, "thumbnail": path or None}, paths the writer is about to fill.
+    """
+    options = {"type": image_format, "full_page": full_page}
+    if image_format == "jpeg":
+        options["quality"] = quality
+    data = page.screenshot(**options)
+    path = target.store.path_for(data, "jpg" if image_format == "jpeg" else "png")
+    target.submit(path, data)
+    return {"screenshot": path, "thumbnail": target.store.thumbnail_for(path)}
@@ -2,10 +2,72 @@
 import time
 from playwright.sync_api import Page
 
-def smart_scroll(page: Page, pause: float = 0.3, back_to_top: bool = False, container_selector: str = None):
+# Scrolls viewport by viewport inside the page. Each step waits for the scroll to settle
+# (scrollend, or two animation frames where scrollend is unsupported) and for scrollHeight
+# to stop growing, capped at `settleMs` so a busy page cannot stall the loop.
+_SCROLL_JS = """
+async ([selector, backToTop, settleMs]) => {
+    const el = selector ? document.querySelector(selector) : document.scrollingElement;
+    if (!el) throw new Error(`smart_scroll: no element matches ${selector}`);
+    const target = el === document.scrollingElement ? window : el;
+    const frame = () => new Promise(r => requestAnimationFrame(() => r()));
+    const settle = () => new Promise(resolve => {
+        let done = false;
+        const finish = () => { if (!done) { done = true; target.removeEventListener('scrollend', finish); resolve(); } };
+        target.addEventListener('scrollend', finish, { once: true });
+        frame().then(frame).then(() => { if (!('onscrollend' in window)) finish(); });
+        setTimeout(finish, settleMs);
+    });
+    const stableHeight = async () => {
+        const deadline = performance.now() + settleMs;
+        let last = el.scrollHeight;
+        while (performance.now() < deadline) {
+            await frame();
+            if (el.scrollHeight === last) return last;
+            last = el.scrollHeight;
+        }
+        return last;
+    };
+    const start = performance.now();
+    let steps = 0;
+    if (backToTop) el.scrollTop = 0;
+    while (true) {
+        const height = await stableHeight();
+        const next = Math.min(el.scrollTop + el.clientHeight, height);
+        if (next <= el.scrollTop || el.scrollTop + el.clientHeight >= height) break;
+        el.scrollTop = next;
+        steps += 1;
+        await settle();
+        if (el.scrollTop < next - 1) break;   // element refused to scroll further
+    }
+    if (backToTop) el.scrollTop = 0;
+    return { steps, elapsed_ms: performance.now() - start };
+}
+"""
+
+
+def smart_scroll(page: Page, pause: float = 0.3, back_to_top: bool = False, container_selector: str = None,
+                 mode: str = "event"):
     """
     Scroll through a page or a container until the bottom (or top if back_to_top=True).
+
+    Args:
+        pause (float): in "event" mode, the longest time (seconds) a single step may wait
+                       for rendering to settle; in "poll" mode, the fixed sleep per step.
+        mode (str): "event" runs the whole loop in the browser in one awaited evaluate,
+                    "poll" is the original evaluate + sleep loop.
+
+    Returns:
+        dict with "steps" (viewports scrolled) and "elapsed_ms" (total wall time).
     """
+    if mode == "event":
+        return page.evaluate(_SCROLL_JS, [container_selector, back_to_top, int(pause * 1000)])
+    return _poll_scroll(page, pause, back_to_top, container_selector)
+
+
+def _poll_scroll(page: Page, pause: float, back_to_top: bool, container_selector: str):
+    start = time.perf_counter()
+    steps = 0
     if container_selector:
         scrollable = f'document.querySelector("{container_selector}")'
     else:
@@ -29,9 +91,11 @@ def smart_scroll(page: Page, pause: float = 0.3, back_to_top: bool = False, cont
         else:
             same_count = 0
             page.evaluate(f"{scrollable}.scrollTop = {new_scroll}")
+            steps += 1
             time.sleep(pause)
         last_scroll = new_scroll
 
     if back_to_top:
         page.evaluate(f"{scrollable}.scrollTop = 0")
         time.sleep(pause)
+    return {"steps": steps, "elapsed_ms": (time.perf_counter() - start) * 1000}
@@ -0,0 +1,80 @@
+# utils/state_seeding.py
+import json
+import uuid
+from urllib.parse import urljoin, urlparse
+from playwright.sync_api import BrowserContext, Page
+import config
+
+# SauceDemo keeps the cart as a JSON list of item ids in localStorage.
+CART_STORAGE_KEY = "cart-contents"
+_SEED_MARKER_PREFIX = "cart-contents-seed-"
+
+# Item ids as used in the inventory links (inventory-item.html?id=N), in catalog order.
+INVENTORY_ITEM_IDS = {
+    "Sauce Labs Backpack": 4,
+    "Sauce Labs Bike Light": 0,
+    "Sauce Labs Bolt T-Shirt": 1,
+    "Sauce Labs Fleece Jacket": 5,
+    "Sauce Labs Onesie": 2,
+    "Test.allTheThings() T-Shirt (Red)": 3,
+}
+
+
+def cart_ids(items=None) -> list:
+    """Resolve product names and/or ids to cart ids. None means the whole catalog."""
+    if items is None:
+        return list(INVENTORY_ITEM_IDS.values())
+    return [INVENTORY_ITEM_IDS[i] if isinstance(i, str) else int(i) for i in items]
+
+
+def _origin(base_url: str = config.BASE_URL) -> str:
+    parts = urlparse(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def cart_init_script(items=None, base_url: str = config.BASE_URL) -> str:
+    """
+    Init script that writes the cart once per context, on the app origin only.
+    A marker key keeps later navigations from overwriting changes made by the test.
+    """
+    marker = json.dumps(f"{_SEED_MARKER_PREFIX}{uuid.uuid4().hex}")
+    return (
+        "(() => {"
+        f" if (location.origin !== {json.dumps(_origin(base_url))}) return;"
+        f" if (localStorage.getItem({marker}) !== null) return;"
+        f" localStorage.setItem({json.dumps(CART_STORAGE_KEY)}, {json.dumps(json.dumps(cart_ids(items)))});"
+        f" localStorage.setItem({marker}, '1');"
+        "})();"
+    )
+
+
+def seed_cart(context: BrowserContext, items=None, base_url: str = config.BASE_URL) -> list:
+    """Seed the cart for every page the context opens next. Returns the seeded ids."""
+    context.add_init_script(cart_init_script(items, base_url))
+    return cart_ids(items)
+
+
+def with_cart(storage_state: dict = None, items=None, base_url: str = config.BASE_URL) -> dict:
+    """
+    Return a copy of a storage_state dict with the cart filled in,
+    ready for browser.new_context(storage_state=...).
+    """
+    state = {"cookies": [], "origins": []}
+    if storage_state:
+        state["cookies"] = list(storage_state.get("cookies", []))
+        state["origins"] = [dict(o) for o in storage_state.get("origins", [])]
+    origin = _origin(base_url)
+    entry = next((o for o in state["origins"] if o.get("origin") == origin), None)
+    if entry is None:
+        entry = {"origin": origin, "localStorage": []}
+        state["origins"].append(entry)
+    entry["localStorage"] = [kv for kv in entry.get("localStorage", []) if kv["name"] != CART_STORAGE_KEY]
+    entry["localStorage"].append({"name": CART_STORAGE_KEY, "value": json.dumps(cart_ids(items))})
+    return state
+
+
+def open_with_cart(page: Page, path: str, items=None, base_url: str = config.BASE_URL) -> list:
+    """Seed the cart on the page's context and navigate straight to `path` (e.g. "cart.html")."""
+    ids = seed_cart(page.context, items, base_url)
+    page.goto(urljoin(base_url, path))
+    return ids
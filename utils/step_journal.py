@@ -0,0 +1,212 @@
+# utils/step_journal.py
+"""
+Append-only JSON Lines journal of recorded steps, one file per process in a run directory.
+
+    python -m utils.step_journal report                       # report of the latest run, even a crashed one
+    python -m utils.step_journal report journals/2024-01-01-10-00-00-123
+"""
+import argparse
+import atexit
+import datetime
+from array import array
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import config
+
+ENV_VAR = "STEP_JOURNAL_DIR"  # shared with spawned workers so a run writes into one directory
+
+
+class StepJournal:
+    """
+    Buffered, thread-safe appender. Every record is one JSON line:
+        {"kind": "step", "user": ..., "test_name": ..., <step dict>}
+        {"kind": "meta", "user": ..., "meta": {...}}
+    A crash loses at most the unflushed buffer and leaves at worst a truncated last line.
+    The journal remembers where each user's records start in its file (and their merged meta),
+    so user_data() can read one class's steps back without scanning the run.
+    """
+
+    def __init__(self, path: str, buffer_bytes: int = config.JOURNAL_BUFFER_BYTES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._offset = os.path.getsize(path) if os.path.isfile(path) else 0
+        self._file = open(path, "ab", buffering=buffer_bytes)
+        self._lock = threading.Lock()
+        self._index = {}  # user -> array of byte offsets of its records
+        self._meta = {}   # user -> merged meta
+
+    def append(self, record: dict) -> None:
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        user = record.get("user")
+        with self._lock:
+            self._file.write(line)
+            if user is not None:
+                self._index.setdefault(user, array("Q")).append(self._offset)
+            self._offset += len(line)
+
+    def step(self, user: str, step: dict, test_name: str = None) -> None:
+        record = {"kind": "step", "user": user, **step}
+        if test_name is not None:
+            record["test_name"] = test_name
+        self.append(record)
+
+    def meta(self, user: str, meta: dict) -> None:
+        self.append({"kind": "meta", "user": user, "meta": meta})
+        with self._lock:
+            self._meta.setdefault(user, {}).update(meta or {})
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def user_data(self, users) -> dict:
+        """user_data() for this journal's own records of `users` (e.g. one test class), in that order."""
+        self.flush()
+        with self._lock:
+            return {u: {"steps": _UserSteps([(self.path, array("Q", self._index[u]))]),
+                        "meta": dict(self._meta.get(u, {}))}
+                    for u in users if u in self._index}
+
+
+# ------------------ Process-wide journal ------------------
+_current = {}
+
+
+def run_dir() -> str:
+    """This run's journal directory; created on first use and inherited by child processes."""
+    if not os.environ.get(ENV_VAR):
+        stamp = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
+        os.environ[ENV_VAR] = os.path.join(config.JOURNAL_DIR, f"{stamp}-{os.getpid()}")
+    return os.environ[ENV_VAR]
+
+
+def current() -> StepJournal:
+    """The journal of this process (<run_dir>/<pid>.jsonl)."""
+    journal = _current.get("journal")
+    if journal is None or journal.path != os.path.join(run_dir(), f"{os.getpid()}.jsonl"):
+        if journal:
+            journal.close()
+        journal = _current["journal"] = StepJournal(os.path.join(run_dir(), f"{os.getpid()}.jsonl"))
+    return journal
+
+
+@atexit.register
+def _close_current():
+    if _current.get("journal"):
+        _current.pop("journal").close()
+
+
+# ------------------ Reading ------------------
+def read_records(path: str):
+    """Yield the records of one journal file; a truncated or corrupt line is skipped, never fatal."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                if line.endswith("\n"):
+                    logging.warning(f"{path}:{number}: skipping unreadable journal line")
+                # else: the writer died mid-line; everything before it is intact
+
+
+def _files(run_dirs) -> list:
+    if isinstance(run_dirs, str):
+        run_dirs = [run_dirs]
+    return [path for d in run_dirs for path in sorted(glob.glob(os.path.join(d, "*.jsonl")))]
+
+
+class _UserSteps:
+    """Re-iterable view of one user's steps: [(path, byte offsets of its records)], read on every pass."""
+
+    def __init__(self, sources):
+        self.sources = sources
+
+    def __iter__(self):
+        for path, offsets in self.sources:
+            with open(path, "rb") as f:
+                for offset in offsets:
+                    if f.tell() != offset:  # a user's records are mostly contiguous
+                        f.seek(offset)
+                    record = json.loads(f.readline())
+                    if record.pop("kind", None) == "step":
+                        record.pop("user", None)
+                        yield record
+
+
+def _index_file(path: str) -> tuple:
+    """One pass over a journal file: ({user: byte offsets of its records}, {user: merged meta})."""
+    index, meta = {}, {}
+    offset = 0
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            start, offset = offset, offset + len(line)
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if line.endswith(b"\n"):
+                    logging.warning(f"{path}:{number}: skipping unreadable journal line")
+                continue
+            user = record.get("user")
+            if user is None:
+                continue
+            index.setdefault(user, array("Q")).append(start)
+            if record.get("kind") == "meta":
+                meta.setdefault(user, {}).update(record.get("meta") or {})
+    return index, meta
+
+
+def user_data(run_dirs, users=None) -> dict:
+    """
+    {user: {"steps": re-iterable steps, "meta": merged meta}} for generate_full_pipeline_report,
+    in order of first appearance (or of `users`). One pass indexes every file by user; each
+    user's steps are then read back from their offsets only, so a report reads the run twice.
+    """
+    sources, meta = {}, {}
+    for path in _files(run_dirs):
+        index, file_meta = _index_file(path)
+        for user, offsets in index.items():
+            sources.setdefault(user, []).append((path, offsets))
+        for user, values in file_meta.items():
+            meta.setdefault(user, {}).update(values)
+    order = [u for u in users if u in sources] if users is not None else list(sources)
+    return {u: {"steps": _UserSteps(sources[u]), "meta": meta.get(u, {})} for u in order}
+
+
+def latest_run_dir(root: str = config.JOURNAL_DIR):
+    runs = sorted(d for d in glob.glob(os.path.join(root, "*")) if os.path.isdir(d))
+    return runs[-1] if runs else None
+
+
+def main(argv=None) -> int:
+    from utils.report_generator import generate_full_pipeline_report
+
+    parser = argparse.ArgumentParser(prog="python -m utils.step_journal", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("report", help="build the HTML report from a run's journal")
+    report.add_argument("run_dir", nargs="?", help=f"default: the latest run in {config.JOURNAL_DIR}/")
+    report.add_argument("--report-root", default="reports")
+    args = parser.parse_args(argv)
+
+    directory = args.run_dir or latest_run_dir()
+    if not directory or not _files(directory):
+        print("No journal found")
+        return 1
+    # Same run key as the run's own reports: its latency history is replaced, not added twice
+    generate_full_pipeline_report(user_data(directory), report_root=args.report_root,
+                                  run_key=os.path.abspath(directory))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# utils/structure_cache.py
+import hashlib
+import json
+import os
+import time
+from playwright.sync_api import Page
+import config
+
+CACHE_VERSION = 1
+INDEX_FILE = "index.json"
+
+# Cheap page identity: the app's script/stylesheet URLs (hashed build names change on deploy),
+# the route, and the set of data-test hooks present in the DOM.
+_FINGERPRINT_JS = """
+() => ({
+    path: location.pathname,
+    assets: Array.from(document.querySelectorAll('script[src], link[rel="stylesheet"][href]'),
+                       el => el.src || el.href).sort(),
+    hooks: Array.from(new Set(Array.from(document.querySelectorAll('[data-test]'),
+                                         el => el.getAttribute('data-test')))).sort(),
+})
+"""
+
+
+def _digest(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def content_hash(structure) -> str:
+    """Stable hash of an extracted structure."""
+    return _digest(structure)
+
+
+def page_fingerprint(page: Page) -> str:
+    """Fingerprint of the current page (app assets + route + data-test hooks) in one evaluate."""
+    return _digest(page.evaluate(_FINGERPRINT_JS))
+
+
+def _write_json(path: str, data) -> None:
+    """Write through a temp file so a crash never leaves a half-written cache entry."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class StructureCache:
+    """
+    Page structures cached per (user, page) in <root>/<user>/<page>.json.
+
+    <root>/index.json maps every entry to its content hash and fingerprint, so checking
+    freshness never opens the structure files, and get() parses only the one entry asked for.
+    An index written by another CACHE_VERSION is ignored and rebuilt.
+    """
+
+    def __init__(self, root: str = config.STRUCTURE_CACHE_DIR):
+        self.root = root
+        self._index = None
+        self._loaded = {}   # (user, page) -> structure parsed in this process
+
+    # ------------------ Index ------------------
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            self._index = {}
+            path = os.path.join(self.root, INDEX_FILE)
+            if os.path.isfile(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        data = json.load(f)
+                    if data.get("version") == CACHE_VERSION:
+                        self._index = data.get("entries", {})
+                except (OSError, ValueError):
+                    pass
+        return self._index
+
+    def save_index(self) -> None:
+        _write_json(os.path.join(self.root, INDEX_FILE), {"version": CACHE_VERSION, "entries": self.index})
+
+    @staticmethod
+    def _key(user: str, page: str) -> str:
+        return f"{user}/{page}"
+
+    def entry(self, user: str, page: str):
+        return self.index.get(self._key(user, page))
+
+    def users(self) -> list:
+        return sorted({key.split("/", 1)[0] for key in self.index})
+
+    def pages(self, user: str) -> list:
+        return sorted(key.split("/", 1)[1] for key in self.index if key.startswith(f"{user}/"))
+
+    # ------------------ Entries ------------------
+    def is_current(self, user: str, page: str, fingerprint: str) -> bool:
+        entry = self.entry(user, page)
+        return bool(entry) and entry["fingerprint"] == fingerprint \
+            and os.path.isfile(os.path.join(self.root, entry["file"]))
+
+    def get(self, user: str, page: str):
+        """Cached structure of one page, or None."""
+        key = (user, page)
+        if key not in self._loaded:
+            entry = self.entry(user, page)
+            if not entry:
+                return None
+            try:
+                with open(os.path.join(self.root, entry["file"]), encoding="utf-8") as f:
+                    self._loaded[key] = json.load(f)["structure"]
+            except (OSError, ValueError, KeyError):
+                return None
+        return self._loaded[key]
+
+    def put(self, user: str, page: str, structure, fingerprint: str) -> bool:
+        """Store a structure; returns True when its content changed. The index is saved by the caller."""
+        digest = content_hash(structure)
+        previous = self.entry(user, page)
+        changed = not previous or previous["hash"] != digest
+        file = os.path.join(user, f"{page}.json")
+        if changed or not os.path.isfile(os.path.join(self.root, file)):
+            _write_json(os.path.join(self.root, file), {
+                "version": CACHE_VERSION, "user": user, "page": page,
+                "hash": digest, "fingerprint": fingerprint, "structure": structure,
+            })
+        self.index[self._key(user, page)] = {
+            "file": file, "hash": digest, "fingerprint": fingerprint, "captured_at": time.time(),
+        }
+        self._loaded[(user, page)] = structure
+        return changed
+
+    def refresh(self, user: str, page: str, fingerprint: str, extract):
+        """
+        Return the cached structure when the page fingerprint is unchanged,
+        otherwise call extract() and store the new structure.
+        """
+        if self.is_current(user, page, fingerprint):
+            cached = self.get(user, page)
+            if cached is not None:
+                return cached
+        structure = extract()
+        self.put(user, page, structure, fingerprint)
+        return structure
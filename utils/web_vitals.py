@@ -0,0 +1,108 @@
+# utils/web_vitals.py
+from playwright.sync_api import Page
+
+# Installed per context (utils.context_setup); observers buffer entries so nothing is read until collect_metrics.
+# SauceDemo is a single-page app: after the first document, pages are client-side route changes that keep
+# that document's navigation entry, FCP and LCP. Each route change therefore gets its own record: the time
+# until the next frame after it, and the layout shifts and long tasks since it.
+VITALS_INIT_SCRIPT = """
+(() => {
+    if (window.__pwVitals) return;
+    const v = window.__pwVitals = { fcp: null, lcp: null, cls: 0, long_tasks: 0, long_task_ms: 0, route: null };
+    const observe = (type, onEntry) => {
+        try {
+            new PerformanceObserver(list => list.getEntries().forEach(onEntry)).observe({ type, buffered: true });
+        } catch (e) { /* entry type not supported by this browser */ }
+    };
+    observe('paint', e => { if (e.name === 'first-contentful-paint') v.fcp = e.startTime; });
+    observe('largest-contentful-paint', e => { v.lcp = e.startTime; });
+    observe('layout-shift', e => {
+        if (e.hadRecentInput) return;
+        v.cls += e.value;
+        if (v.route && e.startTime >= v.route.start) v.route.cls += e.value;
+    });
+    observe('longtask', e => {
+        v.long_tasks += 1; v.long_task_ms += e.duration;
+        if (v.route && e.startTime >= v.route.start) { v.route.long_tasks += 1; v.route.long_task_ms += e.duration; }
+    });
+    const routeChanged = () => {
+        const r = v.route = { start: performance.now(), render_ms: null, cls: 0, long_tasks: 0, long_task_ms: 0 };
+        performance.mark('route:' + location.pathname);
+        requestAnimationFrame(() => setTimeout(() => { r.render_ms = performance.now() - r.start; }));
+    };
+    for (const name of ['pushState', 'replaceState']) {
+        const original = history[name];
+        history[name] = function (...args) {
+            const before = location.href;
+            const result = original.apply(this, args);
+            if (location.href !== before) routeChanged();
+            return result;
+        };
+    }
+    addEventListener('popstate', routeChanged);
+})();
+"""
+
+# Document timings for a real navigation; route timings (document fields left empty) after a route change
+_READ_JS = """
+() => {
+    const v = window.__pwVitals || {};
+    const r = v.route;
+    if (r) {
+        return {
+            url: location.href, navigation: 'route',
+            ttfb_ms: null, dom_content_loaded_ms: null, load_ms: null, transfer_bytes: null,
+            route_ms: r.render_ms, fcp_ms: null, lcp_ms: null,
+            cls: r.cls, long_tasks: r.long_tasks, long_task_ms: r.long_task_ms,
+        };
+    }
+    const nav = performance.getEntriesByType('navigation')[0];
+    const since = (end) => nav && end ? end - nav.startTime : null;
+    return {
+        url: location.href, navigation: 'document',
+        ttfb_ms: nav ? since(nav.responseStart) : null,
+        dom_content_loaded_ms: nav ? since(nav.domContentLoadedEventEnd) : null,
+        load_ms: nav ? since(nav.loadEventEnd) : null,
+        transfer_bytes: nav ? nav.transferSize : null,
+        route_ms: null,
+        fcp_ms: v.fcp ?? null,
+        lcp_ms: v.lcp ?? null,
+        cls: v.cls ?? null,
+        long_tasks: v.long_tasks ?? null,
+        long_task_ms: v.long_task_ms ?? null,
+    };
+}
+"""
+
+# Metrics shown in the cross-user comparison, in display order
+METRICS = ("ttfb_ms", "dom_content_loaded_ms", "load_ms", "route_ms", "fcp_ms", "lcp_ms", "cls", "long_tasks",
+           "long_task_ms")
+
+
+def install(context) -> None:
+    context.add_init_script(VITALS_INIT_SCRIPT)
+
+
+def read_vitals(page: Page) -> dict:
+    """
+    Navigation timing and Web Vitals of the current document, or route timings when the page was
+    reached by a client-side route change ("navigation": "document" or "route"), in one evaluate.
+    """
+    return page.evaluate(_READ_JS)
+
+
+def store(user_result, page_name: str, metrics: dict) -> dict:
+    """
+    Keep metrics in UserResult.meta["vitals"][page_name] for the report comparison.
+    Empty readings are dropped, so a route page keeps only the metrics that describe it.
+    """
+    metrics = {k: v for k, v in metrics.items() if v is not None}
+    user_result.meta.setdefault("vitals", {})[page_name] = metrics
+    return metrics
+
+
+class WebVitalsMixin:
+    """Gives a page object collect_metrics(); needs self.page."""
+
+    def collect_metrics(self) -> dict:
+        return read_vitals(self.page)